@@ -4,8 +4,9 @@ API routes for assistant management and execution
 
 import json
 import logging
+from contextlib import aclosing
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import StreamingResponse
 
 from backend.app.dependencies import get_assistant_service
@@ -124,15 +125,23 @@ async def execute_assistant(
 async def execute_assistant_stream(
     assistant_id: str,
     request: ExecutionRequest,
+    http_request: Request,
     service: AssistantService = Depends(get_assistant_service),
 ):
     """Execute an assistant in streaming mode"""
 
     async def event_generator():
-        async for chunk in service.execute_stream(assistant_id, request.input_data):
-            if isinstance(chunk, str):
-                yield f"data: {json.dumps({'token': chunk})}\n\n"
-            else:
-                yield f"data: {json.dumps(chunk)}\n\n"
+        # Leaving the block closes the whole chain, cancelling the LLM request
+        async with aclosing(
+            service.execute_stream(assistant_id, request.input_data)
+        ) as chunks:
+            async for chunk in chunks:
+                if await http_request.is_disconnected():
+                    logger.info(f"Client disconnected, stopping assistant {assistant_id}")
+                    break
+                if isinstance(chunk, str):
+                    yield f"data: {json.dumps({'token': chunk})}\n\n"
+                else:
+                    yield f"data: {json.dumps(chunk)}\n\n"
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
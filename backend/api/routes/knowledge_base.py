@@ -14,6 +14,8 @@ from backend.schemas.collections import (
     CollectionListResponse,
     CollectionUpdateRequest,
     ReindexRequest,
+    SearchBenchmarkRequest,
+    SearchBenchmarkResponse,
     TaskProgressResponse,
     TaskStartedResponse,
     WatchUrlsResponse,
@@ -74,6 +76,28 @@ async def create_collection(
         chunk_size=request.chunk_size,
         chunk_overlap=request.chunk_overlap,
         distance_metric=request.distance_metric,
+        storage=request.storage.model_dump(),
+    )
+
+
+@router.post(
+    "/collections/{collection_name}/search-benchmark",
+    response_model=SearchBenchmarkResponse,
+    operation_id="benchmarkSearch",
+)
+async def benchmark_search(
+    collection_name: str,
+    request: SearchBenchmarkRequest,
+    service: KnowledgeBaseService = Depends(get_knowledge_base_service),
+):
+    """Measure recall@k and latency of search settings against exact search."""
+    return await service.benchmark_search(
+        collection_name=collection_name,
+        candidates=[c.model_dump() for c in request.candidates],
+        queries=request.queries,
+        sample_size=request.sample_size,
+        k=request.k,
+        min_recall=request.min_recall,
     )
 
 
@@ -0,0 +1,41 @@
+"""
+API routes for runtime metrics
+"""
+
+import logging
+
+from fastapi import APIRouter
+
+from backend.core.cache import all_cache_stats
+from backend.core.semantic_cache import semantic_cache
+from backend.schemas.metrics import (
+    CacheStatsListResponse,
+    CacheStatsResponse,
+    SemanticCacheStatsResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get(
+    "/caches",
+    response_model=CacheStatsListResponse,
+    operation_id="getCacheStats",
+)
+async def get_cache_stats():
+    """Size and hit ratio of the in-process retrieval and generation caches."""
+    return CacheStatsListResponse(
+        caches={name: CacheStatsResponse(**stats) for name, stats in all_cache_stats().items()}
+    )
+
+
+@router.get(
+    "/semantic-cache",
+    response_model=SemanticCacheStatsResponse,
+    operation_id="getSemanticCacheStats",
+)
+async def get_semantic_cache_stats():
+    """Hits, misses and generation time saved by the semantic answer cache."""
+    return SemanticCacheStatsResponse(**semantic_cache.stats())
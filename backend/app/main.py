@@ -2,15 +2,19 @@
 Main FastAPI application
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 import colorlog
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from backend.app.exception_handlers import register_exception_handlers
 from backend.config import settings
+from backend.core.llm import close_llm_clients
+from backend.services.warmup_service import model_warmup
 
 
 def setup_logging() -> None:
@@ -53,7 +57,31 @@ async def lifespan(app: FastAPI):
     logger.info(
         f"Registered assistant types: {backend.core.assistants.AssistantRegistry.list_types()}"
     )
+
+    warmup_task = None
+    if settings.WARMUP_MODELS:
+        from backend.app.dependencies import (
+            get_assistant_repo,
+            get_knowledge_base_repo,
+            get_mongodb,
+            get_qdrant_client,
+        )
+
+        def get_repos():
+            db = get_mongodb()
+            return (
+                get_knowledge_base_repo(db=db, qdrant=get_qdrant_client()),
+                get_assistant_repo(db=db),
+            )
+
+        # Runs in the background; /health reports 503 until it finishes
+        warmup_task = asyncio.create_task(model_warmup.run(get_repos))
+
     yield
+
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    await close_llm_clients()
     logger.info("Application shutdown")
 
 
@@ -87,6 +115,7 @@ from backend.api.routes import (  # noqa: E402
     assistants,
     evaluation,
     knowledge_base,
+    metrics,
     ollama,
 )
 
@@ -96,8 +125,14 @@ app.include_router(
 )
 app.include_router(evaluation.router, prefix="/evaluation", tags=["evaluation"])
 app.include_router(ollama.router, prefix="/integrations/ollama", tags=["integrations"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 
 @app.get("/health", operation_id="healthCheck")
 async def health_check():
+    if not model_warmup.is_ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up", "warmup": model_warmup.status.value},
+        )
     return {"status": "healthy"}
@@ -28,6 +28,47 @@ class Settings(BaseSettings):
     ENABLE_PHOENIX: bool = False
     ENABLE_OLLAMA: bool = False
     DEPLOYMENT_MODE: str = "dev"
+    WARMUP_MODELS: bool = False
+
+    # ── Retrieval ─────────────────────────────────────────
+    DEFAULT_EMBEDDING_MODEL: str = "jina/jina-embeddings-v2-base-de"
+    EMBEDDING_POOL_SIZE: int = 4
+    VECTOR_STORE_CACHE_SIZE: int = 64
+    QUERY_EMBEDDING_CACHE_SIZE: int = 2048
+    QUERY_EMBEDDING_CACHE_TTL: float = 3600.0
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_SIZE: int = 1024
+    RETRIEVAL_CACHE_TTL: float = 600.0
+    RERANK_MAX_CANDIDATES: int = 100
+    RERANKER_POOL_SIZE: int = 2  # Loaded local cross-encoders
+    HYDE_CACHE_SIZE: int = 1024
+    HYDE_CACHE_TTL: float = 86400.0
+    HYDE_CACHE_PERSISTENT: bool = False
+
+    # ── Generation ────────────────────────────────────────
+    CONTEXT_TOKEN_BUDGET: int = 6000  # For models without a specific budget
+    LLM_POOL_SIZE: int = 32
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_REQUEST_TIMEOUT: float = 120.0
+    CHAIN_CACHE_SIZE: int = 256
+    ANSWER_CACHE_SIZE: int = 1024  # Assistants opt in with config.answer_cache
+    ANSWER_CACHE_TTL: float = 3600.0
+    SEMANTIC_CACHE_MAX_NAMESPACES: int = 256  # Assistants opt in with config.semantic_cache
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1000  # Per namespace
+
+    # ── Ingestion ─────────────────────────────────────────
+    SCRAPE_CONCURRENCY: int = 8
+    SCRAPE_PER_DOMAIN_CONCURRENCY: int = 2
+    SCRAPE_POLITENESS_DELAY: float = 0.5  # Seconds between requests to one domain
+    SCRAPE_MAX_RETRIES: int = 2
+    SCRAPE_RETRY_BACKOFF: float = 1.0  # Doubles with every retry
+    INGESTION_QUEUE_SIZE: int = 16  # Pages / chunk batches buffered between stages
+    # Chunks per embedding request, by provider (OpenAI accepts large inputs;
+    # a local Ollama model is compute-bound, so small batches stream better)
+    EMBEDDING_BATCH_SIZES: dict[str, int] = {"openai": 256, "ollama": 32}
+    EMBEDDING_DEFAULT_BATCH_SIZE: int = 64
+    EMBEDDING_CONCURRENCY: int = 4  # Embedding requests in flight per upload
 
     # ── Misc ──────────────────────────────────────────────
     TZ: str = "Europe/Berlin"
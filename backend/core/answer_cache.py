@@ -0,0 +1,76 @@
+"""
+Answer cache for assistant executions
+
+Opt-in per assistant (``answer_cache`` in its config). Keys combine the
+assistant, a hash of its config, the normalized input and the write
+versions of its knowledge bases, so knowledge-base writes and config
+changes make old entries unreachable; TTL and LRU eviction clean them up.
+"""
+
+import hashlib
+import json
+from typing import Any
+
+from backend.config import settings
+from backend.core.cache import LRUCache
+from backend.core.retriever import get_collection_version
+
+# (assistant, config version, mode, input, collection versions) → output
+_answers: LRUCache[tuple, Any] = LRUCache(
+    maxsize=settings.ANSWER_CACHE_SIZE,
+    ttl=settings.ANSWER_CACHE_TTL,
+    name="answers",
+)
+
+
+def normalize_question(question: str) -> str:
+    """Case- and whitespace-insensitive form of a question."""
+    return " ".join(question.lower().split())
+
+
+def _hash(data: Any) -> str:
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def answer_cache_key(
+    assistant_id: str,
+    config: dict[str, Any],
+    input_data: dict[str, Any],
+    stream: bool,
+) -> tuple:
+    """
+    Cache key for one execution.
+
+    Streaming and non-streaming results have different shapes and are
+    cached separately.
+    """
+    inputs = dict(input_data)
+    if isinstance(inputs.get("question"), str):
+        inputs["question"] = normalize_question(inputs["question"])
+
+    collection_versions = tuple(
+        (name, get_collection_version(name))
+        for name in sorted(config.get("knowledge_base_ids") or [])
+    )
+    return (
+        assistant_id,
+        _hash(config),
+        "stream" if stream else "execute",
+        _hash(inputs),
+        collection_versions,
+    )
+
+
+def get_cached_answer(key: tuple) -> Any:
+    """Cached output for the key, or None."""
+    return _answers.get(key)
+
+
+def cache_answer(key: tuple, output: Any) -> None:
+    _answers.set(key, output)
+
+
+def invalidate_assistant_answers(assistant_id: str) -> int:
+    """Drop all cached answers of an assistant."""
+    return _answers.pop_where(lambda key: key[0] == assistant_id)
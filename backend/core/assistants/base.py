@@ -3,7 +3,7 @@ Base classes for all assistant types
 """
 
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterator
+from collections.abc import AsyncGenerator
 from typing import Any
 
 from pydantic import BaseModel, Field
@@ -42,7 +42,7 @@ class BaseAssistant(ABC):
     @abstractmethod
     def execute(
         self, config: Any, input_data: Any, stream: bool = False
-    ) -> AsyncIterator[Any]:
+    ) -> AsyncGenerator[Any, None]:
         """
         Execute the assistant logic.
 
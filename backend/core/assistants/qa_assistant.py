@@ -5,9 +5,12 @@ Orchestrates the retrieve → generate pipeline using core/ building blocks.
 """
 
 import logging
-from typing import Any
+from contextlib import aclosing
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from backend.db.qdrant import build_metadata_filter
 
 from .base import AssistantConfig, AssistantInput, AssistantOutput, BaseAssistant
 from .registry import AssistantRegistry
@@ -26,9 +29,25 @@ class QAAssistantConfig(AssistantConfig):
 
     # Retrieval
     hybrid_search: bool = True
+    hybrid_fusion: Literal["rrf", "dbsf"] = "rrf"  # Dense + sparse, in Qdrant
+    dense_prefetch_limit: int | None = None
+    sparse_prefetch_limit: int | None = None
+    # Latency/recall tradeoff; tune with the collection search-benchmark endpoint
+    hnsw_ef: int | None = None
+    exact_search: bool = False
+    quantization_rescore: bool | None = None
+    # Diversification (drops near-duplicate chunks)
+    mmr: bool = False
+    mmr_lambda: float = 0.5
+    mmr_fetch_k: int | None = None
     top_k: int = 10
     use_hyde: bool = False
     hyde_prompt: str | None = None
+    hyde_mode: Literal["sequential", "parallel"] = "sequential"
+    hyde_latency_budget: float = 3.0
+    hyde_fuse_results: bool = True
+    fusion_method: Literal["rrf", "score"] = "rrf"  # Multi-collection merge
+    collection_timeout: float = 10.0
 
     # Reranking
     reranking: bool = False
@@ -40,8 +59,17 @@ class QAAssistantConfig(AssistantConfig):
     system_prompt: str | None = None
     user_prompt: str | None = None
     precise_citation: bool = False
+    stream_citations: bool = True  # Inline [n] markers; False = JSON, not streamed
     precise_citation_system_prompt: str | None = None
     precise_citation_user_prompt: str | None = None
+    context_token_budget: int | None = None  # Per-model default if None
+
+    # Caching
+    answer_cache: bool = False  # Reuse answers to repeated questions
+    semantic_cache: bool = False  # Also reuse answers to similar questions
+    semantic_cache_threshold: float = 0.95  # Cosine similarity of the questions
+    semantic_cache_max_age: float = 3600.0  # Seconds
+    semantic_cache_embedding_model: str | None = None  # Default embedding model if None
 
     # General
     local_only: bool = False
@@ -55,8 +83,17 @@ class QAAssistantInput(AssistantInput):
     """Input for QA Assistant"""
 
     question: str
+    # Optional "filters" key: metadata filters for retrieval,
+    # e.g. {"filters": {"source_category": "website"}}
     context: dict[str, Any] | None = Field(default_factory=dict)
 
+    @field_validator("context")
+    @classmethod
+    def validate_filters(cls, context: dict[str, Any] | None) -> dict[str, Any] | None:
+        # Reject bad filters up front instead of failing mid-execution
+        build_metadata_filter((context or {}).get("filters"))
+        return context
+
 
 class QAAssistantOutput(AssistantOutput):
     """Output from QA Assistant"""
@@ -90,49 +127,69 @@ class QAAssistant(BaseAssistant):
         When stream=False: yields a single QAAssistantOutput.
         When stream=True: yields str tokens, then a final metadata dict.
         """
-        from ..generator import generate, generate_stream
+        from ..generator import generate, generate_stream, get_context_token_budget
         from ..retriever import retrieve
+        from ..utils import pack_context
 
         try:
             logger.info(f"Executing QA (stream={stream}): {input_data.question}")
 
             # Step 1: Retrieve
             retrieved_docs = []
+            retrieval_complete = True
             if config.knowledge_base_ids:
-                retrieved_docs = await retrieve(
+                retrieved_docs, retrieval_complete = await retrieve(
                     query=input_data.question,
                     knowledge_base_ids=config.knowledge_base_ids,
                     config=config.model_dump(),
+                    filters=(input_data.context or {}).get("filters"),
                 )
             logger.info(f"Retrieved {len(retrieved_docs)} documents")
 
             config_dict = config.model_dump()
 
+            # Step 2: Fit the context into the model's token budget
+            budget = get_context_token_budget(config_dict)
+            context_docs, context_tokens = pack_context(retrieved_docs, budget)
+            logger.info(
+                f"Packed {len(context_docs)}/{len(retrieved_docs)} documents "
+                f"into {context_tokens}/{budget} context tokens"
+            )
+
             if stream:
                 # Streaming mode: yield tokens then metadata
-                urls = [doc.metadata.get("source_url") for doc in retrieved_docs]
-                contexts = [doc.page_content for doc in retrieved_docs]
+                urls = [doc.metadata.get("source_url") for doc in context_docs]
+                contexts = [doc.page_content for doc in context_docs]
 
-                async for chunk in generate_stream(
+                stream_chunks = generate_stream(
                     query=input_data.question,
-                    documents=retrieved_docs,
+                    documents=context_docs,
                     config=config_dict,
-                ):
-                    if isinstance(chunk, str):
-                        yield chunk
-                    else:
-                        # Precise citation returns a dict
-                        urls = chunk.get("sources")
-                        contexts = chunk.get("contexts")
-                        yield chunk.get("answer")
-
-                yield {"source_urls": urls, "contexts": contexts}
+                )
+                async with aclosing(stream_chunks):
+                    async for chunk in stream_chunks:
+                        if isinstance(chunk, str):
+                            yield chunk
+                        else:
+                            # Precise citation ends with a dict of the cited chunks;
+                            # the non-streaming variant also carries the answer
+                            urls = chunk.get("sources")
+                            contexts = chunk.get("contexts")
+                            if "answer" in chunk:
+                                yield chunk["answer"]
+
+                yield {
+                    "source_urls": urls,
+                    "contexts": contexts,
+                    "context_tokens": context_tokens,
+                    "retrieval_complete": retrieval_complete,
+                }
 
             else:
                 # Non-streaming mode: yield a single output
                 result = await generate(
                     query=input_data.question,
-                    documents=retrieved_docs,
+                    documents=context_docs,
                     config=config_dict,
                 )
 
@@ -143,6 +200,10 @@ class QAAssistant(BaseAssistant):
                     contexts=result.get("contexts", []),
                     metadata={
                         "retrieved_docs_count": len(retrieved_docs),
+                        "context_docs_count": len(context_docs),
+                        "context_tokens": context_tokens,
+                        "context_token_budget": budget,
+                        "retrieval_complete": retrieval_complete,
                         "llm_model": config.llm_model,
                     },
                 )
@@ -0,0 +1,141 @@
+"""
+Small in-process caches shared by the retrieval and generation pipeline.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+# Named caches, reported together by the metrics endpoint
+_registry: dict[str, "LRUCache"] = {}
+
+
+def all_cache_stats() -> dict[str, dict[str, Any]]:
+    """Stats for every cache that was created with a name."""
+    return {name: cache.stats() for name, cache in sorted(_registry.items())}
+
+
+class LRUCache[K: Hashable, V]:
+    """
+    Thread-safe, bounded least-recently-used cache with optional TTL.
+
+    Safe to use from both the event loop and worker threads
+    (retrieval runs blocking client calls via asyncio.to_thread).
+    Entries older than ``ttl`` seconds are treated as misses. Passing a
+    ``name`` registers the cache for all_cache_stats().
+    """
+
+    def __init__(
+        self, maxsize: int = 128, ttl: float | None = None, name: str | None = None
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[K, tuple[V, float | None]] = OrderedDict()
+        self._lock = threading.RLock()
+        self._building: dict[K, threading.Lock] = {}  # get_or_create, per key
+        if name:
+            _registry[name] = self
+
+    def _lookup(self, key: K) -> tuple[V, float | None] | None:
+        """Return the live entry for key or None, updating counters."""
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at = entry[1]
+            if expires_at is None or expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry
+            del self._data[key]
+        self.misses += 1
+        return None
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        with self._lock:
+            entry = self._lookup(key)
+            return default if entry is None else entry[0]
+
+    def set(self, key: K, value: V) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key: K, factory: Callable[[], V]) -> V:
+        """
+        Return the cached value, building and storing it on a miss.
+
+        The factory runs outside the cache lock, so slow builds (a database
+        round trip, loading a model) of different keys run concurrently.
+        Concurrent misses on the same key still build it only once.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry[0]
+            building = self._building.setdefault(key, threading.Lock())
+
+        with building:
+            with self._lock:
+                # Built by another thread while this one waited
+                if key in self:
+                    return self._data[key][0]
+            try:
+                value = factory()
+                self.set(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def pop_where(self, predicate: Callable[[K], bool]) -> int:
+        """Remove all entries whose key matches the predicate."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Size and hit/miss counters, e.g. for a metrics endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False
+            expires_at = entry[1]
+            return expires_at is None or expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -4,13 +4,15 @@ Embedding model factory
 
 import logging
 from dataclasses import dataclass
+from typing import Any
 
 from langchain_core.embeddings import Embeddings
 from langchain_ollama import OllamaEmbeddings
 from langchain_openai import OpenAIEmbeddings
-from langchain_qdrant import FastEmbedSparse
+from langchain_qdrant import FastEmbedSparse, SparseEmbeddings, SparseVector
 
 from backend.config import settings
+from backend.core.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,7 @@ class EmbeddingConfig:
     dense: Embeddings
     sparse: FastEmbedSparse
     dimension: int
+    provider: str | None = None
 
 
 # ── Registry of supported models ──────────────────────────
@@ -42,7 +45,25 @@ _EMBEDDING_MODELS: dict[str, dict] = {
 }
 
 # BM25 sparse model used for all hybrid search
-_SPARSE_MODEL = "Qdrant/bm25"
+SPARSE_MODEL = "Qdrant/bm25"
+
+_sparse_embeddings: FastEmbedSparse | None = None
+
+
+def get_sparse_embeddings() -> FastEmbedSparse:
+    """
+    Shared BM25 sparse model.
+
+    Loading it takes seconds, so one instance serves every collection,
+    ingestion task and query. fastembed caches the weights on disk in
+    ~/.cache/fastembed/ so they are only downloaded once.
+    """
+    global _sparse_embeddings
+    if _sparse_embeddings is None:
+        logger.info("Loading BM25 sparse model...")
+        _sparse_embeddings = FastEmbedSparse(model_name=SPARSE_MODEL)
+        logger.info("BM25 sparse model loaded and cached.")
+    return _sparse_embeddings
 
 
 def get_embedding_config(model_name: str) -> EmbeddingConfig:
@@ -78,11 +99,102 @@ def get_embedding_config(model_name: str) -> EmbeddingConfig:
     else:
         raise ValueError(f"Unknown embedding provider: {provider}")
 
-    sparse = FastEmbedSparse(model_name=_SPARSE_MODEL)
+    sparse = get_sparse_embeddings()
 
     logger.info(f"Created embedding config for '{model_name}' (dim={dimension})")
 
-    return EmbeddingConfig(dense=dense, sparse=sparse, dimension=dimension)
+    return EmbeddingConfig(
+        dense=dense, sparse=sparse, dimension=dimension, provider=provider
+    )
+
+
+# ── Query embedding cache ─────────────────────────────────
+
+# (kind, model, normalized query) → dense vector or SparseVector
+query_embedding_cache: LRUCache[tuple, Any] = LRUCache(
+    maxsize=settings.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl=settings.QUERY_EMBEDDING_CACHE_TTL,
+    name="query_embeddings",
+)
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a query for cache keys (whitespace and case folded)."""
+    return " ".join(text.split()).casefold()
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Dense embeddings wrapper that caches query vectors.
+
+    Document embedding is passed through untouched — only the query path,
+    which repeats across users, is worth caching.
+    """
+
+    def __init__(self, inner: Embeddings, model_name: str):
+        self.inner = inner
+        self.model_name = model_name
+
+    def _key(self, text: str) -> tuple:
+        return ("dense", self.model_name, normalize_query(text))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.inner.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.inner.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        vector = query_embedding_cache.get(key)
+        if vector is None:
+            vector = self.inner.embed_query(text)
+            query_embedding_cache.set(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        vector = query_embedding_cache.get(key)
+        if vector is None:
+            vector = await self.inner.aembed_query(text)
+            query_embedding_cache.set(key, vector)
+        return vector
+
+
+class CachedSparseQueryEmbeddings(SparseEmbeddings):
+    """Sparse (BM25) counterpart of CachedQueryEmbeddings."""
+
+    def __init__(self, inner: SparseEmbeddings, model_name: str):
+        self.inner = inner
+        self.model_name = model_name
+
+    def embed_documents(self, texts: list[str]) -> list[SparseVector]:
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> SparseVector:
+        key = ("sparse", self.model_name, normalize_query(text))
+        vector = query_embedding_cache.get(key)
+        if vector is None:
+            vector = self.inner.embed_query(text)
+            query_embedding_cache.set(key, vector)
+        return vector
+
+
+# Warm instances shared by all request paths, one per model
+_embedding_pool: LRUCache[str, EmbeddingConfig] = LRUCache(maxsize=settings.EMBEDDING_POOL_SIZE)
+
+
+def get_pooled_embedding_config(model_name: str) -> EmbeddingConfig:
+    """
+    Return a warm EmbeddingConfig for the model, creating it on first use.
+
+    Unlike get_embedding_config(), instances are reused across requests so
+    switching between collections with different models does not rebuild
+    clients on the request path.
+    """
+    return _embedding_pool.get_or_create(
+        model_name, lambda: get_embedding_config(model_name)
+    )
 
 
 def list_supported_models() -> list[dict[str, str | int]]:
@@ -93,6 +205,13 @@ def list_supported_models() -> list[dict[str, str | int]]:
     ]
 
 
+def get_embedding_batch_size(provider: str | None) -> int:
+    """Chunks per document-embedding request for a provider."""
+    if provider is None:
+        return settings.EMBEDDING_DEFAULT_BATCH_SIZE
+    return settings.EMBEDDING_BATCH_SIZES.get(provider, settings.EMBEDDING_DEFAULT_BATCH_SIZE)
+
+
 def get_embedding_dimension(model_name: str) -> int:
     """Get the vector dimension for a model without creating instances."""
     if model_name not in _EMBEDDING_MODELS:
@@ -1,16 +1,27 @@
 """
 LLM answer generator
+
+Generation is fully async (ainvoke/astream) so a streaming answer never
+blocks the event loop for other requests. Closing the stream early (e.g.
+when the SSE client disconnects) cancels the underlying LLM request.
 """
 
+import hashlib
+import json
 import logging
-from collections.abc import AsyncIterator
-from typing import Any
+import re
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from typing import Any, cast
 
 from langchain_core.documents import Document
 from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, Field
 
+from backend.config import settings
+from backend.core.cache import LRUCache
 from backend.core.llm import get_chat_llm
 from backend.core.utils import (
     extract_sources,
@@ -47,6 +58,19 @@ DEFAULT_PRECISE_CITATION_USER = """Context Chunks:
 
 Question: {question}"""
 
+DEFAULT_INLINE_CITATION_SYSTEM = """You are answering questions using provided context chunks.
+Each chunk is numbered starting from 0.
+
+Instructions:
+1. Answer using ONLY information from the chunks
+2. Do not quote or list the chunks themselves
+
+{format_instructions}"""
+
+# Takes the place of the JSON format instructions when citations are streamed
+INLINE_CITATION_FORMAT_INSTRUCTIONS = """Right after each statement, cite the chunks \
+it is based on as [n] or [n, m]. Only cite chunks you directly used."""
+
 
 class CitedAnswer(BaseModel):
     """Structured output for precise citation mode."""
@@ -57,6 +81,157 @@ class CitedAnswer(BaseModel):
     )
 
 
+# ── Context budgets ──────────────────────────────────────
+
+# Tokens of retrieved context per model. Well below the context windows:
+# beyond this, latency and cost grow faster than answer quality.
+_CONTEXT_TOKEN_BUDGETS: dict[str, int] = {
+    "gpt-4o": 8000,
+    "gpt-4o-mini": 8000,
+    "gpt-4.1": 12000,
+    "gpt-4.1-mini": 12000,
+    "gpt-4.1-nano": 8000,
+}
+
+
+def get_context_token_budget(config: dict[str, Any]) -> int:
+    """Context budget from the assistant config, else per model, else the default."""
+    return (
+        config.get("context_token_budget")
+        or _CONTEXT_TOKEN_BUDGETS.get(config.get("llm_model") or "")
+        or settings.CONTEXT_TOKEN_BUDGET
+    )
+
+
+# ── Compiled chains ──────────────────────────────────────
+
+_STANDARD = "standard"
+_PRECISE = "precise"
+_INLINE_CITATION = "inline_citation"
+
+# Config fields that shape a compiled chain
+_PROMPT_CONFIG_FIELDS = (
+    "system_prompt",
+    "user_prompt",
+    "precise_citation_system_prompt",
+    "precise_citation_user_prompt",
+    "references",
+)
+
+# Prompt templates, parsers and runnables per (prompt config, mode, model).
+# The model is part of the key by id(); the cached chain holds a reference
+# to it, so the id can't be reused while the entry is alive.
+_compiled_chains: LRUCache[tuple, Runnable] = LRUCache(
+    maxsize=settings.CHAIN_CACHE_SIZE, name="compiled_chains"
+)
+
+
+def prompt_config_hash(config: dict[str, Any]) -> str:
+    """Stable hash of the prompt-related fields of an assistant config."""
+    fields = {name: config.get(name) for name in _PROMPT_CONFIG_FIELDS}
+    payload = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def invalidate_compiled_chains(config: dict[str, Any]) -> int:
+    """Drop the compiled chains of a config (e.g. before it is updated)."""
+    config_hash = prompt_config_hash(config)
+    return _compiled_chains.pop_where(lambda key: key[0] == config_hash)
+
+
+def _context_input() -> dict[str, Any]:
+    return {
+        "context": lambda x: format_context(x["documents"]),
+        "question": lambda x: x["question"],
+    }
+
+
+def _indexed_context_input() -> dict[str, Any]:
+    return {
+        "context_with_indices": lambda x: format_context_with_indices(x["documents"]),
+        "question": lambda x: x["question"],
+    }
+
+
+def _build_standard_chain(config: dict[str, Any], llm):
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", config.get("system_prompt") or DEFAULT_SYSTEM_PROMPT),
+            ("user", config.get("user_prompt") or DEFAULT_USER_PROMPT),
+        ]
+    )
+
+    # Reference texts are fixed per config — bind them as prompt variables
+    references = {
+        ref["name"]: ref["text"]
+        for ref in config.get("references") or []
+        if ref.get("name") and ref.get("text")
+    }
+    chain_input = _context_input()
+    for name, text in references.items():
+        chain_input[name] = lambda _, text=text: text
+
+    return chain_input | prompt | llm | StrOutputParser()
+
+
+def _build_precise_chain(config: dict[str, Any], llm):
+    parser = PydanticOutputParser(pydantic_object=CitedAnswer)
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                config.get("precise_citation_system_prompt")
+                or DEFAULT_PRECISE_CITATION_SYSTEM,
+            ),
+            (
+                "user",
+                config.get("precise_citation_user_prompt")
+                or DEFAULT_PRECISE_CITATION_USER,
+            ),
+        ]
+    ).partial(format_instructions=parser.get_format_instructions())
+    return _indexed_context_input() | prompt | llm | parser
+
+
+def _build_inline_citation_chain(config: dict[str, Any], llm):
+    # A custom precise citation prompt is kept; the marker format goes where
+    # it expects its format instructions, or at the end
+    system = config.get("precise_citation_system_prompt") or DEFAULT_INLINE_CITATION_SYSTEM
+    if "{format_instructions}" not in system:
+        system += "\n\n{format_instructions}"
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", system),
+            (
+                "user",
+                config.get("precise_citation_user_prompt")
+                or DEFAULT_PRECISE_CITATION_USER,
+            ),
+        ]
+    ).partial(format_instructions=INLINE_CITATION_FORMAT_INSTRUCTIONS)
+    return _indexed_context_input() | prompt | llm | StrOutputParser()
+
+
+_CHAIN_BUILDERS = {
+    _STANDARD: _build_standard_chain,
+    _PRECISE: _build_precise_chain,
+    _INLINE_CITATION: _build_inline_citation_chain,
+}
+
+
+def _get_chain(mode: str, config: dict[str, Any], llm):
+    """Compiled chain for the config and model, built on first use."""
+    key = (prompt_config_hash(config), mode, id(llm))
+    return _compiled_chains.get_or_create(
+        key, lambda: _CHAIN_BUILDERS[mode](config, llm)
+    )
+
+
+def _astream(chain: Runnable, documents: list[Document], query: str) -> AsyncGenerator:
+    """Token stream of a chain; astream returns an async generator that can be aclosed."""
+    return cast(AsyncGenerator, chain.astream({"documents": documents, "question": query}))
+
+
 async def generate(
     query: str,
     documents: list[Document],
@@ -83,33 +258,17 @@ async def generate(
     )
 
     if config.get("precise_citation", False):
-        return _generate_precise(query, documents, config, llm)
+        return await _generate_precise(query, documents, config, llm)
     else:
-        return _generate_standard(query, documents, config, llm)
+        return await _generate_standard(query, documents, config, llm)
 
 
-def _generate_standard(
+async def _generate_standard(
     query: str, documents: list[Document], config: dict[str, Any], llm
 ) -> dict[str, Any]:
     """Standard generation — stream-compatible chain."""
-    system_prompt = config.get("system_prompt", DEFAULT_SYSTEM_PROMPT)
-    user_prompt = config.get("user_prompt", DEFAULT_USER_PROMPT)
-
-    prompt = ChatPromptTemplate.from_messages(
-        [("system", system_prompt), ("user", user_prompt)]
-    )
-
-    chain = (
-        {
-            "context": lambda x: format_context(x["documents"]),
-            "question": lambda x: x["question"],
-        }
-        | prompt
-        | llm
-        | StrOutputParser()
-    )
-
-    answer = chain.invoke({"documents": documents, "question": query})
+    chain = _get_chain(_STANDARD, config, llm)
+    answer = await chain.ainvoke({"documents": documents, "question": query})
 
     include_all = not config.get("reranking", False)
     return {
@@ -119,38 +278,13 @@ def _generate_standard(
     }
 
 
-def _generate_precise(
+async def _generate_precise(
     query: str, documents: list[Document], config: dict[str, Any], llm
 ) -> dict[str, Any]:
     """Precise citation mode — returns answer with chunk indices."""
     logger.info("Using precise citation mode")
-    parser = PydanticOutputParser(pydantic_object=CitedAnswer)
-
-    system_prompt = config.get(
-        "precise_citation_system_prompt", DEFAULT_PRECISE_CITATION_SYSTEM
-    )
-    user_prompt = config.get(
-        "precise_citation_user_prompt", DEFAULT_PRECISE_CITATION_USER
-    )
-
-    prompt = ChatPromptTemplate.from_messages(
-        [("system", system_prompt), ("user", user_prompt)]
-    )
-
-    chain = (
-        {
-            "context_with_indices": lambda x: format_context_with_indices(
-                x["documents"]
-            ),
-            "question": lambda x: x["question"],
-            "format_instructions": lambda x: parser.get_format_instructions(),
-        }
-        | prompt
-        | llm
-        | parser
-    )
-
-    result = chain.invoke({"documents": documents, "question": query})
+    chain = _get_chain(_PRECISE, config, llm)
+    result = await chain.ainvoke({"documents": documents, "question": query})
 
     valid_indices = [i for i in result.used_chunk_indices if 0 <= i < len(documents)]
     if len(valid_indices) != len(result.used_chunk_indices):
@@ -170,44 +304,114 @@ async def generate_stream(
     query: str,
     documents: list[Document],
     config: dict[str, Any],
-) -> AsyncIterator:
+) -> AsyncGenerator:
     """
-    Stream answer tokens. Falls back to non-streaming for precise citation.
+    Stream answer tokens.
+
+    Precise citation streams too (inline [n] markers, see
+    InlineCitationParser) unless stream_citations is False, which falls
+    back to the non-streaming structured output.
 
     Yields:
-        str tokens for standard mode, or a dict result for precise citation.
+        str tokens, then for precise citation a dict with 'sources' and
+        'contexts' (plus 'answer' when not streamed).
     """
     llm = get_chat_llm(
         model=config.get("llm_model"),
         provider=config.get("llm_provider"),
     )
 
-    if config.get("precise_citation", False):
-        # Precise citation can't stream — yield the full result
-        result = _generate_precise(query, documents, config, llm)
+    if config.get("precise_citation", False) and not config.get("stream_citations", True):
+        # Structured (JSON) citations can't stream — yield the full result
+        result = await _generate_precise(query, documents, config, llm)
         yield result
+    elif config.get("precise_citation", False):
+        async with aclosing(_stream_inline_citations(query, documents, config, llm)) as chunks:
+            async for chunk in chunks:
+                yield chunk
     else:
-        system_prompt = config.get("system_prompt", DEFAULT_SYSTEM_PROMPT)
-        user_prompt = config.get("user_prompt", DEFAULT_USER_PROMPT)
-
-        prompt = ChatPromptTemplate.from_messages(
-            [("system", system_prompt), ("user", user_prompt)]
-        )
-
-        chain_input = {
-            "context": lambda x: format_context(x["documents"]),
-            "question": lambda x: x["question"],
-        }
-
-        # Inject reference text variables into the chain
-        references = config.get("references", [])
-        for ref in references:
-            ref_name = ref.get("name")
-            ref_text = ref.get("text")
-            if ref_name and ref_text:
-                chain_input[ref_name] = (lambda text: lambda x: text)(ref_text)
-
-        chain = chain_input | prompt | llm | StrOutputParser()
-
-        for token in chain.stream({"documents": documents, "question": query}):
-            yield token
+        chain = _get_chain(_STANDARD, config, llm)
+
+        # Closing this generator closes astream, which aborts the LLM request
+        async with aclosing(_astream(chain, documents, query)) as tokens:
+            async for token in tokens:
+                yield token
+
+
+# ── Streaming precise citation ───────────────────────────
+
+_CITATION_MARKER = re.compile(r"\s*\[(\d+(?:\s*,\s*\d+)*)\]")
+# Trailing whitespace and/or an unfinished "[1, 2" that may become a marker
+_PENDING_MARKER = re.compile(r"\s*(?:\[[\d,\s]{0,20})?$")
+
+
+class InlineCitationParser:
+    """
+    Strip [n] citation markers from streamed text and collect their indices.
+
+    Only markers whose indices all name one of the num_documents chunks
+    are citations; anything else in brackets (a year, an array index) is
+    left in the text. Text that could still turn into a marker (e.g. a
+    trailing " [1") is held back until the next token decides it, so
+    markers never reach the user even when split across tokens.
+    """
+
+    def __init__(self, num_documents: int):
+        self.num_documents = num_documents
+        self.indices: list[int] = []
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        """Add a token; return the text that is safe to emit."""
+        buffer = self._pending + text
+        cut = _PENDING_MARKER.search(buffer).start()
+        self._pending = buffer[cut:]
+        return self._strip(buffer[:cut])
+
+    def flush(self) -> str:
+        """Return the remaining held-back text at the end of the stream."""
+        text, self._pending = self._pending, ""
+        return self._strip(text)
+
+    def _strip(self, text: str) -> str:
+        return _CITATION_MARKER.sub(self._replace_marker, text)
+
+    def _replace_marker(self, match: re.Match) -> str:
+        indices = [int(index) for index in match.group(1).split(",")]
+        if not all(index < self.num_documents for index in indices):
+            return match.group(0)
+        for index in indices:
+            if index not in self.indices:
+                self.indices.append(index)
+        return ""
+
+
+async def _stream_inline_citations(
+    query: str, documents: list[Document], config: dict[str, Any], llm
+) -> AsyncGenerator:
+    """
+    Precise citation mode that streams.
+
+    The model cites chunks inline as [n]; markers are stripped from the
+    streamed tokens and the cited chunks are yielded as a final dict with
+    'sources' and 'contexts'.
+    """
+    logger.info("Using streaming precise citation mode")
+    chain = _get_chain(_INLINE_CITATION, config, llm)
+
+    parser = InlineCitationParser(len(documents))
+    async with aclosing(_astream(chain, documents, query)) as tokens:
+        async for token in tokens:
+            text = parser.feed(token)
+            if text:
+                yield text
+    text = parser.flush()
+    if text:
+        yield text
+
+    used_docs = [documents[i] for i in parser.indices]
+    include_all = not config.get("reranking", False)
+    yield {
+        "sources": extract_sources(used_docs, include_without_scores=include_all),
+        "contexts": [doc.page_content for doc in used_docs],
+    }
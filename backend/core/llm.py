@@ -1,17 +1,76 @@
 """
 LLM factory
+
+Chat models are pooled per (provider, model, temperature, kwargs) and share
+keep-alive HTTP connection pools, so repeated calls reuse open connections
+instead of paying a new TLS handshake per chat turn.
 """
 
 import logging
 
+import httpx
 from langchain_core.language_models import BaseChatModel
 from langchain_ollama import ChatOllama
 from langchain_openai import ChatOpenAI
 
 from backend.config import settings
+from backend.core.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+_chat_llms: LRUCache[tuple, BaseChatModel] = LRUCache(maxsize=settings.LLM_POOL_SIZE, name="chat_llms")
+
+_http_client: httpx.Client | None = None
+_http_async_client: httpx.AsyncClient | None = None
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+    )
+
+
+def _get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            limits=_http_limits(), timeout=settings.LLM_REQUEST_TIMEOUT
+        )
+    return _http_client
+
+
+def _get_http_async_client() -> httpx.AsyncClient:
+    global _http_async_client
+    if _http_async_client is None:
+        _http_async_client = httpx.AsyncClient(
+            limits=_http_limits(), timeout=settings.LLM_REQUEST_TIMEOUT
+        )
+    return _http_async_client
+
+
+def _build_chat_llm(
+    model: str, provider: str, temperature: float, **kwargs
+) -> BaseChatModel:
+    if provider == "openai":
+        kwargs.setdefault("http_client", _get_http_client())
+        kwargs.setdefault("http_async_client", _get_http_async_client())
+        return ChatOpenAI(model=model, temperature=temperature, **kwargs)
+    elif provider == "ollama":
+        # The Ollama client builds its own httpx clients; pooling the model
+        # keeps them (and their connections) alive
+        kwargs.setdefault("client_kwargs", {"limits": _http_limits()})
+        return ChatOllama(
+            model=model,
+            temperature=temperature,
+            base_url=settings.OLLAMA_BASE_URL,
+            **kwargs,
+        )
+    else:
+        raise ValueError(
+            f"Unsupported LLM provider: {provider}. Supported: openai, ollama"
+        )
+
 
 def get_chat_llm(
     model: str = "gpt-4o",
@@ -20,30 +79,34 @@ def get_chat_llm(
     **kwargs,
 ) -> BaseChatModel:
     """
-    Create a chat LLM instance.
+    Get a pooled chat LLM instance, creating it on first use.
 
     Args:
         model: Model name (e.g. "gpt-4o", "gpt-4o-mini", "llama3").
         provider: "openai" or "ollama".
         temperature: Sampling temperature.
-        **kwargs: Additional provider-specific arguments.
+        **kwargs: Additional provider-specific arguments (part of the pool key).
 
     Returns:
-        A LangChain chat model instance.
+        A LangChain chat model instance, shared by all callers with the same arguments.
 
     Raises:
         ValueError: If the provider is not supported.
     """
-    if provider == "openai":
-        return ChatOpenAI(model=model, temperature=temperature, **kwargs)
-    elif provider == "ollama":
-        return ChatOllama(
-            model=model,
-            temperature=temperature,
-            base_url=settings.OLLAMA_BASE_URL,
-            **kwargs,
-        )
-    else:
-        raise ValueError(
-            f"Unsupported LLM provider: {provider}. Supported: openai, ollama"
-        )
+    key = (provider, model, temperature, repr(sorted(kwargs.items())))
+    return _chat_llms.get_or_create(
+        key, lambda: _build_chat_llm(model, provider, temperature, **kwargs)
+    )
+
+
+async def close_llm_clients() -> None:
+    """Drop pooled models and close the shared HTTP clients (app shutdown)."""
+    global _http_client, _http_async_client
+    _chat_llms.clear()
+    if _http_async_client is not None:
+        await _http_async_client.aclose()
+        _http_async_client = None
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+    logger.info("Closed pooled LLM clients")
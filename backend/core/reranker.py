@@ -0,0 +1,148 @@
+"""
+Reranking stage — rescore retrieved candidates with a cross-encoder.
+
+Supports a local FlagEmbedding cross-encoder ("huggingface") and the
+Cohere rerank API ("cohere"). All query/passage pairs are scored in a
+single batch so the cost is one forward pass or one API round trip.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from langchain_core.documents import Document
+
+from backend.config import settings
+from backend.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MODELS: dict[str, str] = {
+    "huggingface": "BAAI/bge-reranker-v2-m3",
+    "cohere": "rerank-v3.5",
+}
+
+# Loaded cross-encoders, one per model (each holds a full model in memory)
+_local_rerankers: LRUCache[str, Any] = LRUCache(maxsize=settings.RERANKER_POOL_SIZE)
+_cohere_client = None
+
+
+def _get_local_reranker(model_name: str):
+    def load():
+        from FlagEmbedding import FlagReranker
+
+        logger.info(f"Loading reranker model '{model_name}'...")
+        reranker = FlagReranker(
+            model_name,
+            use_fp16=settings.USE_GPU,
+            devices=None if settings.USE_GPU else "cpu",
+        )
+        logger.info(f"Reranker model '{model_name}' loaded and cached.")
+        return reranker
+
+    return _local_rerankers.get_or_create(model_name, load)
+
+
+def _get_cohere_client():
+    global _cohere_client
+    if _cohere_client is None:
+        import cohere
+
+        _cohere_client = cohere.AsyncClientV2(
+            api_key=settings.COHERE_API_KEY.get_secret_value()
+        )
+    return _cohere_client
+
+
+def _score_local(model_name: str, query: str, texts: list[str]) -> list[float]:
+    reranker = _get_local_reranker(model_name)
+    pairs = [[query, text] for text in texts]
+    scores = reranker.compute_score(pairs, batch_size=len(pairs), normalize=True)
+    # A single pair comes back as a bare float
+    return [float(s) for s in scores] if isinstance(scores, list) else [float(scores)]
+
+
+async def _score_cohere(model_name: str, query: str, texts: list[str]) -> list[float]:
+    response = await _get_cohere_client().rerank(
+        model=model_name, query=query, documents=texts
+    )
+    scores = [0.0] * len(texts)
+    for result in response.results:
+        scores[result.index] = float(result.relevance_score)
+    return scores
+
+
+async def warm_up(provider: str, model: str | None = None) -> None:
+    """Load a reranker and score one dummy pair so the first request is fast."""
+    if provider == "huggingface":
+        model = model or _DEFAULT_MODELS[provider]
+        await asyncio.to_thread(_score_local, model, "warmup", ["warmup"])
+    elif provider == "cohere":
+        # Remote model — just set up the client
+        _get_cohere_client()
+
+
+async def rerank(
+    query: str,
+    documents: list[Document],
+    provider: str,
+    model: str | None = None,
+    top_n: int | None = None,
+) -> tuple[list[Document], bool]:
+    """
+    Rerank documents against the query and keep the best top_n.
+
+    Writes the reranker score to metadata["relevance_score"]. If the
+    reranker fails, the original order is kept (truncated to top_n) and
+    the retrieval score stands in as relevance_score.
+
+    Args:
+        query: The user's question.
+        documents: Retrieved candidates, best first.
+        provider: "huggingface" (local cross-encoder) or "cohere".
+        model: Reranker model name; defaults per provider.
+        top_n: Number of documents to keep; all candidates if None.
+
+    Returns:
+        Tuple of (documents, whether the reranker scored them — False
+        for the retrieval-order fallback).
+
+    Raises:
+        ValueError: If the provider is not supported.
+    """
+    if provider not in _DEFAULT_MODELS:
+        raise ValueError(
+            f"Unsupported reranker provider: {provider}. "
+            f"Supported: {list(_DEFAULT_MODELS.keys())}"
+        )
+    if not documents:
+        return [], True
+
+    model = model or _DEFAULT_MODELS[provider]
+    candidates = documents[: settings.RERANK_MAX_CANDIDATES]
+    top_n = top_n or len(candidates)
+    texts = [doc.page_content for doc in candidates]
+
+    try:
+        if provider == "cohere":
+            scores = await _score_cohere(model, query, texts)
+        else:
+            # CPU-bound forward pass — keep it off the event loop
+            scores = await asyncio.to_thread(_score_local, model, query, texts)
+    except Exception as e:
+        logger.error(f"Reranking failed, keeping retrieval order: {e}")
+        fallback = candidates[:top_n]
+        for doc in fallback:
+            # Sources of reranked answers are listed by relevance_score
+            doc.metadata["relevance_score"] = doc.metadata.get("retrieval_score", 0.0)
+        return fallback, False
+
+    for doc, score in zip(candidates, scores, strict=True):
+        doc.metadata["relevance_score"] = score
+
+    ranked = sorted(candidates, key=lambda d: d.metadata["relevance_score"], reverse=True)
+    logger.info(
+        f"Reranked {len(candidates)} candidates with {provider}/{model}, "
+        f"keeping top {min(top_n, len(ranked))}"
+    )
+    return ranked[:top_n], True
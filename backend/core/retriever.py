@@ -1,24 +1,92 @@
 """
 Document retriever — supports dense and hybrid (dense + sparse) search.
+
+Assistants with several knowledge bases fan out to all of them concurrently
+and merge the per-collection rankings into one global top_k.
+
+The query path is fully async (AsyncQdrantClient, async embeddings and
+HyDE via ainvoke) so a slow search never blocks the event loop. Hybrid
+search is a single Query API call: dense and sparse prefetch branches
+fused server-side (RRF or DBSF).
 """
 
+import asyncio
+import hashlib
 import logging
-from typing import Any
+import statistics
+import time
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import Any, cast
 
+import numpy as np
 from langchain_core.documents import Document
-from langchain_qdrant import QdrantVectorStore, RetrievalMode
-from qdrant_client import QdrantClient
+from langchain_core.embeddings import Embeddings
+from langchain_qdrant import SparseEmbeddings
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
 
 from backend.config import settings
-from backend.core.embeddings import get_embedding_config
+from backend.core.cache import LRUCache
+from backend.core.embeddings import (
+    SPARSE_MODEL,
+    CachedQueryEmbeddings,
+    CachedSparseQueryEmbeddings,
+    get_pooled_embedding_config,
+    get_sparse_embeddings,
+    normalize_query,
+)
 from backend.core.llm import get_chat_llm
+from backend.core.reranker import rerank
+from backend.db.mongodb import MongoDBClient
+from backend.db.qdrant import (
+    CONTENT_PAYLOAD_KEY,
+    DENSE_VECTOR_NAME,
+    METADATA_PAYLOAD_KEY,
+    SPARSE_VECTOR_NAME,
+    build_metadata_filter,
+    build_quantization_search_params,
+)
+from backend.db.repositories.hyde_cache_repo import HydeCacheRepository
+from backend.db.repositories.knowledge_base_repo import KnowledgeBaseRepository
 
 logger = logging.getLogger(__name__)
 
+_HYBRID_FUSIONS: dict[str, models.Fusion] = {
+    "rrf": models.Fusion.RRF,
+    "dbsf": models.Fusion.DBSF,
+}
+
 
 _qdrant_client: QdrantClient | None = None
-_embedding_config = None
-_sparse_embeddings = None
+_async_qdrant_client: AsyncQdrantClient | None = None
+_mongodb: MongoDBClient | None = None
+_knowledge_base_repo: KnowledgeBaseRepository | None = None
+_hyde_cache_repo: HydeCacheRepository | None = None
+_sparse_embeddings: CachedSparseQueryEmbeddings | None = None
+
+# collection name → its MongoDB config ({} for collections without one)
+_collection_configs: LRUCache[str, dict[str, Any]] = LRUCache(maxsize=256)
+
+# (collection, hybrid, embedding model) → _SearchHandle
+_search_handles: LRUCache[tuple, "_SearchHandle"] = LRUCache(maxsize=settings.VECTOR_STORE_CACHE_SIZE)
+
+# (prompt hash, provider/model, normalized question) → hypothetical document
+_hyde_cache: LRUCache[str, str] = LRUCache(
+    maxsize=settings.HYDE_CACHE_SIZE,
+    ttl=settings.HYDE_CACHE_TTL,
+    name="hyde_documents",
+)
+
+# Bumped on every write to a collection; part of every result cache key,
+# so stale entries become unreachable and simply age out of the LRU.
+_collection_versions: dict[str, int] = {}
+
+# (collections + versions, query, retrieval settings) → list[Document]
+_result_cache: LRUCache[tuple, list[Document]] = LRUCache(
+    maxsize=settings.RETRIEVAL_CACHE_SIZE,
+    ttl=settings.RETRIEVAL_CACHE_TTL,
+    name="retrieval_results",
+)
 
 
 def _get_qdrant_client() -> QdrantClient:
@@ -28,106 +96,804 @@ def _get_qdrant_client() -> QdrantClient:
     return _qdrant_client
 
 
-def _get_dense_embeddings():
-    global _embedding_config
-    if _embedding_config is None:
-        _embedding_config = get_embedding_config("jina/jina-embeddings-v2-base-de")
-    return _embedding_config.dense
+def _get_async_qdrant_client() -> AsyncQdrantClient:
+    global _async_qdrant_client
+    if _async_qdrant_client is None:
+        _async_qdrant_client = AsyncQdrantClient(url=settings.qdrant_url, timeout=10)
+    return _async_qdrant_client
 
 
-def _get_sparse_embeddings():
-    """
-    Get sparse BM25 embeddings (only needed for hybrid search).
+def _get_mongodb() -> MongoDBClient:
+    global _mongodb
+    if _mongodb is None:
+        _mongodb = MongoDBClient(settings.MONGODB_URL, settings.MONGODB_NAME)
+    return _mongodb
 
-    Lazy-loaded on first hybrid search request. The fastembed library
-    caches the model in ~/.cache/fastembed/ so it's only downloaded once.
-    """
+
+def _get_hyde_cache_repo() -> HydeCacheRepository:
+    global _hyde_cache_repo
+    if _hyde_cache_repo is None:
+        _hyde_cache_repo = HydeCacheRepository(
+            db=_get_mongodb(), ttl_seconds=int(settings.HYDE_CACHE_TTL)
+        )
+    return _hyde_cache_repo
+
+
+def _get_knowledge_base_repo() -> KnowledgeBaseRepository:
+    global _knowledge_base_repo
+    if _knowledge_base_repo is None:
+        _knowledge_base_repo = KnowledgeBaseRepository(
+            db=_get_mongodb(),
+            qdrant=_get_qdrant_client(),
+        )
+    return _knowledge_base_repo
+
+
+def _get_collection_config(collection_name: str) -> dict[str, Any]:
+    """Cached MongoDB config of a collection ({} if it has none, not cached)."""
+    config = _collection_configs.get(collection_name)
+    if config is None:
+        config = _get_knowledge_base_repo().get_collection_config(collection_name)
+        if not config:
+            # May be a collection whose config is being saved right now
+            return {}
+        _collection_configs.set(collection_name, config)
+    return config
+
+
+def _resolve_embedding_model(collection_name: str) -> str:
+    """Look up the dense embedding model a collection was created with."""
+    model_name = _get_collection_config(collection_name).get("dense_embedding_model")
+    if not model_name:
+        logger.warning(
+            f"No embedding model configured for '{collection_name}', "
+            f"using default '{settings.DEFAULT_EMBEDDING_MODEL}'"
+        )
+        model_name = settings.DEFAULT_EMBEDDING_MODEL
+    return model_name
+
+
+def _get_dense_embeddings(model_name: str) -> CachedQueryEmbeddings:
+    return CachedQueryEmbeddings(get_pooled_embedding_config(model_name).dense, model_name)
+
+
+def _get_sparse_embeddings() -> CachedSparseQueryEmbeddings:
+    """Sparse BM25 embeddings (only needed for hybrid search), with query caching."""
     global _sparse_embeddings
     if _sparse_embeddings is None:
-        from langchain_qdrant import FastEmbedSparse
-
-        logger.info("Loading BM25 sparse model (first hybrid search request)...")
-        _sparse_embeddings = FastEmbedSparse(model_name="Qdrant/bm25")
-        logger.info("BM25 sparse model loaded and cached.")
+        _sparse_embeddings = CachedSparseQueryEmbeddings(
+            get_sparse_embeddings(), SPARSE_MODEL
+        )
     return _sparse_embeddings
 
 
-def _generate_hypothetical_document(query: str, hyde_prompt: str, llm) -> str:
+DEFAULT_HYDE_PROMPT = (
+    "Given a question, generate a paragraph that answers it.\n\n"
+    "Question: {question}\n\nParagraph: "
+)
+
+
+async def _generate_hypothetical_document(query: str, hyde_prompt: str, llm) -> str:
     """Generate a hypothetical answer to use as the search query (HyDE)."""
     try:
         formatted_prompt = hyde_prompt.format(question=query)
-        response = llm.invoke(formatted_prompt)
+        response = await llm.ainvoke(formatted_prompt)
         return response.content if hasattr(response, "content") else str(response)
     except Exception as e:
         logger.error(f"HyDE generation failed, falling back to original query: {e}")
         return query
 
 
-async def retrieve(
+def _hyde_cache_key(query: str, hyde_prompt: str, config: dict[str, Any]) -> str:
+    prompt_hash = hashlib.sha256(hyde_prompt.encode("utf-8")).hexdigest()[:16]
+    model = f"{config.get('llm_provider', 'openai')}/{config.get('llm_model', 'gpt-4o-mini')}"
+    return f"{prompt_hash}:{model}:{normalize_query(query)}"
+
+
+async def _get_hypothetical_document(query: str, config: dict[str, Any]) -> str:
+    """
+    HyDE document for the query, served from cache when possible.
+
+    Looks in the in-memory LRU first, then (with HYDE_CACHE_PERSISTENT)
+    in MongoDB, and only calls the LLM on a miss in both. Failed
+    generations fall back to the raw query and are never cached.
+    """
+    hyde_prompt = config.get("hyde_prompt") or DEFAULT_HYDE_PROMPT
+    key = _hyde_cache_key(query, hyde_prompt, config)
+
+    cached = _hyde_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if settings.HYDE_CACHE_PERSISTENT:
+        try:
+            # Build the repository (and its MongoDB client) in the worker thread too
+            cached = await asyncio.to_thread(lambda: _get_hyde_cache_repo().find(key))
+        except Exception as e:
+            logger.warning(f"HyDE cache lookup in MongoDB failed: {e}")
+        if cached is not None:
+            _hyde_cache.set(key, cached)
+            return cached
+
+    document = await _generate_hypothetical_document(
+        query, hyde_prompt, _get_hyde_llm(config)
+    )
+    if document == query:
+        return document
+
+    _hyde_cache.set(key, document)
+    if settings.HYDE_CACHE_PERSISTENT:
+        try:
+            model = config.get("llm_model", "gpt-4o-mini")
+            await asyncio.to_thread(
+                lambda: _get_hyde_cache_repo().upsert(key, document, model)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to persist HyDE document: {e}")
+    return document
+
+
+def invalidate_collection(collection_name: str) -> None:
+    """
+    Drop cached handles and results for a collection.
+
+    Call after a collection is deleted, recreated or reindexed so the next
+    query rebuilds its search handle against the current configuration.
+    """
+    bump_collection_version(collection_name)
+    _collection_configs.pop(collection_name)
+    removed = _search_handles.pop_where(lambda key: key[0] == collection_name)
+    logger.debug(f"Invalidated {removed} cached search handles for '{collection_name}'")
+
+
+def get_collection_version(collection_name: str) -> int:
+    """Current write version of a collection (0 if never written in this process)."""
+    return _collection_versions.get(collection_name, 0)
+
+
+def bump_collection_version(collection_name: str) -> None:
+    """Mark a collection as changed so cached retrieval results are bypassed."""
+    _collection_versions[collection_name] = get_collection_version(collection_name) + 1
+
+
+def _result_cache_key(
     query: str,
     knowledge_base_ids: list[str],
     config: dict[str, Any],
+    query_filter: models.Filter | None = None,
+) -> tuple:
+    use_hyde = config.get("use_hyde", False)
+    return (
+        tuple((name, get_collection_version(name)) for name in knowledge_base_ids),
+        normalize_query(query),
+        query_filter.model_dump_json() if query_filter else None,
+        config.get("top_k", 10),
+        config.get("hybrid_search", True),
+        config.get("hybrid_fusion") or "rrf",
+        config.get("dense_prefetch_limit"),
+        config.get("sparse_prefetch_limit"),
+        (config.get("hnsw_ef"), config.get("exact_search"), config.get("quantization_rescore")),
+        (
+            (config.get("mmr_lambda", 0.5), config.get("mmr_fetch_k"))
+            if config.get("mmr")
+            else None
+        ),
+        config.get("fusion_method") or "rrf",
+        use_hyde,
+        (
+            (
+                config.get("hyde_prompt"),
+                config.get("llm_model"),
+                config.get("hyde_mode"),
+                config.get("hyde_fuse_results", True),
+            )
+            if use_hyde
+            else None
+        ),
+        (
+            (config.get("reranker_provider"), config.get("reranker_model"), config.get("top_n"))
+            if config.get("reranking")
+            else None
+        ),
+    )
+
+
+def _copy_documents(documents: list[Document]) -> list[Document]:
+    # Later pipeline stages annotate metadata in place
+    return [doc.model_copy(deep=True) for doc in documents]
+
+
+@dataclass(frozen=True)
+class SearchOptions:
+    """Per-request search settings shared by every collection searched."""
+
+    hybrid: bool = True
+    top_k: int = 10
+    hybrid_fusion: models.Fusion = models.Fusion.RRF
+    dense_limit: int | None = None  # Prefetch limit per branch; top_k if None
+    sparse_limit: int | None = None
+    query_filter: models.Filter | None = None
+    # Dense-search accuracy/latency tradeoff (None keeps Qdrant's defaults)
+    hnsw_ef: int | None = None
+    exact: bool = False
+    rescore: bool | None = None  # Overrides the collection's rescore setting
+    # MMR diversification: None disables it; fetch_k candidates are reduced to top_k
+    mmr_lambda: float | None = None
+    mmr_fetch_k: int | None = None
+
+    @property
+    def candidate_limit(self) -> int:
+        """Number of hits to fetch per collection."""
+        if self.mmr_lambda is None:
+            return self.top_k
+        return max(self.mmr_fetch_k or 2 * self.top_k, self.top_k)
+
+    @classmethod
+    def from_config(
+        cls, config: dict[str, Any], query_filter: models.Filter | None = None
+    ) -> "SearchOptions":
+        """
+        Build options from an assistant config dict.
+
+        Raises:
+            ValueError: If the hybrid fusion method is not supported.
+        """
+        hybrid_fusion = config.get("hybrid_fusion") or "rrf"
+        if hybrid_fusion not in _HYBRID_FUSIONS:
+            raise ValueError(
+                f"Unsupported hybrid fusion: {hybrid_fusion}. "
+                f"Supported: {list(_HYBRID_FUSIONS.keys())}"
+            )
+        return cls(
+            hybrid=config.get("hybrid_search", True),
+            top_k=config.get("top_k", 10),
+            hybrid_fusion=_HYBRID_FUSIONS[hybrid_fusion],
+            dense_limit=config.get("dense_prefetch_limit"),
+            sparse_limit=config.get("sparse_prefetch_limit"),
+            query_filter=query_filter,
+            hnsw_ef=config.get("hnsw_ef"),
+            exact=config.get("exact_search", False),
+            rescore=config.get("quantization_rescore"),
+            mmr_lambda=config.get("mmr_lambda", 0.5) if config.get("mmr") else None,
+            mmr_fetch_k=config.get("mmr_fetch_k"),
+        )
+
+
+@dataclass(frozen=True)
+class _SearchHandle:
+    """Query embeddings for one collection; sparse is None for dense-only search."""
+
+    collection_name: str
+    dense: Embeddings
+    sparse: SparseEmbeddings | None
+    # Oversampling/rescore for quantized collections, None otherwise
+    quantization: models.QuantizationSearchParams | None = None
+
+
+def _get_search_handle(collection_name: str, hybrid: bool) -> _SearchHandle:
+    """Return a cached search handle, building it on first use."""
+    model_name = _resolve_embedding_model(collection_name)
+    return _search_handles.get_or_create(
+        (collection_name, hybrid, model_name),
+        lambda: _SearchHandle(
+            collection_name=collection_name,
+            dense=_get_dense_embeddings(model_name),
+            sparse=_get_sparse_embeddings() if hybrid else None,
+            quantization=build_quantization_search_params(
+                _get_collection_config(collection_name).get("storage")
+            ),
+        ),
+    )
+
+
+async def _embed_query(
+    handle: _SearchHandle, query: str
+) -> tuple[list[float], models.SparseVector | None]:
+    """Embed the query for the handle's search mode (dense and sparse in parallel)."""
+    dense_task = handle.dense.aembed_query(query)
+
+    if handle.sparse is None:
+        return await dense_task, None
+
+    # FastEmbed is CPU-bound and sync-only — keep it off the event loop
+    dense, sparse = await asyncio.gather(
+        dense_task,
+        asyncio.to_thread(handle.sparse.embed_query, query),
+    )
+    return dense, models.SparseVector(indices=sparse.indices, values=sparse.values)
+
+
+def _dense_search_params(
+    handle: _SearchHandle, options: SearchOptions
+) -> models.SearchParams | None:
+    """Search params for the dense branch, or None if all defaults apply."""
+    quantization = handle.quantization
+    if quantization is not None and options.rescore is not None:
+        quantization = quantization.model_copy(update={"rescore": options.rescore})
+    if quantization is None and options.hnsw_ef is None and not options.exact:
+        return None
+    return models.SearchParams(
+        hnsw_ef=options.hnsw_ef, exact=options.exact, quantization=quantization
+    )
+
+
+def _dense_vector(point: models.ScoredPoint | models.Record) -> list[float]:
+    """The dense vector of a point fetched with with_vectors=[DENSE_VECTOR_NAME]."""
+    return cast(dict[str, list[float]], point.vector)[DENSE_VECTOR_NAME]
+
+
+def _maximal_marginal_relevance(
+    query_vector: list[float], candidates: list[list[float]], k: int, lambda_mult: float
+) -> list[int]:
+    """
+    Pick k diverse candidates with maximal marginal relevance.
+
+    Each step selects the candidate maximizing
+    lambda * sim(query, c) - (1 - lambda) * max(sim(c, selected)), so
+    near-duplicates of an already selected chunk lose out. All pairwise
+    cosine similarities come from a single matrix product.
+
+    Returns:
+        Indices of the selected candidates, in selection order.
+    """
+    vectors = np.asarray(candidates, dtype=np.float32)
+    if vectors.size == 0:
+        return []
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1, norms)
+    query = np.asarray(query_vector, dtype=np.float32)
+    query /= np.linalg.norm(query) or 1
+
+    relevance = unit @ query
+    similarity = unit @ unit.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    while len(selected) < min(k, len(vectors)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        max_similarity = np.maximum(max_similarity, similarity[best])
+    return selected
+
+
+def _document_from_point(point: models.ScoredPoint, collection_name: str) -> Document:
+    payload = point.payload or {}
+    metadata = dict(payload.get(METADATA_PAYLOAD_KEY) or {})
+    metadata["_id"] = point.id
+    metadata["_collection_name"] = collection_name
+    metadata.setdefault("collection_name", collection_name)
+    metadata["retrieval_score"] = float(point.score)
+    return Document(page_content=payload.get(CONTENT_PAYLOAD_KEY) or "", metadata=metadata)
+
+
+async def _search_collection(
+    collection_name: str, query: str, options: SearchOptions
 ) -> list[Document]:
+    """
+    Search a single collection with one Query API call.
+
+    Hybrid search sends a dense and a sparse prefetch branch and lets
+    Qdrant fuse them, so scores come back already fused. With MMR enabled,
+    more candidates are fetched together with their dense vectors and
+    diversified down to top_k.
+    """
+    # Cold handles hit MongoDB synchronously while being built
+    handle = await asyncio.to_thread(_get_search_handle, collection_name, options.hybrid)
+    dense, sparse = await _embed_query(handle, query)
+    dense_params = _dense_search_params(handle, options)
+    limit = options.candidate_limit
+    use_mmr = options.mmr_lambda is not None
+
+    if sparse is None:
+        query_kwargs = {
+            "query": dense,
+            "using": DENSE_VECTOR_NAME,
+            "search_params": dense_params,
+        }
+    else:
+        query_kwargs = {
+            "prefetch": [
+                models.Prefetch(
+                    query=dense,
+                    using=DENSE_VECTOR_NAME,
+                    filter=options.query_filter,
+                    params=dense_params,
+                    limit=max(options.dense_limit or 0, limit),
+                ),
+                models.Prefetch(
+                    query=sparse,
+                    using=SPARSE_VECTOR_NAME,
+                    filter=options.query_filter,
+                    limit=max(options.sparse_limit or 0, limit),
+                ),
+            ],
+            "query": models.FusionQuery(fusion=options.hybrid_fusion),
+        }
+
+    response = await _get_async_qdrant_client().query_points(
+        collection_name=collection_name,
+        query_filter=options.query_filter,
+        limit=limit,
+        with_payload=True,
+        with_vectors=[DENSE_VECTOR_NAME] if use_mmr else False,
+        **query_kwargs,
+    )
+    points = response.points
+
+    if options.mmr_lambda is not None and len(points) > options.top_k:
+        selected = _maximal_marginal_relevance(
+            dense,
+            [_dense_vector(point) for point in points],
+            options.top_k,
+            options.mmr_lambda,
+        )
+        points = [points[i] for i in selected]
+
+    return [_document_from_point(point, collection_name) for point in points]
+
+
+async def _search_collections(
+    collection_names: list[str],
+    query: str,
+    options: SearchOptions,
+    timeout: float,
+) -> list[list[Document]]:
+    """
+    Search all collections concurrently, each bounded by its own timeout.
+
+    Collections that fail or time out are logged and skipped, so one slow
+    or broken collection never fails the whole request.
+    """
+
+    async def search_one(name: str) -> list[Document]:
+        return await asyncio.wait_for(
+            _search_collection(name, query, options), timeout=timeout
+        )
+
+    results = await asyncio.gather(
+        *(search_one(name) for name in collection_names), return_exceptions=True
+    )
+
+    ranked_lists = []
+    for name, result in zip(collection_names, results, strict=True):
+        if isinstance(result, TimeoutError):
+            logger.warning(f"Search in '{name}' timed out after {timeout}s, skipping")
+        elif isinstance(result, BaseException):
+            logger.error(f"Search in '{name}' failed, skipping: {result}")
+        else:
+            ranked_lists.append(result)
+    return ranked_lists
+
+
+def _document_key(doc: Document) -> tuple:
+    """Identity of a retrieved chunk across result lists."""
+    point_id = doc.metadata.get("_id")
+    if point_id is not None:
+        return (doc.metadata.get("_collection_name"), point_id)
+    return (doc.metadata.get("collection_name"), doc.page_content)
+
+
+def _reciprocal_rank_fusion(
+    ranked_lists: list[list[Document]], top_k: int, k: int = 60
+) -> list[Document]:
+    """
+    Merge ranked lists with reciprocal-rank fusion.
+
+    Each document scores sum(1 / (k + rank)) over the lists it appears in,
+    which makes rankings comparable even when the raw scores are not
+    (e.g. different embedding models or hybrid vs. dense collections).
+    """
+    scores: dict[tuple, float] = {}
+    docs: dict[tuple, Document] = {}
+
+    for ranked in ranked_lists:
+        for rank, doc in enumerate(ranked, 1):
+            key = _document_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            docs.setdefault(key, doc)
+
+    fused = sorted(scores, key=scores.__getitem__, reverse=True)[:top_k]
+    for key in fused:
+        docs[key].metadata["fusion_score"] = scores[key]
+    return [docs[key] for key in fused]
+
+
+def _normalized_score_fusion(
+    ranked_lists: list[list[Document]], top_k: int
+) -> list[Document]:
+    """
+    Merge ranked lists by min-max normalizing each list's retrieval scores.
+
+    Documents found in several lists keep their best normalized score.
+    """
+    scores: dict[tuple, float] = {}
+    docs: dict[tuple, Document] = {}
+
+    for ranked in ranked_lists:
+        raw = [doc.metadata.get("retrieval_score", 0.0) for doc in ranked]
+        if not raw:
+            continue
+        low, high = min(raw), max(raw)
+        spread = high - low
+
+        for doc, score in zip(ranked, raw, strict=True):
+            normalized = (score - low) / spread if spread else 1.0
+            key = _document_key(doc)
+            if normalized > scores.get(key, -1.0):
+                scores[key] = normalized
+                docs[key] = doc
+
+    fused = sorted(scores, key=scores.__getitem__, reverse=True)[:top_k]
+    for key in fused:
+        docs[key].metadata["fusion_score"] = scores[key]
+    return [docs[key] for key in fused]
+
+
+_FUSION_METHODS = {
+    "rrf": _reciprocal_rank_fusion,
+    "score": _normalized_score_fusion,
+}
+
+
+def _get_hyde_llm(config: dict[str, Any]):
+    return get_chat_llm(
+        model=config.get("llm_model", "gpt-4o-mini"),
+        provider=config.get("llm_provider", "openai"),
+    )
+
+
+async def _search_with_parallel_hyde(
+    query: str,
+    knowledge_base_ids: list[str],
+    config: dict[str, Any],
+    search: Callable[[str], Coroutine[Any, Any, list[list[Document]]]],
+) -> tuple[list[list[Document]], bool]:
+    """
+    Search with the raw query while the HyDE document is being generated.
+
+    If HyDE finishes within hyde_latency_budget seconds its hits are
+    searched too and (with hyde_fuse_results) fused with the raw hits;
+    otherwise the raw hits are used alone.
+
+    Returns:
+        Tuple of (ranked lists, whether every search completed in full).
+    """
+    budget = config.get("hyde_latency_budget") or 3.0
+    expected = len(knowledge_base_ids)
+
+    raw_task = asyncio.create_task(search(query))
+    try:
+        hyde_query = await asyncio.wait_for(
+            _get_hypothetical_document(query, config), timeout=budget
+        )
+    except TimeoutError:
+        logger.warning(f"HyDE exceeded its {budget}s budget, using raw-query hits")
+        hyde_query = None
+    raw_lists = await raw_task
+
+    # Failed generation returns the raw query unchanged
+    if hyde_query is None or hyde_query == query:
+        return raw_lists, False
+
+    logger.info(f"HyDE query: {hyde_query[:100]}...")
+    hyde_lists = await search(hyde_query)
+    complete = len(raw_lists) == expected and len(hyde_lists) == expected
+
+    if config.get("hyde_fuse_results", True):
+        return raw_lists + hyde_lists, complete
+    return hyde_lists, complete
+
+
+async def retrieve(
+    query: str,
+    knowledge_base_ids: list[str],
+    config: dict[str, Any],
+    filters: dict[str, Any] | None = None,
+) -> tuple[list[Document], bool]:
     """
     Retrieve relevant documents from vector store.
 
+    With more than one knowledge base, all collections are searched in
+    parallel and the results are fused into a single top_k ranking, so
+    latency tracks the slowest collection rather than the sum.
+
     Args:
         query: The user's question.
         knowledge_base_ids: Collection names to search.
         config: Assistant config dict with keys:
             - hybrid_search (bool): Use hybrid (dense + sparse) or dense only
+            - hybrid_fusion (str): Server-side dense/sparse fusion, "rrf" or "dbsf"
+            - dense_prefetch_limit (int): Dense candidates fed to fusion (default top_k)
+            - sparse_prefetch_limit (int): Sparse candidates fed to fusion (default top_k)
+            - hnsw_ef (int): HNSW search beam width; higher is slower but more accurate
+            - exact_search (bool): Brute-force dense search (exact, slowest)
+            - quantization_rescore (bool): Override rescoring on quantized collections
+            - mmr (bool): Diversify each collection's hits with maximal marginal relevance
+            - mmr_lambda (float): MMR tradeoff, 1.0 = pure relevance, 0.0 = max diversity
+            - mmr_fetch_k (int): Candidates per collection before MMR (default 2 * top_k)
             - top_k (int): Number of documents to retrieve
             - use_hyde (bool): Generate hypothetical document first
             - hyde_prompt (str): Prompt template for HyDE
             - llm_model (str): Model for HyDE generation
             - llm_provider (str): Provider for HyDE generation
+            - hyde_mode (str): "sequential" (HyDE, then search) or "parallel"
+              (raw-query search runs while HyDE is generated)
+            - hyde_latency_budget (float): Parallel mode only — seconds to wait
+              for HyDE before answering from the raw-query hits
+            - hyde_fuse_results (bool): Parallel mode only — fuse raw and HyDE hits
+            - fusion_method (str): "rrf" or "score" for multi-collection merge
+            - collection_timeout (float): Per-collection search timeout in seconds
+            - reranking (bool): Rerank the top_k candidates with a cross-encoder
+            - reranker_provider (str): "huggingface" (local) or "cohere"
+            - reranker_model (str): Reranker model name
+            - top_n (int): Number of documents kept after reranking
+        filters: Optional metadata filters applied inside Qdrant, e.g.
+            {"source_category": "website"}; see build_metadata_filter.
+
+    Returns:
+        Tuple of (documents, whether retrieval completed in full — False
+        when a collection failed or timed out, HyDE was skipped or the
+        reranker fell back to retrieval order).
+
+    Raises:
+        ValueError: If a fusion method or a filter field is not supported.
     """
     if not knowledge_base_ids:
         logger.warning("No knowledge bases specified")
-        return []
+        return [], True
+
+    fusion_method = config.get("fusion_method") or "rrf"
+    timeout = config.get("collection_timeout") or 10.0
+
+    if fusion_method not in _FUSION_METHODS:
+        raise ValueError(
+            f"Unsupported fusion method: {fusion_method}. "
+            f"Supported: {list(_FUSION_METHODS.keys())}"
+        )
 
-    collection_name = knowledge_base_ids[0]
-    hybrid = config.get("hybrid_search", True)
-    top_k = config.get("top_k", 10)
+    options = SearchOptions.from_config(config, build_metadata_filter(filters))
+    cache_key = _result_cache_key(query, knowledge_base_ids, config, options.query_filter)
+    if settings.RETRIEVAL_CACHE_ENABLED:
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Retrieval cache hit ({len(cached)} documents)")
+            return _copy_documents(cached), True
 
     logger.info(
-        f"Retrieving from '{collection_name}' "
-        f"(mode={'hybrid' if hybrid else 'dense'}, top_k={top_k})"
+        f"Retrieving from {knowledge_base_ids} "
+        f"(mode={'hybrid' if options.hybrid else 'dense'}, top_k={options.top_k})"
     )
 
-    # Build vector store with appropriate search mode
-    store_kwargs = {
-        "client": _get_qdrant_client(),
-        "collection_name": collection_name,
-        "embedding": _get_dense_embeddings(),
-        "vector_name": "dense",
-    }
-
-    if hybrid:
-        store_kwargs["sparse_embedding"] = _get_sparse_embeddings()
-        store_kwargs["sparse_vector_name"] = "sparse"
-        store_kwargs["retrieval_mode"] = RetrievalMode.HYBRID
-    else:
-        store_kwargs["retrieval_mode"] = RetrievalMode.DENSE
-
-    vector_store = QdrantVectorStore(**store_kwargs)
-    retriever = vector_store.as_retriever(search_kwargs={"k": top_k})
-
-    # Apply HyDE if enabled
-    query_to_use = query
-    if config.get("use_hyde", False):
-        hyde_prompt = config.get(
-            "hyde_prompt",
-            "Given a question, generate a paragraph that answers it.\n\n"
-            "Question: {question}\n\nParagraph: ",
+    async def search(text: str) -> list[list[Document]]:
+        return await _search_collections(knowledge_base_ids, text, options, timeout)
+
+    if not config.get("use_hyde", False):
+        ranked_lists = await search(query)
+        complete = len(ranked_lists) == len(knowledge_base_ids)
+    elif config.get("hyde_mode") == "parallel":
+        ranked_lists, complete = await _search_with_parallel_hyde(
+            query, knowledge_base_ids, config, search
         )
-        llm = get_chat_llm(
-            model=config.get("llm_model", "gpt-4o-mini"),
-            provider=config.get("llm_provider", "openai"),
+    else:
+        hyde_query = await _get_hypothetical_document(query, config)
+        logger.info(f"HyDE query: {hyde_query[:100]}...")
+        ranked_lists = await search(hyde_query)
+        # Failed generation returns the raw query unchanged — retry HyDE next time
+        complete = len(ranked_lists) == len(knowledge_base_ids) and hyde_query != query
+
+    if len(ranked_lists) == 1:
+        documents = ranked_lists[0]
+    else:
+        documents = _FUSION_METHODS[fusion_method](ranked_lists, options.top_k)
+
+    if config.get("reranking", False):
+        documents, reranked = await rerank(
+            query,
+            documents,
+            provider=config.get("reranker_provider") or "huggingface",
+            model=config.get("reranker_model"),
+            top_n=config.get("top_n"),
         )
-        query_to_use = _generate_hypothetical_document(query, hyde_prompt, llm)
-        logger.info(f"HyDE query: {query_to_use[:100]}...")
+        complete = complete and reranked
+
+    # Only cache complete results — a timed-out collection or a failed
+    # reranker must be retried
+    if settings.RETRIEVAL_CACHE_ENABLED and complete:
+        _result_cache.set(cache_key, _copy_documents(documents))
 
-    documents = retriever.invoke(query_to_use)
     logger.info(f"Retrieved {len(documents)} documents")
-    return documents
+    return documents, complete
+
+
+# ── Search parameter benchmark ───────────────────────────
+
+
+async def benchmark_search_params(
+    collection_name: str,
+    candidates: list[SearchOptions],
+    queries: list[str] | None = None,
+    sample_size: int = 20,
+    k: int = 10,
+) -> tuple[int, list[dict[str, Any]]]:
+    """
+    Measure recall@k and latency of dense search settings against exact search.
+
+    Query vectors are embedded from ``queries`` or, without queries, sampled
+    from the vectors stored in the collection. Queries run one at a time so
+    latencies are not skewed by each other.
+
+    Args:
+        collection_name: Collection to benchmark.
+        candidates: Settings to compare; only hnsw_ef, exact and rescore are used.
+        queries: Optional sample questions.
+        sample_size: Number of stored vectors to sample when no queries are given.
+        k: Result size recall is measured at.
+
+    Returns:
+        Tuple of (number of queries, one dict per candidate with hnsw_ef,
+        exact, rescore, recall_at_k, mean_latency_ms and p95_latency_ms).
+    """
+    client = _get_async_qdrant_client()
+    handle = await asyncio.to_thread(_get_search_handle, collection_name, False)
+
+    if queries:
+        vectors = await asyncio.gather(*(handle.dense.aembed_query(q) for q in queries))
+    else:
+        points, _ = await client.scroll(
+            collection_name=collection_name,
+            limit=sample_size,
+            with_payload=False,
+            with_vectors=[DENSE_VECTOR_NAME],
+        )
+        vectors = [_dense_vector(point) for point in points]
+    if not vectors:
+        return 0, []
+
+    async def search(vector, params: models.SearchParams | None) -> tuple[set, float]:
+        start = time.perf_counter()
+        response = await client.query_points(
+            collection_name=collection_name,
+            query=vector,
+            using=DENSE_VECTOR_NAME,
+            limit=k,
+            search_params=params,
+            with_payload=False,
+        )
+        return {point.id for point in response.points}, time.perf_counter() - start
+
+    # Ground truth: brute force over the original (unquantized) vectors
+    exact_params = models.SearchParams(
+        exact=True, quantization=models.QuantizationSearchParams(ignore=True)
+    )
+    truth = [(await search(vector, exact_params))[0] for vector in vectors]
+
+    results = []
+    for options in candidates:
+        params = _dense_search_params(handle, options)
+        recalls, latencies = [], []
+        for vector, expected in zip(vectors, truth, strict=True):
+            found, latency = await search(vector, params)
+            recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+            latencies.append(latency * 1000)
+
+        results.append(
+            {
+                "hnsw_ef": options.hnsw_ef,
+                "exact": options.exact,
+                "rescore": options.rescore,
+                "recall_at_k": statistics.fmean(recalls),
+                "mean_latency_ms": statistics.fmean(latencies),
+                "p95_latency_ms": (
+                    statistics.quantiles(latencies, n=20)[-1]
+                    if len(latencies) > 1
+                    else latencies[0]
+                ),
+            }
+        )
+    logger.info(
+        f"Benchmarked {len(candidates)} search settings on '{collection_name}' "
+        f"with {len(vectors)} queries at k={k}"
+    )
+    return len(vectors), results
@@ -0,0 +1,166 @@
+"""
+Semantic answer cache
+
+Reuses answers to questions that are worded differently but mean the same
+(cosine similarity of their embeddings above a per-assistant threshold).
+Answered questions live in a small in-memory NumPy index per namespace —
+assistant, config, mode, other inputs and knowledge-base versions, the
+same parts as an answer cache key minus the question — so knowledge-base
+writes and config changes start from an empty index.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from backend.config import settings
+from backend.core.cache import LRUCache
+from backend.core.embeddings import CachedQueryEmbeddings, get_pooled_embedding_config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SemanticCacheHit:
+    """A cached answer and how close its question was."""
+
+    value: Any
+    question: str
+    similarity: float
+
+
+@dataclass
+class _Entry:
+    question: str
+    value: Any
+    latency: float
+    created_at: float
+
+
+@dataclass
+class _Index:
+    """Unit-normalized question vectors (one row per entry)."""
+
+    vectors: np.ndarray | None = None
+    entries: list[_Entry] = field(default_factory=list)
+
+    def prune(self, max_age: float) -> None:
+        cutoff = time.monotonic() - max_age
+        keep = [i for i, entry in enumerate(self.entries) if entry.created_at >= cutoff]
+        if self.vectors is not None and len(keep) != len(self.entries):
+            self.entries = [self.entries[i] for i in keep]
+            self.vectors = self.vectors[keep] if keep else None
+
+
+class SemanticCache:
+    """
+    Namespaced nearest-neighbour cache of answers.
+
+    Namespaces are LRU-evicted; each holds at most ``max_entries`` answers,
+    dropping the oldest first.
+    """
+
+    def __init__(self, max_namespaces: int, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+        self._indexes: LRUCache[tuple, _Index] = LRUCache(maxsize=max_namespaces)
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, namespace: tuple, vector: np.ndarray, threshold: float, max_age: float
+    ) -> SemanticCacheHit | None:
+        """Closest cached answer with similarity >= threshold, or None."""
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is not None:
+                index.prune(max_age)
+            if index is None or index.vectors is None:
+                self.misses += 1
+                return None
+
+            similarities = index.vectors @ _unit(vector)
+            best = int(np.argmax(similarities))
+            if similarities[best] < threshold:
+                self.misses += 1
+                return None
+
+            entry = index.entries[best]
+            self.hits += 1
+            self.latency_saved += entry.latency
+            return SemanticCacheHit(
+                value=entry.value,
+                question=entry.question,
+                similarity=float(similarities[best]),
+            )
+
+    def add(
+        self,
+        namespace: tuple,
+        question: str,
+        vector: np.ndarray,
+        value: Any,
+        latency: float,
+    ) -> None:
+        """Store an answer; latency is what a later hit saves."""
+        entry = _Entry(question, value, latency, time.monotonic())
+        row = _unit(vector)[np.newaxis, :]
+        with self._lock:
+            index = self._indexes.get_or_create(namespace, _Index)
+            if index.vectors is None:
+                index.vectors = row
+            else:
+                index.vectors = np.vstack([index.vectors, row])[-self.max_entries :]
+            index.entries = (index.entries + [entry])[-self.max_entries :]
+
+    def invalidate(self, assistant_id: str) -> int:
+        """Drop all namespaces of an assistant."""
+        with self._lock:
+            return self._indexes.pop_where(lambda key: key[0] == assistant_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and total latency saved, for the metrics endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "namespaces": len(self._indexes),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "latency_saved_seconds": self.latency_saved,
+            }
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+async def embed_question(question: str, model_name: str | None) -> np.ndarray:
+    """
+    Embed a question for the semantic cache.
+
+    Goes through the pooled, query-cached embeddings, so the vector is
+    reused by retrieval when the knowledge base uses the same model.
+    """
+    model_name = model_name or settings.DEFAULT_EMBEDDING_MODEL
+    embeddings = CachedQueryEmbeddings(get_pooled_embedding_config(model_name).dense, model_name)
+    vector = await embeddings.aembed_query(question)
+    return np.asarray(vector, dtype=np.float32)
+
+
+# Singleton instance — read by the metrics endpoint
+semantic_cache = SemanticCache(
+    max_namespaces=settings.SEMANTIC_CACHE_MAX_NAMESPACES,
+    max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+)
@@ -2,10 +2,74 @@
 Shared utilities for assistant pipelines.
 """
 
+import functools
 from typing import Any
 
+import tiktoken
 from langchain_core.documents import Document
 
+# Same encoding the chunker sizes chunks with
+CONTEXT_ENCODING = "cl100k_base"
+
+# A truncated chunk shorter than this is more noise than context
+MIN_TRUNCATED_TOKENS = 50
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding() -> tiktoken.Encoding:
+    return tiktoken.get_encoding(CONTEXT_ENCODING)
+
+
+def _document_score(doc: Document) -> float:
+    """Best available ranking score (reranker, fusion, then raw retrieval)."""
+    for key in ("relevance_score", "fusion_score", "retrieval_score"):
+        score = doc.metadata.get(key)
+        if score is not None:
+            return float(score)
+    return float("-inf")
+
+
+def pack_context(
+    documents: list[Document], max_tokens: int
+) -> tuple[list[Document], int]:
+    """
+    Select documents that fit into a context token budget.
+
+    Documents are taken greedily by score (retrieval order for ties or
+    missing scores). A document that does not fit is truncated to the
+    remaining budget if at least MIN_TRUNCATED_TOKENS remain, otherwise
+    dropped in favor of smaller lower-ranked documents.
+
+    Returns:
+        Tuple of (packed documents in their original order, tokens used).
+    """
+    encoding = _get_encoding()
+    # Stable sort, so unscored documents keep their retrieval order
+    by_score = sorted(
+        range(len(documents)), key=lambda i: _document_score(documents[i]), reverse=True
+    )
+
+    packed: dict[int, Document] = {}
+    used = 0
+    for i in by_score:
+        doc = documents[i]
+        tokens = encoding.encode(doc.page_content)
+        remaining = max_tokens - used
+        if len(tokens) <= remaining:
+            packed[i] = doc
+            used += len(tokens)
+        elif remaining >= MIN_TRUNCATED_TOKENS:
+            packed[i] = doc.model_copy(
+                update={
+                    "page_content": encoding.decode(tokens[:remaining]),
+                    "metadata": {**doc.metadata, "truncated": True},
+                }
+            )
+            used += remaining
+            break
+
+    return [packed[i] for i in sorted(packed)], used
+
 
 def format_context(documents: list[Document]) -> str:
     """Format documents as a context string for LLM prompts."""
@@ -1,13 +1,16 @@
 """
 Qdrant vector store operations.
 
-Thin helper around QdrantClient and LangChain's QdrantVectorStore.
+Thin helpers around QdrantClient. Points use LangChain's QdrantVectorStore
+layout (named dense/sparse vectors, page_content + metadata payload).
 """
 
+import asyncio
 import logging
+from collections.abc import Callable
+from typing import Any
 
 from langchain_core.documents import Document
-from langchain_qdrant import QdrantVectorStore, RetrievalMode
 from qdrant_client import QdrantClient, models
 from qdrant_client.http.models import (
     Distance,
@@ -15,10 +18,17 @@ from qdrant_client.http.models import (
     VectorParams,
 )
 
-from backend.core.embeddings import EmbeddingConfig
+from backend.config import settings
+from backend.core.embeddings import EmbeddingConfig, get_embedding_batch_size
 
 logger = logging.getLogger(__name__)
 
+# Named vectors and payload layout of every collection
+DENSE_VECTOR_NAME = "dense"
+SPARSE_VECTOR_NAME = "sparse"
+CONTENT_PAYLOAD_KEY = "page_content"
+METADATA_PAYLOAD_KEY = "metadata"
+
 # ── Distance metric mapping ──────────────────────────────
 
 _DISTANCE_MAP: dict[str, Distance] = {
@@ -39,6 +49,139 @@ def parse_distance_metric(metric_name: str) -> Distance:
     return _DISTANCE_MAP[metric_name]
 
 
+# ── Storage options ───────────────────────────────────────
+
+_QUANTIZATION_TYPES = ("scalar", "binary", "product")
+
+
+def build_quantization_config(
+    storage: dict[str, Any],
+) -> models.QuantizationConfig | None:
+    """
+    Build the Qdrant quantization config from collection storage options.
+
+    Raises:
+        ValueError: If the quantization type or product compression is invalid.
+    """
+    quantization = storage.get("quantization")
+    if not quantization:
+        return None
+    if quantization not in _QUANTIZATION_TYPES:
+        raise ValueError(
+            f"Invalid quantization: {quantization}. Supported: {list(_QUANTIZATION_TYPES)}"
+        )
+
+    # Keeping the quantized vectors in RAM is what makes on-disk originals fast
+    always_ram = storage.get("quantization_always_ram", True)
+    if quantization == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=always_ram
+            )
+        )
+    if quantization == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=always_ram)
+        )
+
+    compression = storage.get("product_compression") or "x16"
+    try:
+        ratio = models.CompressionRatio(compression)
+    except ValueError as e:
+        raise ValueError(
+            f"Invalid product compression: {compression}. "
+            f"Supported: {[r.value for r in models.CompressionRatio]}"
+        ) from e
+    return models.ProductQuantization(
+        product=models.ProductQuantizationConfig(compression=ratio, always_ram=always_ram)
+    )
+
+
+def build_hnsw_config(storage: dict[str, Any]) -> models.HnswConfigDiff | None:
+    """HNSW graph overrides; None keeps Qdrant's defaults (m=16, ef_construct=100)."""
+    m = storage.get("hnsw_m")
+    ef_construct = storage.get("hnsw_ef_construct")
+    if m is None and ef_construct is None:
+        return None
+    return models.HnswConfigDiff(m=m, ef_construct=ef_construct)
+
+
+def build_quantization_search_params(
+    storage: dict[str, Any] | None,
+) -> models.QuantizationSearchParams | None:
+    """Query-time oversampling/rescore for quantized collections, else None."""
+    if not storage or not storage.get("quantization"):
+        return None
+    return models.QuantizationSearchParams(
+        rescore=storage.get("rescore", True),
+        oversampling=storage.get("oversampling"),
+    )
+
+
+# ── Payload indexes and filters ──────────────────────────
+
+# Metadata fields with a keyword index; filtered searches and deletes on
+# these avoid a full scan of the collection
+INDEXED_PAYLOAD_FIELDS: tuple[str, ...] = (
+    "metadata.source_url",
+    "metadata.source_category",
+    "metadata.collection_name",
+)
+
+# Metadata fields accepted in retrieval filters
+FILTERABLE_METADATA_FIELDS: tuple[str, ...] = (
+    "source_url",
+    "source_category",
+    "title",
+    "collection_name",
+)
+
+
+def create_payload_indexes(client: QdrantClient, collection_name: str) -> None:
+    """Create keyword payload indexes on the filterable metadata fields (idempotent)."""
+    for field_name in INDEXED_PAYLOAD_FIELDS:
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=models.PayloadSchemaType.KEYWORD,
+        )
+    logger.info(f"Ensured payload indexes on '{collection_name}'")
+
+
+def build_metadata_filter(filters: dict[str, Any] | None) -> models.Filter | None:
+    """
+    Convert metadata filters to a Qdrant filter.
+
+    A string value must match exactly; a list value matches any of its
+    items. All fields must match.
+
+    Example:
+        {"source_category": "website", "source_url": ["https://a", "https://b"]}
+
+    Raises:
+        ValueError: If a field is not filterable or a value is not a string/list.
+    """
+    if not filters:
+        return None
+
+    conditions = []
+    for field, value in sorted(filters.items()):
+        if field not in FILTERABLE_METADATA_FIELDS:
+            raise ValueError(
+                f"Unsupported filter field: {field}. "
+                f"Supported: {list(FILTERABLE_METADATA_FIELDS)}"
+            )
+        if isinstance(value, str):
+            match = models.MatchValue(value=value)
+        elif isinstance(value, list) and all(isinstance(v, str) for v in value):
+            match = models.MatchAny(any=value)
+        else:
+            raise ValueError(f"Filter value for '{field}' must be a string or list of strings")
+        conditions.append(models.FieldCondition(key=f"metadata.{field}", match=match))
+
+    return models.Filter(must=conditions)
+
+
 # ── Collection operations ─────────────────────────────────
 
 
@@ -47,19 +190,41 @@ def create_collection(
     collection_name: str,
     embedding_dim: int,
     distance: Distance,
+    storage: dict[str, Any] | None = None,
 ) -> None:
-    """Create a Qdrant collection with dense + sparse vector config."""
+    """
+    Create a Qdrant collection with dense + sparse vector config.
+
+    Args:
+        storage: Optional storage options — quantization ("scalar", "binary"
+            or "product"), quantization_always_ram, product_compression,
+            on_disk_vectors, on_disk_payload, hnsw_m and hnsw_ef_construct.
+            Defaults to full-precision vectors in RAM.
+
+    Raises:
+        ValueError: If a storage option is invalid.
+    """
+    storage = storage or {}
+    on_disk_vectors = storage.get("on_disk_vectors", False)
     client.create_collection(
         collection_name=collection_name,
         vectors_config={
-            "dense": VectorParams(size=embedding_dim, distance=distance),
+            DENSE_VECTOR_NAME: VectorParams(
+                size=embedding_dim,
+                distance=distance,
+                on_disk=on_disk_vectors,
+                hnsw_config=build_hnsw_config(storage),
+                quantization_config=build_quantization_config(storage),
+            ),
         },
         sparse_vectors_config={
-            "sparse": SparseVectorParams(
-                index=models.SparseIndexParams(on_disk=False),
+            SPARSE_VECTOR_NAME: SparseVectorParams(
+                index=models.SparseIndexParams(on_disk=on_disk_vectors),
             ),
         },
+        on_disk_payload=storage.get("on_disk_payload", False),
     )
+    create_payload_indexes(client, collection_name)
     logger.info(f"Created Qdrant collection: {collection_name}")
 
 
@@ -84,24 +249,38 @@ def list_collection_names(client: QdrantClient) -> list[str]:
 # ── Document operations ───────────────────────────────────
 
 
-def store_documents(
+async def store_documents(
     client: QdrantClient,
     collection_name: str,
     chunks: list[Document],
     chunk_ids: list[str],
     embedding_config: EmbeddingConfig,
-    batch_size: int = 10,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+    on_progress: Callable[[int], None] | None = None,
+    wait: bool = True,
 ) -> int:
     """
     Embed and store document chunks in Qdrant.
 
+    Batches are embedded concurrently, with up to ``concurrency`` embedding
+    requests in flight, and upserted without waiting for Qdrant to apply
+    them. The last batch is upserted only after all others, with wait=True:
+    Qdrant applies a collection's updates in order, so once it returns every
+    point is stored.
+
     Args:
         client: Qdrant client instance.
         collection_name: Target collection.
         chunks: LangChain Document objects to embed and store.
         chunk_ids: UUIDs for each chunk (must match len(chunks)).
         embedding_config: Dense + sparse embedding models.
-        batch_size: Number of chunks per batch.
+        batch_size: Chunks per embedding request (default: per provider).
+        concurrency: Embedding requests in flight (default: settings).
+        on_progress: Optional callback(stored) after each upserted batch.
+        wait: Wait for the points to be applied. With False the last batch
+            is queued too; a later wait=True upsert to the collection acts
+            as the barrier.
 
     Returns:
         Number of chunks stored.
@@ -110,20 +289,64 @@ def store_documents(
         logger.warning("No chunks to store")
         return 0
 
-    vector_store = QdrantVectorStore(
-        client=client,
-        collection_name=collection_name,
-        embedding=embedding_config.dense,
-        sparse_embedding=embedding_config.sparse,
-        retrieval_mode=RetrievalMode.HYBRID,
-        vector_name="dense",
-        sparse_vector_name="sparse",
-    )
+    batch_size = batch_size or get_embedding_batch_size(embedding_config.provider)
+    semaphore = asyncio.Semaphore(concurrency or settings.EMBEDDING_CONCURRENCY)
+    stored = 0
+
+    async def embed_batch(start: int) -> list[models.PointStruct]:
+        batch = chunks[start : start + batch_size]
+        texts = [chunk.page_content for chunk in batch]
+
+        async with semaphore:
+            # Sparse (FastEmbed) is CPU-bound and sync-only — run it in a thread
+            dense, sparse = await asyncio.gather(
+                embedding_config.dense.aembed_documents(texts),
+                asyncio.to_thread(embedding_config.sparse.embed_documents, texts),
+            )
+
+        return [
+            models.PointStruct(
+                id=point_id,
+                vector={
+                    DENSE_VECTOR_NAME: dense_vector,
+                    SPARSE_VECTOR_NAME: models.SparseVector(
+                        indices=sparse_vector.indices, values=sparse_vector.values
+                    ),
+                },
+                payload={
+                    CONTENT_PAYLOAD_KEY: chunk.page_content,
+                    METADATA_PAYLOAD_KEY: chunk.metadata,
+                },
+            )
+            for point_id, chunk, dense_vector, sparse_vector in zip(
+                chunk_ids[start : start + batch_size], batch, dense, sparse, strict=True
+            )
+        ]
+
+    async def upsert(points: list[models.PointStruct], wait: bool) -> None:
+        nonlocal stored
+        await asyncio.to_thread(
+            client.upsert, collection_name=collection_name, points=points, wait=wait
+        )
+        stored += len(points)
+        if on_progress:
+            on_progress(stored)
 
-    for i in range(0, len(chunks), batch_size):
-        batch_chunks = chunks[i : i + batch_size]
-        batch_ids = chunk_ids[i : i + batch_size]
-        vector_store.add_documents(documents=batch_chunks, ids=batch_ids)
+    async def store_batch(start: int) -> None:
+        # Queued, not applied — embedding of the next batches goes on meanwhile
+        await upsert(await embed_batch(start), wait=False)
+
+    *starts, last_start = range(0, len(chunks), batch_size)
+    try:
+        async with asyncio.TaskGroup() as batches:
+            for start in starts:
+                batches.create_task(store_batch(start))
+            last_batch = batches.create_task(embed_batch(last_start))
+    except ExceptionGroup as group:
+        raise group.exceptions[0] from None
+
+    # Every other upsert is queued by now, so this one is applied last
+    await upsert(last_batch.result(), wait=wait)
 
     logger.info(f"Stored {len(chunks)} chunks in Qdrant collection '{collection_name}'")
     return len(chunks)
@@ -135,18 +358,19 @@ def delete_documents_by_urls(
     urls: list[str],
 ) -> None:
     """Delete all points matching the given source URLs."""
-    for url in urls:
-        client.delete(
-            collection_name=collection_name,
-            points_selector=models.FilterSelector(
-                filter=models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="metadata.source_url",
-                            match=models.MatchValue(value=url),
-                        ),
-                    ],
-                )
-            ),
-        )
+    if not urls:
+        return
+    # One filtered delete, served by the metadata.source_url index
+    client.delete(
+        collection_name=collection_name,
+        points_selector=models.FilterSelector(
+            filter=models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="metadata.source_url", match=models.MatchAny(any=list(urls))
+                    )
+                ]
+            )
+        ),
+    )
     logger.info(f"Deleted documents for {len(urls)} URLs from '{collection_name}'")
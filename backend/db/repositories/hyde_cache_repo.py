@@ -0,0 +1,40 @@
+"""
+Repository for persisted HyDE hypothetical documents.
+"""
+
+import logging
+from datetime import UTC, datetime
+
+from backend.db.mongodb import MongoDBClient
+
+logger = logging.getLogger(__name__)
+
+HYDE_CACHE_COLLECTION = "hyde_cache"
+
+
+class HydeCacheRepository:
+    """Repository for the MongoDB tier of the HyDE document cache."""
+
+    def __init__(self, db: MongoDBClient, ttl_seconds: int):
+        self.collection = db.get_collection(HYDE_CACHE_COLLECTION)
+        # MongoDB's TTL monitor evicts expired entries for us
+        self.collection.create_index("created_at", expireAfterSeconds=ttl_seconds)
+
+    def find(self, key: str) -> str | None:
+        """Get a cached hypothetical document by cache key."""
+        doc = self.collection.find_one({"_id": key}, {"document": 1})
+        return doc["document"] if doc else None
+
+    def upsert(self, key: str, document: str, model: str) -> None:
+        """Store or refresh a hypothetical document."""
+        self.collection.update_one(
+            {"_id": key},
+            {
+                "$set": {
+                    "document": document,
+                    "model": model,
+                    "created_at": datetime.now(UTC),
+                }
+            },
+            upsert=True,
+        )
@@ -36,6 +36,14 @@ class KnowledgeBaseRepository:
         config["_id"] = str(config["_id"])
         return config
 
+    def list_collection_configs(self) -> list[dict]:
+        """Get the configuration documents of all collections."""
+        collection = self.db.get_collection(CONFIGURATIONS_COLLECTION)
+        configs = list(collection.find({}))
+        for config in configs:
+            config["_id"] = str(config["_id"])
+        return configs
+
     def list_collection_names(self) -> list[str]:
         """List all collection names from Qdrant."""
         response = self.qdrant.get_collections()
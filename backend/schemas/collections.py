@@ -7,6 +7,21 @@ from pydantic import BaseModel, Field
 # ── Collection CRUD ───────────────────────────────────────
 
 
+class CollectionStorageOptions(BaseModel):
+    """Vector storage and index options, fixed at collection creation."""
+
+    quantization: str | None = None  # "scalar", "binary" or "product"
+    quantization_always_ram: bool = True
+    product_compression: str = "x16"  # "x4" to "x64", product quantization only
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    hnsw_m: int | None = Field(default=None, ge=0)
+    hnsw_ef_construct: int | None = Field(default=None, ge=4)
+    # Query time: rescore oversampled quantized hits with the original vectors
+    oversampling: float | None = Field(default=None, ge=1.0)
+    rescore: bool = True
+
+
 class CollectionCreateRequest(BaseModel):
     collection_name: str
     description: str = ""
@@ -14,6 +29,7 @@ class CollectionCreateRequest(BaseModel):
     chunk_size: int = 1000
     chunk_overlap: int = 100
     distance_metric: str = "Cosine similarity"
+    storage: CollectionStorageOptions = Field(default_factory=CollectionStorageOptions)
 
 
 class CollectionUpdateRequest(BaseModel):
@@ -31,6 +47,7 @@ class CollectionConfigResponse(BaseModel):
     chunk_size: int
     chunk_overlap: int
     distance_metric: str
+    storage: CollectionStorageOptions = Field(default_factory=CollectionStorageOptions)
     created_at: str
     updated_at: str
 
@@ -39,6 +56,46 @@ class CollectionListResponse(BaseModel):
     collection_names: list[str]
 
 
+# ── Search tuning ─────────────────────────────────────────
+
+
+class SearchParamsCandidate(BaseModel):
+    """Dense search settings to benchmark (matches the QA assistant knobs)."""
+
+    hnsw_ef: int | None = Field(default=None, ge=1)
+    exact: bool = False
+    rescore: bool | None = None
+
+
+def _default_search_candidates() -> list[SearchParamsCandidate]:
+    return [SearchParamsCandidate(hnsw_ef=ef) for ef in (16, 32, 64, 128, 256)]
+
+
+class SearchBenchmarkRequest(BaseModel):
+    queries: list[str] = Field(default_factory=list)  # Sampled from the collection if empty
+    sample_size: int = Field(default=20, ge=1, le=500)
+    k: int = Field(default=10, ge=1, le=100)
+    min_recall: float = Field(default=0.95, ge=0.0, le=1.0)
+    candidates: list[SearchParamsCandidate] = Field(
+        default_factory=_default_search_candidates, min_length=1
+    )
+
+
+class SearchBenchmarkResult(SearchParamsCandidate):
+    recall_at_k: float
+    mean_latency_ms: float
+    p95_latency_ms: float
+
+
+class SearchBenchmarkResponse(BaseModel):
+    collection_name: str
+    k: int
+    num_queries: int
+    results: list[SearchBenchmarkResult]
+    # Fastest candidate meeting min_recall, if any
+    recommended: SearchParamsCandidate | None = None
+
+
 # ── Document / Source management ──────────────────────────
 
 
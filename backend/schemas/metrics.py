@@ -0,0 +1,27 @@
+"""
+Pydantic schemas for runtime metrics endpoints.
+"""
+
+from pydantic import BaseModel
+
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    maxsize: int
+    ttl: float | None = None
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+
+class CacheStatsListResponse(BaseModel):
+    caches: dict[str, CacheStatsResponse]
+
+
+class SemanticCacheStatsResponse(BaseModel):
+    namespaces: int
+    hits: int
+    misses: int
+    hit_ratio: float
+    latency_saved_seconds: float
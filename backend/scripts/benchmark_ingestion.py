@@ -0,0 +1,83 @@
+"""Benchmark: embedding + Qdrant upsert throughput (chunks/sec) of store_documents."""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from langchain_core.documents import Document
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance
+
+from backend.config import settings
+from backend.core.embeddings import get_embedding_batch_size, get_embedding_config
+from backend.db import qdrant as qdrant_ops
+
+_TEXT = (
+    "Lume ingests websites and files, splits them into chunks and stores dense "
+    "and sparse embeddings in Qdrant for hybrid retrieval. "
+)
+
+
+def _synthetic_chunks(count: int) -> list[Document]:
+    return [
+        Document(
+            page_content=f"Chunk {i}. " + _TEXT * 4,
+            metadata={"source_url": f"https://benchmark.local/{i // 10}", "title": "Benchmark"},
+        )
+        for i in range(count)
+    ]
+
+
+async def _run(args: argparse.Namespace) -> None:
+    client = QdrantClient(url=settings.qdrant_url)
+    embedding_config = get_embedding_config(args.model)
+    chunks = _synthetic_chunks(args.chunks)
+
+    # (label, batch size, concurrency) — the first is the former serial path
+    runs = [
+        ("serial, batches of 10", 10, 1),
+        (
+            f"batches of {args.batch_size or get_embedding_batch_size(embedding_config.provider)}, "
+            f"{args.concurrency} in flight",
+            args.batch_size,
+            args.concurrency,
+        ),
+    ]
+
+    for label, batch_size, concurrency in runs:
+        collection_name = f"_benchmark_{uuid4().hex[:8]}"
+        qdrant_ops.create_collection(
+            client, collection_name, embedding_config.dimension, Distance.COSINE
+        )
+        try:
+            ids = [str(uuid4()) for _ in chunks]
+            start = time.perf_counter()
+            await qdrant_ops.store_documents(
+                client,
+                collection_name,
+                chunks,
+                ids,
+                embedding_config,
+                batch_size=batch_size,
+                concurrency=concurrency,
+            )
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label:<40} {len(chunks)} chunks in {elapsed:6.1f}s "
+                f"= {len(chunks) / elapsed:8.1f} chunks/sec"
+            )
+        finally:
+            qdrant_ops.delete_collection(client, collection_name)
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=settings.DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=None, help="Default: per provider")
+    parser.add_argument("--concurrency", type=int, default=settings.EMBEDDING_CONCURRENCY)
+    asyncio.run(_run(parser.parse_args()))
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,17 @@
+"""Migration: add metadata payload indexes to existing Qdrant collections."""
+
+from qdrant_client import QdrantClient
+
+from backend.config import settings
+from backend.db import qdrant as qdrant_ops
+
+
+def migrate():
+    client = QdrantClient(url=settings.qdrant_url)
+    names = qdrant_ops.list_collection_names(client)
+    for name in names:
+        qdrant_ops.create_payload_indexes(client, name)
+    print(f"Payload indexes ensured on {len(names)} collections")
+
+if __name__ == "__main__":
+    migrate()
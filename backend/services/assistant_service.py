@@ -4,15 +4,27 @@ Service layer for assistant business logic
 
 import logging
 import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
 from typing import Any
 
+import numpy as np
+
 from backend.app.exceptions import (
     AssistantInactiveError,
     AssistantNotFoundError,
     AssistantValidationError,
 )
+from backend.core.answer_cache import (
+    answer_cache_key,
+    cache_answer,
+    get_cached_answer,
+    invalidate_assistant_answers,
+)
 from backend.core.assistants.base import BaseAssistant
 from backend.core.assistants.registry import AssistantRegistry
+from backend.core.generator import invalidate_compiled_chains
+from backend.core.semantic_cache import embed_question, semantic_cache
 from backend.db.repositories.assistant_repo import AssistantRepository
 from backend.schemas.assistant import (
     AssistantCreateRequest,
@@ -23,6 +35,23 @@ from backend.schemas.assistant import (
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _AnswerLookup:
+    """Where an execution's answer is cached, and the cached value if found."""
+
+    key: tuple | None = None  # Exact answer cache
+    namespace: tuple | None = None  # Semantic cache
+    question: str | None = None
+    vector: np.ndarray | None = None
+    value: Any = None
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+def _retrieval_complete(metadata: dict[str, Any]) -> bool:
+    """False if the answer was built from partial retrieval; it must not be reused."""
+    return metadata.get("retrieval_complete", True)
+
+
 class AssistantService:
     """Service for managing and executing assistants"""
 
@@ -57,6 +86,9 @@ class AssistantService:
         if request.config is not None:
             self._validate_config(existing.type, request.config)
         self._clear_instance_cache(assistant_id)
+        self._invalidate_compiled_chains(existing)
+        invalidate_assistant_answers(assistant_id)
+        semantic_cache.invalidate(assistant_id)
         result = self.repo.update(assistant_id, request.model_dump(exclude_unset=True))
         if not result:
             raise AssistantNotFoundError(assistant_id)
@@ -64,6 +96,8 @@ class AssistantService:
 
     def delete(self, assistant_id: str) -> bool:
         self._clear_instance_cache(assistant_id)
+        invalidate_assistant_answers(assistant_id)
+        semantic_cache.invalidate(assistant_id)
         if not self.repo.delete(assistant_id):
             raise AssistantNotFoundError(assistant_id)
         return True
@@ -97,6 +131,22 @@ class AssistantService:
             assistant_id, input_data
         )
 
+        lookup = await self._lookup_answer(
+            assistant_id, config, validated_input, stream=False
+        )
+        if lookup.value is not None:
+            logger.info(f"Assistant {assistant_id} answered from cache")
+            cached = lookup.value
+            return {
+                "status": "completed",
+                "output": {
+                    **cached,
+                    "metadata": {**cached.get("metadata", {}), **lookup.metadata},
+                },
+                "execution_time": time.time() - start_time,
+                "error": None,
+            }
+
         # Non-streaming: collect the single yielded output
         result = None
         async for output in instance.execute(config, validated_input, stream=False):
@@ -105,20 +155,46 @@ class AssistantService:
         execution_time = time.time() - start_time
         logger.info(f"Assistant {assistant_id} executed in {execution_time:.2f}s")
 
+        output = result.model_dump() if result else {}
+        if result and _retrieval_complete(output.get("metadata", {})):
+            self._store_answer(lookup, output, execution_time)
+
         return {
             "status": "completed",
-            "output": result.model_dump() if result else {},
+            "output": output,
             "execution_time": execution_time,
             "error": None,
         }
 
     async def execute_stream(self, assistant_id: str, input_data: dict[str, Any]):
+        start_time = time.time()
+
         instance, config, validated_input = self._prepare_execution(
             assistant_id, input_data
         )
 
-        async for chunk in instance.execute(config, validated_input, stream=True):
-            yield chunk
+        lookup = await self._lookup_answer(
+            assistant_id, config, validated_input, stream=True
+        )
+        if lookup.value is not None:
+            logger.info(f"Assistant {assistant_id} answered from cache")
+            for chunk in lookup.value:
+                yield chunk
+            return
+
+        # aclosing propagates an early close (client gone) down to the LLM stream
+        recorded = []
+        async with aclosing(
+            instance.execute(config, validated_input, stream=True)
+        ) as chunks:
+            async for chunk in chunks:
+                recorded.append(chunk)
+                yield chunk
+
+        # Only reached when the stream ran to completion
+        final = recorded[-1] if recorded and isinstance(recorded[-1], dict) else {}
+        if _retrieval_complete(final):
+            self._store_answer(lookup, recorded, time.time() - start_time)
 
     # ── Schema / Type queries ─────────────────────────────
 
@@ -162,3 +238,69 @@ class AssistantService:
 
     def _clear_instance_cache(self, assistant_id: str) -> None:
         self._instance_cache.pop(assistant_id, None)
+
+    async def _lookup_answer(
+        self, assistant_id: str, config, validated_input, stream: bool
+    ) -> _AnswerLookup:
+        """Look the execution up in the answer caches the assistant opted into."""
+        lookup = _AnswerLookup()
+
+        if getattr(config, "answer_cache", False):
+            lookup.key = answer_cache_key(
+                assistant_id, config.model_dump(), validated_input.model_dump(), stream
+            )
+            lookup.value = get_cached_answer(lookup.key)
+            if lookup.value is not None:
+                lookup.metadata = {"cached": True}
+                return lookup
+
+        question = getattr(validated_input, "question", None)
+        if not getattr(config, "semantic_cache", False) or not isinstance(question, str):
+            return lookup
+
+        try:
+            vector = await embed_question(
+                question, config.semantic_cache_embedding_model
+            )
+        except Exception as e:
+            # The cache is an optimization — answer normally without it
+            logger.warning(f"Skipping semantic cache for assistant {assistant_id}: {e}")
+            return lookup
+
+        # Everything but the question must match exactly
+        other_inputs = validated_input.model_dump(exclude={"question"})
+        lookup.namespace = answer_cache_key(
+            assistant_id, config.model_dump(), other_inputs, stream
+        )
+        lookup.question, lookup.vector = question, vector
+
+        hit = semantic_cache.lookup(
+            lookup.namespace,
+            vector,
+            threshold=config.semantic_cache_threshold,
+            max_age=config.semantic_cache_max_age,
+        )
+        if hit:
+            lookup.value = hit.value
+            lookup.metadata = {
+                "cached": True,
+                "cached_question": hit.question,
+                "similarity": hit.similarity,
+            }
+        return lookup
+
+    def _store_answer(self, lookup: _AnswerLookup, value: Any, latency: float) -> None:
+        if lookup.key:
+            cache_answer(lookup.key, value)
+        if lookup.namespace and lookup.question and lookup.vector is not None:
+            semantic_cache.add(
+                lookup.namespace, lookup.question, lookup.vector, value, latency
+            )
+
+    def _invalidate_compiled_chains(self, assistant: AssistantResponse) -> None:
+        config = (
+            assistant.config
+            if isinstance(assistant.config, dict)
+            else assistant.config.model_dump()
+        )
+        invalidate_compiled_chains(config)
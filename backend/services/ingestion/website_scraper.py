@@ -5,12 +5,17 @@ Website scraping service — extracts markdown content from URLs.
 import asyncio
 import hashlib
 import logging
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from datetime import datetime
+from urllib.parse import urlparse
 
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
 from crawl4ai.content_filter_strategy import PruningContentFilter
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 
+from backend.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,72 +38,184 @@ def _content_hash(content: str) -> str:
     return hashlib.md5(content.encode("utf-8")).hexdigest()
 
 
+def _build_document(url: str, result, collection_name: str) -> dict:
+    """Document dict for MongoDB from a successful crawl result."""
+    markdown_content = result.markdown.fit_markdown
+    return {
+        "url": url,
+        "markdown": markdown_content,
+        "title": result.metadata.get("title", "Untitled"),
+        "description": result.metadata.get("description", ""),
+        "source_category": "website",
+        "collection_name": collection_name,
+        "timestamp": datetime.now().isoformat(),
+        "hash": _content_hash(markdown_content),
+        "metadata": {
+            "status_code": result.status_code,
+            "content_type": result.metadata.get("content_type", "text/html"),
+        },
+    }
+
+
+def _is_retryable(result) -> bool:
+    """Transient failures: no response, rate limiting or a server error."""
+    status_code = getattr(result, "status_code", None)
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+class _DomainLimiter:
+    """Caps concurrent requests to one domain and spaces out their starts."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait_turn(self) -> None:
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+async def iter_scrape_urls(
+    urls: list[str],
+    collection_name: str,
+    concurrency: int | None = None,
+    per_domain_concurrency: int | None = None,
+    politeness_delay: float | None = None,
+    max_retries: int | None = None,
+) -> AsyncGenerator[tuple[str, dict | None, str | None], None]:
+    """
+    Scrape URLs concurrently, yielding each result as soon as it finishes.
+
+    Requests share one browser. At most ``concurrency`` URLs are being
+    crawled or waiting to be consumed at once, so a slow consumer holds
+    back the crawl. At most ``per_domain_concurrency`` requests run per
+    domain, and requests to the same domain start at least
+    ``politeness_delay`` seconds apart. Exceptions and transient failures
+    (no response, 429, 5xx) are retried with exponential backoff. Unset
+    limits come from settings. Closing the iterator cancels the crawls
+    still running.
+
+    Yields:
+        (url, document dict or None, error message or None), in completion order.
+    """
+    concurrency = concurrency or settings.SCRAPE_CONCURRENCY
+    per_domain_concurrency = per_domain_concurrency or settings.SCRAPE_PER_DOMAIN_CONCURRENCY
+    if politeness_delay is None:
+        politeness_delay = settings.SCRAPE_POLITENESS_DELAY
+    if max_retries is None:
+        max_retries = settings.SCRAPE_MAX_RETRIES
+
+    config = _get_crawler_config()
+    domains: dict[str, _DomainLimiter] = {}
+
+    async def crawl(crawler: AsyncWebCrawler, idx: int, url: str):
+        domain = urlparse(url).netloc
+        if domain not in domains:
+            domains[domain] = _DomainLimiter(per_domain_concurrency, politeness_delay)
+        limiter = domains[domain]
+
+        error = None
+        for attempt in range(max_retries + 1):
+            if attempt:
+                backoff = settings.SCRAPE_RETRY_BACKOFF * 2 ** (attempt - 1)
+                logger.info(f"Retrying {url} in {backoff:.1f}s (attempt {attempt + 1})")
+                await asyncio.sleep(backoff)
+
+            async with limiter.semaphore:
+                await limiter.wait_turn()
+                logger.info(f"[{idx}/{len(urls)}] Crawling: {url}")
+                try:
+                    result = await crawler.arun(url, config=config)
+                except Exception as e:
+                    logger.error(f"Error crawling {url}: {e}")
+                    error = str(e)
+                    continue
+
+            if result.success and result.markdown:
+                logger.info(f"Successfully crawled: {url}")
+                return url, _build_document(url, result, collection_name), None
+
+            error = getattr(result, "error_message", None) or "Unknown error"
+            logger.error(f"Failed to crawl {url}: {error}")
+            if not _is_retryable(result):
+                break
+
+        return url, None, error
+
+    # A URL holds its slot from the start of its crawl until the consumer
+    # has taken the result, so finished pages never pile up in memory
+    slots = asyncio.Semaphore(concurrency)
+    finished: asyncio.Queue[asyncio.Task] = asyncio.Queue()
+    tasks: list[asyncio.Task] = []
+
+    async with AsyncWebCrawler() as crawler:
+
+        async def launch() -> None:
+            for idx, url in enumerate(urls, 1):
+                await slots.acquire()
+                task = asyncio.create_task(crawl(crawler, idx, url))
+                task.add_done_callback(finished.put_nowait)
+                tasks.append(task)
+
+        launcher = asyncio.create_task(launch())
+        try:
+            for _ in urls:
+                yield (await finished.get()).result()
+                slots.release()
+        finally:
+            launcher.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(launcher, *tasks, return_exceptions=True)
+
+
 async def scrape_urls(
     urls: list[str],
     collection_name: str,
     on_progress: callable = None,
+    **limits,
 ) -> tuple[list[dict], list[str], list[dict]]:
     """
-    Scrape a list of URLs and return structured document dicts.
+    Scrape a list of URLs concurrently and return structured document dicts.
 
     Args:
         urls: URLs to scrape.
         collection_name: Target collection name (stored in document metadata).
-        on_progress: Optional callback(index, total, url) for progress updates.
+        on_progress: Optional callback(index, total, url), called as each
+            URL finishes (index counts finished URLs).
+        **limits: Crawl limits passed to iter_scrape_urls (concurrency,
+            per_domain_concurrency, politeness_delay, max_retries).
 
     Returns:
-        Tuple of:
+        Tuple of (in the order of ``urls``):
         - scraped_documents: List of document dicts ready for MongoDB
         - processed_urls: Successfully scraped URLs
         - failed_urls: List of {"url": ..., "error": ...} dicts
     """
-    scraped_documents = []
-    processed_urls = []
-    failed_urls = []
-
-    config = _get_crawler_config()
-
-    async with AsyncWebCrawler() as crawler:
-        for idx, url in enumerate(urls, 1):
-            try:
-                logger.info(f"[{idx}/{len(urls)}] Crawling: {url}")
-
-                if on_progress:
-                    on_progress(idx, len(urls), url)
-
-                result = await crawler.arun(url, config=config)
-
-                if result.success and result.markdown:
-                    markdown_content = result.markdown.fit_markdown
-                    doc = {
-                        "url": url,
-                        "markdown": markdown_content,
-                        "title": result.metadata.get("title", "Untitled"),
-                        "description": result.metadata.get("description", ""),
-                        "source_category": "website",
-                        "collection_name": collection_name,
-                        "timestamp": datetime.now().isoformat(),
-                        "hash": _content_hash(markdown_content),
-                        "metadata": {
-                            "status_code": result.status_code,
-                            "content_type": result.metadata.get(
-                                "content_type", "text/html"
-                            ),
-                        },
-                    }
-                    scraped_documents.append(doc)
-                    processed_urls.append(url)
-                    logger.info(f"Successfully crawled: {url}")
-                else:
-                    error_msg = getattr(result, "error_message", "Unknown error")
-                    logger.error(f"Failed to crawl {url}: {error_msg}")
-                    failed_urls.append({"url": url, "error": error_msg})
-
-            except Exception as e:
-                logger.error(f"Error crawling {url}: {e}")
-                failed_urls.append({"url": url, "error": str(e)})
-
-            await asyncio.sleep(0.1)
+    documents: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+
+    pages = iter_scrape_urls(urls, collection_name, **limits)
+    async with aclosing(pages):
+        finished = 0
+        async for url, doc, error in pages:
+            finished += 1
+            if doc is not None:
+                documents[url] = doc
+            else:
+                errors[url] = error or "Unknown error"
+            if on_progress:
+                on_progress(finished, len(urls), url)
+
+    scraped_documents = [documents[url] for url in urls if url in documents]
+    processed_urls = [doc["url"] for doc in scraped_documents]
+    failed_urls = [{"url": url, "error": errors[url]} for url in urls if url in errors]
 
     if not scraped_documents:
         raise RuntimeError("No documents were successfully crawled")
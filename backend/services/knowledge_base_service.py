@@ -6,6 +6,7 @@ import asyncio
 import logging
 import mimetypes
 import os
+from contextlib import aclosing
 from uuid import uuid4
 
 from backend.app.exceptions import (
@@ -13,8 +14,18 @@ from backend.app.exceptions import (
     CollectionNotFoundError,
     UnsupportedEmbeddingModelError,
 )
+from backend.config import settings
 from backend.core.chunking import chunk_documents
-from backend.core.embeddings import get_embedding_config, get_embedding_dimension
+from backend.core.embeddings import (
+    get_embedding_config,
+    get_embedding_dimension,
+)
+from backend.core.retriever import (
+    SearchOptions,
+    benchmark_search_params,
+    bump_collection_version,
+    invalidate_collection,
+)
 from backend.db import qdrant as qdrant_ops
 from backend.db.repositories.knowledge_base_repo import KnowledgeBaseRepository
 from backend.services.ingestion import file_parser, website_scraper
@@ -49,8 +60,10 @@ class KnowledgeBaseService:
         chunk_size: int,
         chunk_overlap: int,
         distance_metric: str,
+        storage: dict | None = None,
     ) -> dict:
         """Create a new collection in both Qdrant and MongoDB."""
+        storage = storage or {}
 
         # Validate embedding model
         try:
@@ -64,6 +77,12 @@ class KnowledgeBaseService:
         except ValueError as e:
             raise CollectionConfigError(str(e)) from e
 
+        # Validate storage options
+        try:
+            qdrant_ops.build_quantization_config(storage)
+        except ValueError as e:
+            raise CollectionConfigError(str(e)) from e
+
         # Create Qdrant collection
         try:
             qdrant_ops.create_collection(
@@ -71,6 +90,7 @@ class KnowledgeBaseService:
                 collection_name=collection_name,
                 embedding_dim=dimension,
                 distance=distance,
+                storage=storage,
             )
         except Exception as e:
             raise CollectionConfigError(
@@ -89,6 +109,7 @@ class KnowledgeBaseService:
                     "chunk_size": chunk_size,
                     "chunk_overlap": chunk_overlap,
                     "distance_metric": distance_metric,
+                    "storage": storage,
                 }
             )
         except Exception as e:
@@ -99,8 +120,47 @@ class KnowledgeBaseService:
                 logger.error(f"Failed to rollback Qdrant collection: {collection_name}")
             raise CollectionConfigError(f"Failed to save collection config: {e}") from e
 
+        # A previous collection with this name may still be cached; only now
+        # that the config is saved can a query no longer cache a stale one
+        invalidate_collection(collection_name)
+
         return config
 
+    async def benchmark_search(
+        self,
+        collection_name: str,
+        candidates: list[dict],
+        queries: list[str],
+        sample_size: int,
+        k: int,
+        min_recall: float,
+    ) -> dict:
+        """
+        Compare dense search settings by recall@k against exact search.
+
+        Recommends the fastest setting whose recall is at least min_recall.
+        """
+        if not self.repo.get_collection_config(collection_name):
+            raise CollectionNotFoundError(collection_name)
+
+        num_queries, results = await benchmark_search_params(
+            collection_name,
+            [SearchOptions(hybrid=False, top_k=k, **c) for c in candidates],
+            queries=queries,
+            sample_size=sample_size,
+            k=k,
+        )
+
+        passing = [r for r in results if r["recall_at_k"] >= min_recall]
+        recommended = min(passing, key=lambda r: r["mean_latency_ms"], default=None)
+        return {
+            "collection_name": collection_name,
+            "k": k,
+            "num_queries": num_queries,
+            "results": results,
+            "recommended": recommended,
+        }
+
     def update_collection(
         self, collection_name: str, description: str | None = None
     ) -> None:
@@ -119,6 +179,8 @@ class KnowledgeBaseService:
     def delete_collection(self, collection_name: str) -> None:
         """Delete a collection from Qdrant, MongoDB, and disk."""
 
+        invalidate_collection(collection_name)
+
         # Delete files on disk
         file_parser.delete_collection_files(collection_name)
 
@@ -193,7 +255,7 @@ class KnowledgeBaseService:
         urls: list[str],
         collection_config: dict,
     ) -> None:
-        """Background task: scrape → chunk → embed → store."""
+        """Background task: scrape → chunk → embed → store, page by page."""
         try:
             # Filter out existing URLs
             existing_urls = self.repo.get_document_urls(collection_name)
@@ -215,42 +277,14 @@ class KnowledgeBaseService:
                 )
                 return
 
-            # Stage 1: Scrape
-            self.progress.advance_to_stage(task_id, 0)
-            self.progress.update_stage(task_id, 0, total=len(new_urls))
-
-            def on_scrape_progress(idx, total, url):
-                self.progress.update_stage(task_id, 0, current=idx, current_item=url)
-                self.progress.update_message(task_id, f"Crawling {idx}/{total}...")
-
-            scraped_docs, processed_urls, failed = await website_scraper.scrape_urls(
-                new_urls, collection_name, on_progress=on_scrape_progress
-            )
-
-            # Save raw documents to MongoDB
-            self.repo.insert_documents(collection_name, scraped_docs)
-
-            # Stage 2: Chunk
-            self.progress.advance_to_stage(task_id, 1)
-            self.progress.update_stage(task_id, 1, total=len(scraped_docs))
-
-            chunks, chunk_ids = chunk_documents(
-                scraped_docs,
-                chunk_size=collection_config.get("chunk_size", 1000),
-                chunk_overlap=collection_config.get("chunk_overlap", 100),
-            )
-
-            # Stage 3: Embed and store
-            self.progress.advance_to_stage(task_id, 2)
-            self.progress.update_stage(task_id, 2, total=len(chunks))
-
-            embedding_config = get_embedding_config(
-                collection_config["dense_embedding_model"]
-            )
-
-            await self._store_chunks_with_progress(
-                task_id, 2, collection_name, chunks, chunk_ids, embedding_config
+            processed_urls, failed, chunk_count = await self._run_website_pipeline(
+                task_id, collection_name, new_urls, collection_config
             )
+            if not processed_urls:
+                self.progress.fail(
+                    task_id, "Processing Failed", "No documents were successfully crawled"
+                )
+                return
 
             # Complete
             stats = [
@@ -259,7 +293,7 @@ class KnowledgeBaseService:
                     "value": len(processed_urls),
                     "variant": "success",
                 },
-                {"label": "Chunks Created", "value": len(chunks), "variant": "info"},
+                {"label": "Chunks Created", "value": chunk_count, "variant": "info"},
             ]
             if skipped_count:
                 stats.append(
@@ -286,6 +320,157 @@ class KnowledgeBaseService:
             logger.error(f"Website upload failed: {e}", exc_info=True)
             self.progress.fail(task_id, "Processing Failed", str(e))
 
+    async def _run_website_pipeline(
+        self,
+        task_id: str,
+        collection_name: str,
+        urls: list[str],
+        collection_config: dict,
+    ) -> tuple[list[str], list[dict], int]:
+        """
+        Stream pages through crawl → chunk → embed and store.
+
+        The stages run concurrently, connected by bounded queues: pages are
+        chunked while the crawl goes on, embedding starts with the first
+        chunks, and a slow stage holds back the earlier ones instead of
+        the whole site piling up in memory.
+
+        Returns:
+            (processed URLs, failed {"url", "error"} dicts, chunks stored)
+        """
+        pages: asyncio.Queue = asyncio.Queue(maxsize=settings.INGESTION_QUEUE_SIZE)
+        chunk_batches: asyncio.Queue = asyncio.Queue(
+            maxsize=settings.INGESTION_QUEUE_SIZE
+        )
+        processed_urls: list[str] = []
+        failed: list[dict] = []
+        counts = {"crawled": 0, "chunked": 0, "chunks": 0, "stored": 0}
+
+        def report() -> None:
+            self.progress.update_message(
+                task_id,
+                f"Crawled {counts['crawled']}/{len(urls)} pages, "
+                f"embedded {counts['stored']}/{counts['chunks']} chunks...",
+            )
+
+        async def crawl() -> None:
+            self.progress.update_stage(task_id, 0, total=len(urls), is_current=True)
+            results = website_scraper.iter_scrape_urls(urls, collection_name)
+            async with aclosing(results):
+                async for url, doc, error in results:
+                    counts["crawled"] += 1
+                    self.progress.update_stage(
+                        task_id, 0, current=counts["crawled"], current_item=url
+                    )
+                    report()
+                    if doc is None:
+                        failed.append({"url": url, "error": error})
+                        continue
+                    await asyncio.to_thread(
+                        self.repo.insert_documents, collection_name, [doc]
+                    )
+                    processed_urls.append(url)
+                    await pages.put(doc)
+
+            self.progress.update_stage(task_id, 1, total=len(processed_urls))
+            self.progress.update_stage(task_id, 0, is_current=False)
+            await pages.put(None)
+
+        async def chunk() -> None:
+            self.progress.update_stage(task_id, 1, total=len(urls), is_current=True)
+            while (doc := await pages.get()) is not None:
+                chunks, chunk_ids = await asyncio.to_thread(
+                    chunk_documents,
+                    [doc],
+                    chunk_size=collection_config.get("chunk_size", 1000),
+                    chunk_overlap=collection_config.get("chunk_overlap", 100),
+                )
+                counts["chunked"] += 1
+                counts["chunks"] += len(chunks)
+                self.progress.update_stage(
+                    task_id, 1, current=counts["chunked"], current_item=doc["url"]
+                )
+                self.progress.update_stage(task_id, 2, total=counts["chunks"])
+                if chunks:
+                    await chunk_batches.put((chunks, chunk_ids))
+
+            self.progress.update_stage(task_id, 1, is_current=False)
+            await chunk_batches.put(None)
+
+        async def store_page(
+            embedding_config,
+            chunks: list,
+            chunk_ids: list[str],
+            wait: bool,
+            concurrency: int | None = None,
+        ) -> None:
+            reported = 0
+
+            def on_progress(stored: int) -> None:
+                nonlocal reported
+                counts["stored"] += stored - reported
+                reported = stored
+                self.progress.update_stage(task_id, 2, current=counts["stored"])
+                report()
+
+            await qdrant_ops.store_documents(
+                self.repo.qdrant,
+                collection_name,
+                chunks,
+                chunk_ids,
+                embedding_config,
+                concurrency=concurrency,
+                on_progress=on_progress,
+                wait=wait,
+            )
+
+        async def store() -> None:
+            self.progress.update_stage(task_id, 2, is_current=True)
+            embedding_config = get_embedding_config(
+                collection_config["dense_embedding_model"]
+            )
+            # Pages are embedded as they arrive, EMBEDDING_CONCURRENCY pages
+            # (one request at a time each) in flight; a full pool holds back
+            # the earlier stages
+            slots = asyncio.Semaphore(settings.EMBEDDING_CONCURRENCY)
+
+            async def store_queued(chunks: list, chunk_ids: list[str]) -> None:
+                try:
+                    await store_page(
+                        embedding_config, chunks, chunk_ids, wait=False, concurrency=1
+                    )
+                finally:
+                    slots.release()
+
+            # The newest page is held back: stored last with wait=True, it is
+            # the consistency barrier for the whole upload
+            last_page = None
+            try:
+                async with asyncio.TaskGroup() as uploads:
+                    while (page := await chunk_batches.get()) is not None:
+                        if last_page is not None:
+                            await slots.acquire()
+                            uploads.create_task(store_queued(*last_page))
+                        last_page = page
+            except ExceptionGroup as group:
+                raise group.exceptions[0] from None
+
+            if last_page is not None:
+                await store_page(embedding_config, *last_page, wait=True)
+                bump_collection_version(collection_name)
+            self.progress.update_stage(task_id, 2, is_current=False)
+
+        try:
+            async with asyncio.TaskGroup() as stages:
+                stages.create_task(crawl())
+                stages.create_task(chunk())
+                stages.create_task(store())
+        except ExceptionGroup as group:
+            # Report the stage's own error, not the group wrapper
+            raise group.exceptions[0] from None
+
+        return processed_urls, failed, counts["stored"]
+
     # ── File ingestion ────────────────────────────────────
 
     def start_file_upload(
@@ -422,6 +607,7 @@ class KnowledgeBaseService:
 
         # Delete from both stores
         qdrant_ops.delete_documents_by_urls(self.repo.qdrant, collection_name, urls)
+        bump_collection_version(collection_name)
         self.repo.delete_documents_by_urls(collection_name, urls)
 
         # Re-scrape
@@ -438,9 +624,10 @@ class KnowledgeBaseService:
         )
 
         embedding_cfg = get_embedding_config(config["dense_embedding_model"])
-        qdrant_ops.store_documents(
+        await qdrant_ops.store_documents(
             self.repo.qdrant, collection_name, chunks, chunk_ids, embedding_cfg
         )
+        invalidate_collection(collection_name)
 
         return {
             "processed_urls": processed_urls,
@@ -527,30 +714,21 @@ class KnowledgeBaseService:
         chunks: list,
         chunk_ids: list[str],
         embedding_config,
-        batch_size: int = 10,
     ) -> None:
         """Store chunks in Qdrant with progress updates."""
-        from langchain_qdrant import QdrantVectorStore, RetrievalMode
-
-        vector_store = QdrantVectorStore(
-            client=self.repo.qdrant,
-            collection_name=collection_name,
-            embedding=embedding_config.dense,
-            sparse_embedding=embedding_config.sparse,
-            retrieval_mode=RetrievalMode.HYBRID,
-            vector_name="dense",
-            sparse_vector_name="sparse",
-        )
 
-        for i in range(0, len(chunks), batch_size):
-            batch_chunks = chunks[i : i + batch_size]
-            batch_ids = chunk_ids[i : i + batch_size]
-            vector_store.add_documents(documents=batch_chunks, ids=batch_ids)
-
-            current = min(i + batch_size, len(chunks))
-            self.progress.update_stage(task_id, stage_index, current=current)
+        def on_progress(stored: int) -> None:
+            self.progress.update_stage(task_id, stage_index, current=stored)
             self.progress.update_message(
-                task_id, f"Embedding {current}/{len(chunks)} chunks..."
+                task_id, f"Embedding {stored}/{len(chunks)} chunks..."
             )
 
-            await asyncio.sleep(0.1)
+        await qdrant_ops.store_documents(
+            self.repo.qdrant,
+            collection_name,
+            chunks,
+            chunk_ids,
+            embedding_config,
+            on_progress=on_progress,
+        )
+        bump_collection_version(collection_name)
@@ -0,0 +1,111 @@
+"""
+Model warm-up — loads embedding, sparse and reranker models at startup.
+
+Without it the first request after a deploy pays for model loading
+(several seconds for BM25 and local cross-encoders).
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from enum import StrEnum
+
+from backend.config import settings
+from backend.core import reranker
+from backend.core.embeddings import get_pooled_embedding_config, get_sparse_embeddings
+from backend.db.repositories.assistant_repo import AssistantRepository
+from backend.db.repositories.knowledge_base_repo import KnowledgeBaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupStatus(StrEnum):
+    PENDING = "pending"
+    WARMING = "warming"
+    READY = "ready"
+
+
+class ModelWarmup:
+    """Tracks and runs the startup warm-up of all models in use"""
+
+    def __init__(self, enabled: bool):
+        self.status = WarmupStatus.PENDING if enabled else WarmupStatus.READY
+        self.failed: list[str] = []
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == WarmupStatus.READY
+
+    async def run(
+        self,
+        get_repos: Callable[[], tuple[KnowledgeBaseRepository, AssistantRepository]],
+    ) -> None:
+        """
+        Load and exercise every model referenced by collections and assistants.
+
+        Args:
+            get_repos: Builds the repositories; called in a worker thread
+                since connecting to MongoDB blocks.
+        """
+        self.status = WarmupStatus.WARMING
+        self.failed = []
+        try:
+            kb_repo, assistant_repo = await asyncio.to_thread(get_repos)
+            configs = await asyncio.to_thread(kb_repo.list_collection_configs)
+            assistants = await asyncio.to_thread(
+                assistant_repo.find_all, is_active=True
+            )
+
+            embedding_models = sorted(
+                {c["dense_embedding_model"] for c in configs if c.get("dense_embedding_model")}
+            )
+            rerankers = sorted(
+                {
+                    (a.config.reranker_provider or "huggingface", a.config.reranker_model)
+                    for a in assistants
+                    if a.config.reranking
+                },
+                key=str,
+            )
+            logger.info(
+                f"Warming up {len(embedding_models)} embedding models "
+                f"and {len(rerankers)} rerankers"
+            )
+
+            await self._warm("sparse:bm25", self._warm_sparse())
+            for model_name in embedding_models:
+                await self._warm(f"dense:{model_name}", self._warm_dense(model_name))
+            for provider, model_name in rerankers:
+                await self._warm(
+                    f"reranker:{provider}/{model_name}",
+                    reranker.warm_up(provider, model_name),
+                )
+        except Exception as e:
+            logger.error(f"Model warm-up aborted: {e}", exc_info=True)
+            self.failed.append("warmup")
+        finally:
+            # Serve traffic either way — cold models still work, just slower
+            self.status = WarmupStatus.READY
+            logger.info(f"Model warm-up finished (failed: {self.failed or 'none'})")
+
+    async def _warm(self, label: str, coro) -> None:
+        try:
+            await coro
+            logger.info(f"Warmed up {label}")
+        except Exception as e:
+            logger.warning(f"Failed to warm up {label}: {e}")
+            self.failed.append(label)
+
+    @staticmethod
+    async def _warm_dense(model_name: str) -> None:
+        config = get_pooled_embedding_config(model_name)
+        await config.dense.aembed_query("warmup")
+
+    @staticmethod
+    async def _warm_sparse() -> None:
+        sparse = await asyncio.to_thread(get_sparse_embeddings)
+        await asyncio.to_thread(sparse.embed_query, "warmup")
+
+
+# Singleton instance — read by the /health endpoint
+model_warmup = ModelWarmup(enabled=settings.WARMUP_MODELS)
@@ -2,8 +2,17 @@
 from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 
+from backend.core import answer_cache
+from backend.core.assistants.qa_assistant import (
+    QAAssistantConfig,
+    QAAssistantInput,
+    QAAssistantOutput,
+)
+from backend.core.retriever import bump_collection_version
+from backend.core.semantic_cache import semantic_cache
 from backend.schemas.assistant import (
     AssistantCreateRequest,
     AssistantResponse,
@@ -16,6 +25,8 @@ from backend.services.assistant_service import (
     AssistantValidationError,
 )
 
+ASSISTANT_ID = "507f1f77bcf86cd799439011"
+
 # ── Fixtures ──────────────────────────────────────────────
 
 
@@ -213,6 +224,20 @@ class TestUpdate:
 
         assert "507f1f77bcf86cd799439011" not in service._instance_cache
 
+    @patch("backend.services.assistant_service.invalidate_compiled_chains")
+    def test_invalidates_compiled_chains(
+        self, mock_invalidate, service, mock_repo, sample_response
+    ):
+        mock_repo.find_by_id.return_value = sample_response
+        mock_repo.update.return_value = sample_response
+
+        request = AssistantUpdateRequest(name="Updated")
+        service.update("507f1f77bcf86cd799439011", request)
+
+        # The chains of the previous config are dropped
+        mock_invalidate.assert_called_once()
+        assert mock_invalidate.call_args.args[0]["llm_model"] == "gpt-4o-mini"
+
 
 # ── Delete ────────────────────────────────────────────────
 
@@ -317,3 +342,190 @@ class TestSchemaQueries:
 
         with pytest.raises(AssistantValidationError):
             service.get_schemas("nonexistent")
+
+
+# ── Answer cache ──────────────────────────────────────────
+
+
+class _CountingAssistant:
+    """QA-shaped assistant that records how often it really runs."""
+
+    def __init__(self):
+        self.calls = 0
+        self.retrieval_complete = True
+
+    def get_config_schema(self):
+        return QAAssistantConfig
+
+    def get_input_schema(self):
+        return QAAssistantInput
+
+    async def execute(self, config, input_data, stream=False):
+        self.calls += 1
+        if stream:
+            yield "The answer "
+            yield "is 42."
+            yield {
+                "source_urls": [],
+                "contexts": [],
+                "retrieval_complete": self.retrieval_complete,
+            }
+        else:
+            yield QAAssistantOutput(
+                result="42",
+                answer="42",
+                metadata={"retrieval_complete": self.retrieval_complete},
+            )
+
+
+@pytest.fixture
+def cached_assistant(mock_repo, sample_response):
+    config = sample_response.config.model_copy(
+        update={"answer_cache": True, "knowledge_base_ids": ["docs"]}
+    )
+    mock_repo.find_by_id.return_value = sample_response.model_copy(
+        update={"config": config}
+    )
+    instance = _CountingAssistant()
+    answer_cache._answers.clear()
+    with patch("backend.services.assistant_service.AssistantRegistry") as registry:
+        registry.create_instance.return_value = instance
+        yield instance
+    answer_cache._answers.clear()
+
+
+class TestAnswerCache:
+    @pytest.mark.asyncio
+    async def test_repeated_question_is_served_from_cache(
+        self, service, cached_assistant
+    ):
+        first = await service.execute(ASSISTANT_ID, {"question": "What is it?"})
+        second = await service.execute(ASSISTANT_ID, {"question": "  what IS it? "})
+
+        assert cached_assistant.calls == 1
+        assert second["output"]["answer"] == first["output"]["answer"] == "42"
+        assert second["output"]["metadata"]["cached"] is True
+        assert "cached" not in first["output"]["metadata"]
+
+    @pytest.mark.asyncio
+    async def test_stream_is_replayed(self, service, cached_assistant):
+        first = [c async for c in service.execute_stream(ASSISTANT_ID, {"question": "q"})]
+        second = [c async for c in service.execute_stream(ASSISTANT_ID, {"question": "q"})]
+
+        assert cached_assistant.calls == 1
+        assert second == first
+
+    @pytest.mark.asyncio
+    async def test_interrupted_stream_is_not_cached(self, service, cached_assistant):
+        stream = service.execute_stream(ASSISTANT_ID, {"question": "q"})
+        await anext(stream)
+        await stream.aclose()
+
+        await anext(service.execute_stream(ASSISTANT_ID, {"question": "q"}))
+
+        assert cached_assistant.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_partial_retrieval_is_not_cached(self, service, cached_assistant):
+        cached_assistant.retrieval_complete = False
+
+        await service.execute(ASSISTANT_ID, {"question": "q"})
+        await service.execute(ASSISTANT_ID, {"question": "q"})
+        [c async for c in service.execute_stream(ASSISTANT_ID, {"question": "q"})]
+        [c async for c in service.execute_stream(ASSISTANT_ID, {"question": "q"})]
+
+        assert cached_assistant.calls == 4
+
+    @pytest.mark.asyncio
+    async def test_knowledge_base_write_invalidates(self, service, cached_assistant):
+        await service.execute(ASSISTANT_ID, {"question": "q"})
+        bump_collection_version("docs")
+        await service.execute(ASSISTANT_ID, {"question": "q"})
+
+        assert cached_assistant.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates(self, service, mock_repo, cached_assistant):
+        await service.execute(ASSISTANT_ID, {"question": "q"})
+        mock_repo.update.return_value = mock_repo.find_by_id.return_value
+        service.update(ASSISTANT_ID, AssistantUpdateRequest(name="Renamed"))
+        await service.execute(ASSISTANT_ID, {"question": "q"})
+
+        assert cached_assistant.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, service, mock_repo, cached_assistant):
+        mock_repo.find_by_id.return_value.config.answer_cache = False
+
+        await service.execute(ASSISTANT_ID, {"question": "q"})
+        await service.execute(ASSISTANT_ID, {"question": "q"})
+
+        assert cached_assistant.calls == 2
+
+
+# ── Semantic cache ────────────────────────────────────────
+
+
+async def _fake_embed_question(question, model_name):
+    # Questions about refunds are near-identical, anything else is orthogonal
+    return np.array([1.0, 0.0]) if "refund" in question else np.array([0.0, 1.0])
+
+
+@pytest.fixture
+def semantic_assistant(mock_repo, sample_response):
+    config = sample_response.config.model_copy(update={"semantic_cache": True})
+    mock_repo.find_by_id.return_value = sample_response.model_copy(
+        update={"config": config}
+    )
+    instance = _CountingAssistant()
+    semantic_cache.clear()
+    with (
+        patch("backend.services.assistant_service.AssistantRegistry") as registry,
+        patch(
+            "backend.services.assistant_service.embed_question", _fake_embed_question
+        ),
+    ):
+        registry.create_instance.return_value = instance
+        yield instance
+    semantic_cache.clear()
+
+
+class TestSemanticCache:
+    @pytest.mark.asyncio
+    async def test_similar_question_reuses_answer(self, service, semantic_assistant):
+        await service.execute(ASSISTANT_ID, {"question": "Can I get a refund?"})
+        result = await service.execute(ASSISTANT_ID, {"question": "How do refunds work?"})
+
+        assert semantic_assistant.calls == 1
+        metadata = result["output"]["metadata"]
+        assert metadata["cached_question"] == "Can I get a refund?"
+        assert metadata["similarity"] == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_different_question_runs(self, service, semantic_assistant):
+        await service.execute(ASSISTANT_ID, {"question": "Can I get a refund?"})
+        await service.execute(ASSISTANT_ID, {"question": "Where are you located?"})
+
+        assert semantic_assistant.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_partial_retrieval_is_not_cached(self, service, semantic_assistant):
+        semantic_assistant.retrieval_complete = False
+
+        await service.execute(ASSISTANT_ID, {"question": "Can I get a refund?"})
+        await service.execute(ASSISTANT_ID, {"question": "How do refunds work?"})
+
+        assert semantic_assistant.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_embedding_failure_falls_back_to_execution(
+        self, service, semantic_assistant
+    ):
+        with patch(
+            "backend.services.assistant_service.embed_question",
+            side_effect=RuntimeError("embedding service down"),
+        ):
+            result = await service.execute(ASSISTANT_ID, {"question": "refund?"})
+
+        assert result["output"]["answer"] == "42"
+        assert semantic_assistant.calls == 1
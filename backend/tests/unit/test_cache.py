@@ -0,0 +1,171 @@
+# tests/unit/test_cache.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_qdrant import SparseVector
+
+from backend.core.cache import LRUCache, all_cache_stats
+from backend.core.embeddings import (
+    CachedQueryEmbeddings,
+    CachedSparseQueryEmbeddings,
+    query_embedding_cache,
+)
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_get_or_create_builds_once(self):
+        cache = LRUCache(maxsize=2)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        first = cache.get_or_create("k", factory)
+        second = cache.get_or_create("k", factory)
+
+        assert first is second
+        assert len(calls) == 1
+
+    def test_get_or_create_builds_other_keys_concurrently(self):
+        cache = LRUCache(maxsize=4)
+        fast_built = threading.Event()
+
+        def slow():
+            # Finishes only once the other key was built in the meantime
+            return fast_built.wait(1)
+
+        def fast():
+            fast_built.set()
+            return True
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            pending = pool.submit(cache.get_or_create, "slow", slow)
+            time.sleep(0.05)
+            assert pool.submit(cache.get_or_create, "fast", fast).result() is True
+            assert pending.result() is True
+
+    def test_get_or_create_builds_a_key_once_under_concurrency(self):
+        cache = LRUCache(maxsize=4)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            values = list(pool.map(lambda _: cache.get_or_create("k", factory), range(4)))
+
+        assert len(calls) == 1
+        assert all(value is values[0] for value in values)
+
+    def test_get_or_create_failure_is_not_cached(self):
+        cache = LRUCache(maxsize=2)
+
+        def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_create("k", failing)
+
+        assert cache.get_or_create("k", lambda: 1) == 1
+
+    def test_pop_where_removes_matching_keys(self):
+        cache = LRUCache(maxsize=10)
+        cache.set(("docs", "dense"), 1)
+        cache.set(("docs", "hybrid"), 2)
+        cache.set(("other", "dense"), 3)
+
+        removed = cache.pop_where(lambda key: key[0] == "docs")
+
+        assert removed == 2
+        assert len(cache) == 1
+
+    def test_rejects_invalid_size(self):
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
+
+    def test_expires_entries_after_ttl(self):
+        cache = LRUCache(maxsize=2, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert "a" not in cache
+
+    def test_tracks_hits_and_misses(self):
+        cache = LRUCache(maxsize=1)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        cache.set("b", 2)
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["evictions"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+
+class TestCachedQueryEmbeddings:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        query_embedding_cache.clear()
+        yield
+        query_embedding_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_reuses_vector_for_normalized_query(self):
+        inner = MagicMock()
+        inner.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        embeddings = CachedQueryEmbeddings(inner, "model-a")
+
+        first = await embeddings.aembed_query("What is  Lume?")
+        second = await embeddings.aembed_query("what is lume?")
+
+        assert first == second
+        inner.aembed_query.assert_awaited_once()
+
+    def test_keys_include_model(self):
+        inner = MagicMock()
+        inner.embed_query.return_value = [0.1]
+
+        CachedQueryEmbeddings(inner, "model-a").embed_query("q")
+        CachedQueryEmbeddings(inner, "model-b").embed_query("q")
+
+        assert inner.embed_query.call_count == 2
+
+    def test_caches_sparse_vectors(self):
+        inner = MagicMock()
+        inner.embed_query.return_value = SparseVector(indices=[1], values=[0.5])
+        embeddings = CachedSparseQueryEmbeddings(inner, "Qdrant/bm25")
+
+        embeddings.embed_query("q")
+        embeddings.embed_query("q")
+
+        inner.embed_query.assert_called_once()
+
+
+class TestCacheRegistry:
+    def test_named_caches_are_reported(self):
+        cache = LRUCache(maxsize=4, name="test_registry_cache")
+        cache.get("missing")
+
+        stats = all_cache_stats()
+
+        assert stats["test_registry_cache"]["misses"] == 1
@@ -0,0 +1,355 @@
+# tests/unit/test_generator.py
+import asyncio
+import json
+import socket
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda, RunnableSequence
+from langchain_openai import ChatOpenAI
+from pydantic import SecretStr
+
+from backend.core import generator
+
+TOKENS_PER_ANSWER = 5
+TOKEN_DELAY = 0.1
+
+
+# ── Fake OpenAI-compatible server ─────────────────────────
+
+
+def _completion_chunk(content: str | None, finish_reason: str | None = None) -> str:
+    delta = {"content": content} if content is not None else {}
+    chunk = {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "fake",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def _fake_llm_app(stats: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        tokens = int(request.headers.get("x-tokens", TOKENS_PER_ANSWER))
+
+        if not body.get("stream"):
+            await asyncio.sleep(tokens * TOKEN_DELAY)
+            return {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "fake",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "tok " * tokens},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+
+        async def events():
+            stats["started"] += 1
+            try:
+                for _ in range(tokens):
+                    await asyncio.sleep(TOKEN_DELAY)
+                    yield _completion_chunk("tok ")
+                yield _completion_chunk(None, "stop")
+                yield "data: [DONE]\n\n"
+                stats["completed"] += 1
+            finally:
+                stats["finished"] += 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+@pytest.fixture(scope="module")
+def fake_llm_server():
+    stats = {"started": 0, "completed": 0, "finished": 0}
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(
+        uvicorn.Config(_fake_llm_app(stats), port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    yield f"http://127.0.0.1:{port}/v1", stats
+
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def fake_llm(fake_llm_server):
+    base_url, stats = fake_llm_server
+
+    def make(tokens: int = TOKENS_PER_ANSWER):
+        return ChatOpenAI(
+            model="fake",
+            base_url=base_url,
+            api_key=SecretStr("test"),
+            max_retries=0,
+            default_headers={"x-tokens": str(tokens)},
+            # Own client per test — pytest-asyncio gives each test a new event loop
+            http_async_client=httpx.AsyncClient(),
+        )
+
+    with patch.object(generator, "get_chat_llm", return_value=make()):
+        yield make, stats
+
+
+DOCUMENTS = [Document(page_content="Lume is a RAG platform.", metadata={})]
+
+
+async def _watch_event_loop(stop: asyncio.Event) -> float:
+    """Largest gap between event loop ticks while the test runs."""
+    max_gap = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.01)
+        now = time.perf_counter()
+        max_gap = max(max_gap, now - last)
+        last = now
+    return max_gap
+
+
+async def _consume(stream) -> list:
+    return [token async for token in stream]
+
+
+# ── Tests ─────────────────────────────────────────────────
+
+
+class TestAsyncGeneration:
+    @pytest.mark.asyncio
+    async def test_concurrent_streams_do_not_block_each_other(self, fake_llm):
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(_watch_event_loop(stop))
+
+        start = time.perf_counter()
+        answers = await asyncio.gather(
+            *(_consume(generator.generate_stream("q", DOCUMENTS, {})) for _ in range(5))
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        max_gap = await watcher
+
+        assert all("".join(a) == "tok " * TOKENS_PER_ANSWER for a in answers)
+        # Five 0.5s answers in parallel, not one after another
+        assert elapsed < 2.5 * 0.6
+        # A blocking stream would freeze the loop for a whole answer
+        assert max_gap < TOKENS_PER_ANSWER * TOKEN_DELAY / 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_invocations_run_in_parallel(self, fake_llm):
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(generator.generate("q", DOCUMENTS, {}) for _ in range(5))
+        )
+        elapsed = time.perf_counter() - start
+
+        assert all(r["answer"] == "tok " * TOKENS_PER_ANSWER for r in results)
+        assert elapsed < 2.5 * 0.6
+
+    @pytest.mark.asyncio
+    async def test_closing_the_stream_aborts_the_llm_request(self, fake_llm):
+        make, stats = fake_llm
+        completed_before = stats["completed"]
+        finished_before = stats["finished"]
+
+        with patch.object(generator, "get_chat_llm", return_value=make(tokens=50)):
+            stream = generator.generate_stream("q", DOCUMENTS, {})
+            received = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+
+        # The server notices the dropped connection long before 50 tokens
+        deadline = time.perf_counter() + 2
+        while stats["finished"] == finished_before and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+
+        assert "".join(received).startswith("tok")
+        assert stats["finished"] == finished_before + 1
+        assert stats["completed"] == completed_before
+
+
+# ── Streaming precise citation ────────────────────────────
+
+
+def _parse(tokens: list[str], num_documents: int = 20) -> tuple[str, list[int]]:
+    parser = generator.InlineCitationParser(num_documents)
+    text = "".join(parser.feed(token) for token in tokens) + parser.flush()
+    return text, parser.indices
+
+
+class TestInlineCitationParser:
+    def test_strips_markers_and_collects_indices(self):
+        text, indices = _parse(["Lume is a platform [0].", " It uses Qdrant [2, 1]."])
+
+        assert text == "Lume is a platform. It uses Qdrant."
+        assert indices == [0, 2, 1]
+
+    def test_markers_split_across_tokens(self):
+        text, indices = _parse(["Lume", " [", "1", "2", "]", " works", " [3", "]"])
+
+        assert text == "Lume works"
+        assert indices == [12, 3]
+
+    def test_plain_brackets_are_kept(self):
+        text, indices = _parse(["see [note", "] and [a]"])
+
+        assert text == "see [note] and [a]"
+        assert indices == []
+
+    def test_years_in_brackets_are_kept(self):
+        text, indices = _parse(["Founded", " [20", "23]", " in Berlin [1]."], num_documents=3)
+
+        assert text == "Founded [2023] in Berlin."
+        assert indices == [1]
+
+    def test_array_indexing_is_kept(self):
+        text, indices = _parse(["Use `values[3]` or values [0, 7]."], num_documents=3)
+
+        assert text == "Use `values[3]` or values [0, 7]."
+        assert indices == []
+
+    def test_holds_back_only_possible_markers(self):
+        parser = generator.InlineCitationParser(3)
+
+        assert parser.feed("Hello") == "Hello"
+        assert parser.feed(" [") == ""
+        assert parser.feed("x") == " [x"
+
+
+class TestStreamingPreciseCitation:
+    @pytest.mark.asyncio
+    async def test_streams_answer_then_cited_chunks(self):
+        llm = GenericFakeChatModel(
+            messages=iter([AIMessage(content="Lume uses Qdrant [1] and MongoDB [5].")])
+        )
+        documents = [
+            Document(page_content="chunk 0", metadata={"source_url": "https://a"}),
+            Document(page_content="chunk 1", metadata={"source_url": "https://b"}),
+        ]
+
+        with patch.object(generator, "get_chat_llm", return_value=llm):
+            chunks = await _consume(
+                generator.generate_stream("q", documents, {"precise_citation": True})
+            )
+
+        *tokens, final = chunks
+        assert len(tokens) > 1
+        # Index 5 is not a chunk, so "[5]" is not a citation
+        assert "".join(tokens) == "Lume uses Qdrant and MongoDB [5]."
+        assert final["contexts"] == ["chunk 1"]
+        assert final["sources"][0]["url"] == "https://b"
+        assert "answer" not in final
+
+    @pytest.mark.asyncio
+    async def test_custom_precise_prompt_reaches_the_model(self):
+        prompts = []
+        llm = RunnableLambda(lambda prompt: prompts.append(prompt) or prompt) | (
+            GenericFakeChatModel(messages=iter([AIMessage(content="Answer [0].")]))
+        )
+        config = {
+            "precise_citation": True,
+            "precise_citation_system_prompt": "Answer like a pirate.\n\n{format_instructions}",
+        }
+
+        with patch.object(generator, "get_chat_llm", return_value=llm):
+            chunks = await _consume(generator.generate_stream("q", DOCUMENTS, config))
+
+        system = prompts[0].to_messages()[0].content
+        assert system.startswith("Answer like a pirate.")
+        assert generator.INLINE_CITATION_FORMAT_INSTRUCTIONS in system
+        assert "".join(chunks[:-1]) == "Answer."
+
+
+# ── Compiled chains ───────────────────────────────────────
+
+
+@pytest.fixture
+def fake_chat_model():
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="answer")] * 10))
+    generator._compiled_chains.clear()
+    with patch.object(generator, "get_chat_llm", return_value=llm):
+        yield llm
+    generator._compiled_chains.clear()
+
+
+def _render_prompt(chain) -> str:
+    """Run the input and prompt steps of a compiled chain."""
+    assert isinstance(chain, RunnableSequence)
+    inputs = chain.steps[0].invoke({"documents": DOCUMENTS, "question": "q"})
+    return chain.steps[1].invoke(inputs).to_string()
+
+
+class TestCompiledChains:
+    @pytest.mark.asyncio
+    async def test_reuses_chain_for_same_config(self, fake_chat_model):
+        config = {"system_prompt": "Be brief."}
+
+        build = MagicMock(wraps=generator._build_standard_chain)
+        with patch.dict(generator._CHAIN_BUILDERS, {generator._STANDARD: build}):
+            first = await generator.generate("q1", DOCUMENTS, config)
+            second = await generator.generate("q2", DOCUMENTS, dict(config))
+
+        assert first["answer"] == second["answer"] == "answer"
+        build.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_prompt_change_compiles_new_chain(self, fake_chat_model):
+        await generator.generate("q", DOCUMENTS, {"system_prompt": "A"})
+        await generator.generate("q", DOCUMENTS, {"system_prompt": "B"})
+
+        assert len(generator._compiled_chains) == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_only_that_config(self, fake_chat_model):
+        await generator.generate("q", DOCUMENTS, {"system_prompt": "A"})
+        await generator.generate("q", DOCUMENTS, {"system_prompt": "B"})
+
+        assert generator.invalidate_compiled_chains({"system_prompt": "A"}) == 1
+        assert len(generator._compiled_chains) == 1
+
+    @pytest.mark.asyncio
+    async def test_references_are_bound_into_the_prompt(self):
+        llm = GenericFakeChatModel(messages=iter([AIMessage(content="ok")]))
+        config = {
+            "user_prompt": "{context} {question} Policy: {policy}",
+            "references": [{"name": "policy", "text": "no refunds"}],
+        }
+
+        chain = generator._build_standard_chain(config, llm)
+
+        assert "Policy: no refunds" in _render_prompt(chain)
+
+    def test_none_prompts_fall_back_to_defaults(self):
+        llm = GenericFakeChatModel(messages=iter([]))
+        chain = generator._build_precise_chain(
+            {"precise_citation_system_prompt": None}, llm
+        )
+
+        # Format instructions are compiled into the prompt once
+        assert "used_chunk_indices" in _render_prompt(chain)
@@ -0,0 +1,246 @@
+# tests/unit/test_knowledge_base_service.py
+import asyncio
+from collections.abc import Collection
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.documents import Document
+
+from backend.config import settings
+from backend.db import qdrant as qdrant_ops
+from backend.services import knowledge_base_service as kb_service_module
+from backend.services.ingestion import website_scraper
+from backend.services.knowledge_base_service import KnowledgeBaseService
+from backend.services.task_progress import TaskProgressManager, TaskStatus
+
+COLLECTION = "docs"
+CONFIG = {"dense_embedding_model": "text-embedding-3-small", "chunk_size": 100}
+URLS = [f"https://example.com/{i}" for i in range(6)]
+CHUNKS_PER_PAGE = 3
+
+
+class Recorder:
+    """Shared event log of the fake stages, in the order things happened."""
+
+    def __init__(self):
+        self.events: list[tuple[str, str]] = []
+
+    def index(self, event: tuple[str, str]) -> int:
+        return self.events.index(event)
+
+
+class FakeCrawler:
+    """Stands in for AsyncWebCrawler; failing URLs answer with HTTP 404."""
+
+    def __init__(self, recorder: Recorder, failing: Collection[str], delay: float = 0.02):
+        self.recorder = recorder
+        self.failing = failing
+        self.delay = delay
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def arun(self, url, config=None):
+        await asyncio.sleep(self.delay)
+        self.recorder.events.append(("crawled", url))
+        ok = url not in self.failing
+        return SimpleNamespace(
+            success=ok,
+            markdown=SimpleNamespace(fit_markdown=f"# {url}") if ok else None,
+            metadata={"title": url},
+            status_code=200 if ok else 404,
+            error_message=None if ok else "HTTP 404",
+        )
+
+
+def _fake_chunk_documents(documents, chunk_size, chunk_overlap):
+    url = documents[0]["url"]
+    chunks = [
+        Document(page_content=f"{url} #{i}", metadata={"source_url": url})
+        for i in range(CHUNKS_PER_PAGE)
+    ]
+    return chunks, [f"{url}-{i}" for i in range(CHUNKS_PER_PAGE)]
+
+
+class FakeQdrant:
+    """Stands in for db.qdrant.store_documents; records (chunk ids, wait) per call."""
+
+    def __init__(self, recorder: Recorder, delay: float = 0.0):
+        self.recorder = recorder
+        self.delay = delay
+        self.stored: list[str] = []
+        self.calls: list[tuple[list[str], bool]] = []
+        self.error: Exception | None = None
+
+    async def store_documents(
+        self, client, collection_name, chunks, chunk_ids, embedding_config, **kwargs
+    ):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        for doc in chunks:
+            self.recorder.events.append(("stored", doc.metadata["source_url"]))
+        self.stored.extend(chunk_ids)
+        self.calls.append((list(chunk_ids), kwargs.get("wait", True)))
+        kwargs["on_progress"](len(chunks))
+        return len(chunks)
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def service(recorder):
+    repo = MagicMock()
+    repo.get_document_urls.return_value = set()
+    service = KnowledgeBaseService(repo=repo)
+    service.progress = TaskProgressManager()
+    service.progress.create_task(
+        task_id="task",
+        title="Upload",
+        message="",
+        stages=[
+            {"label": "Scraping Websites", "total": len(URLS), "unit": "pages"},
+            {"label": "Chunking Documents", "unit": "documents"},
+            {"label": "Creating Embeddings", "unit": "chunks"},
+        ],
+    )
+    return service
+
+
+@pytest.fixture
+def pipeline(service, recorder):
+    """Patch the crawl, chunk and embed steps; returns a setup function."""
+    patches = []
+
+    def setup(failing: Collection[str] = (), store_delay: float = 0.0):
+        qdrant = FakeQdrant(recorder, delay=store_delay)
+        patches.extend(
+            [
+                patch.object(
+                    website_scraper, "AsyncWebCrawler", return_value=FakeCrawler(recorder, failing)
+                ),
+                patch.object(settings, "SCRAPE_POLITENESS_DELAY", 0),
+                patch.object(kb_service_module, "chunk_documents", _fake_chunk_documents),
+                patch.object(kb_service_module, "get_embedding_config"),
+                patch.object(qdrant_ops, "store_documents", qdrant.store_documents),
+            ]
+        )
+        for p in patches:
+            p.start()
+        return qdrant
+
+    yield setup
+    for p in patches:
+        p.stop()
+
+
+class TestWebsitePipeline:
+    @pytest.mark.asyncio
+    async def test_stores_every_chunk_and_completes(self, service, pipeline):
+        qdrant = pipeline(failing={URLS[2]})
+
+        await service._process_website_upload("task", COLLECTION, URLS, CONFIG)
+
+        task = service.progress.get_task("task")
+        assert task.status == TaskStatus.COMPLETE
+        assert task.failed == [URLS[2]]
+        assert len(qdrant.stored) == (len(URLS) - 1) * CHUNKS_PER_PAGE
+        # Only the last page is stored with wait=True, after every other page
+        assert [wait for _, wait in qdrant.calls] == [False] * (len(URLS) - 2) + [True]
+        assert qdrant.calls[-1][0] == [f"{URLS[-1]}-{i}" for i in range(CHUNKS_PER_PAGE)]
+        assert [stage.current for stage in task.stages] == [
+            len(URLS),
+            len(URLS) - 1,
+            (len(URLS) - 1) * CHUNKS_PER_PAGE,
+        ]
+        assert service.repo.insert_documents.call_count == len(URLS) - 1
+
+    @pytest.mark.asyncio
+    async def test_embedding_starts_before_the_crawl_finishes(
+        self, service, pipeline, recorder
+    ):
+        pipeline()
+
+        await service._process_website_upload("task", COLLECTION, URLS, CONFIG)
+
+        first_stored = recorder.index(("stored", URLS[0]))
+        last_crawled = recorder.index(("crawled", URLS[-1]))
+        assert first_stored < last_crawled
+
+    @pytest.mark.asyncio
+    async def test_slow_embedding_holds_back_the_crawl(
+        self, service, pipeline, recorder
+    ):
+        pipeline(store_delay=0.05)
+        urls = [f"https://example.com/{i}" for i in range(40)]
+
+        with (
+            patch.object(settings, "INGESTION_QUEUE_SIZE", 1),
+            patch.object(settings, "SCRAPE_CONCURRENCY", 2),
+            patch.object(settings, "EMBEDDING_CONCURRENCY", 2),
+        ):
+            await service._process_website_upload("task", COLLECTION, urls, CONFIG)
+
+        # Pages crawled but not yet stored stay bounded by the crawl slots (2),
+        # the two queued pages and the one being chunked (3), and the store
+        # pool plus its held-back and incoming pages (4) — not the whole site
+        in_flight = 0
+        max_in_flight = 0
+        stored_pages = set()
+        for kind, url in recorder.events:
+            if kind == "crawled":
+                in_flight += 1
+            elif url not in stored_pages:
+                stored_pages.add(url)
+                in_flight -= 1
+            max_in_flight = max(max_in_flight, in_flight)
+        assert len(stored_pages) == len(urls)
+        assert max_in_flight <= 9
+
+    @pytest.mark.asyncio
+    async def test_fails_when_no_page_was_crawled(self, service, pipeline):
+        pipeline(failing=set(URLS))
+
+        await service._process_website_upload("task", COLLECTION, URLS, CONFIG)
+
+        task = service.progress.get_task("task")
+        assert task.status == TaskStatus.ERROR
+        assert "No documents" in task.message
+
+    @pytest.mark.asyncio
+    async def test_stage_error_fails_the_task(self, service, pipeline):
+        qdrant = pipeline()
+        qdrant.error = RuntimeError("qdrant down")
+
+        await service._process_website_upload("task", COLLECTION, URLS, CONFIG)
+
+        task = service.progress.get_task("task")
+        assert task.status == TaskStatus.ERROR
+        assert task.message == "qdrant down"
+
+
+class TestCreateCollection:
+    def test_invalidates_cached_config_after_saving_it(self, service):
+        calls = MagicMock()
+        service.repo.insert_collection_config = calls.insert_collection_config
+
+        with (
+            patch.object(qdrant_ops, "create_collection"),
+            patch.object(kb_service_module, "invalidate_collection", calls.invalidate),
+        ):
+            service.create_collection(
+                COLLECTION, "", "text-embedding-3-large", 1000, 100, "Cosine similarity"
+            )
+
+        # Invalidating first would let a query cache the missing config
+        assert [call[0] for call in calls.mock_calls] == [
+            "insert_collection_config",
+            "invalidate",
+        ]
@@ -0,0 +1,50 @@
+# tests/unit/test_llm.py
+import pytest
+from langchain_openai import ChatOpenAI
+
+from backend.core import llm
+
+
+@pytest.fixture(autouse=True)
+async def clean_pool():
+    yield
+    await llm.close_llm_clients()
+
+
+class TestChatLLMPool:
+    def test_reuses_instance_for_same_arguments(self):
+        first = llm.get_chat_llm(model="gpt-4o-mini", provider="openai", api_key="k")
+        second = llm.get_chat_llm(model="gpt-4o-mini", provider="openai", api_key="k")
+
+        assert first is second
+
+    def test_different_arguments_get_different_instances(self):
+        base = llm.get_chat_llm(model="gpt-4o-mini", api_key="k")
+
+        assert llm.get_chat_llm(model="gpt-4o", api_key="k") is not base
+        assert llm.get_chat_llm(model="gpt-4o-mini", temperature=0.7, api_key="k") is not base
+        assert llm.get_chat_llm(model="gpt-4o-mini", api_key="k", max_tokens=10) is not base
+
+    def test_openai_models_share_http_clients(self):
+        mini = llm.get_chat_llm(model="gpt-4o-mini", api_key="k")
+        full = llm.get_chat_llm(model="gpt-4o", api_key="k")
+
+        assert isinstance(mini, ChatOpenAI) and isinstance(full, ChatOpenAI)
+        assert mini.http_async_client is full.http_async_client
+        assert mini.http_client is full.http_client
+
+    def test_rejects_unknown_provider(self):
+        with pytest.raises(ValueError, match="Unsupported LLM provider"):
+            llm.get_chat_llm(model="x", provider="nope")
+
+    @pytest.mark.asyncio
+    async def test_close_releases_clients_and_pool(self):
+        model = llm.get_chat_llm(model="gpt-4o-mini", api_key="k")
+        assert isinstance(model, ChatOpenAI)
+        async_client = model.http_async_client
+        assert async_client is not None
+
+        await llm.close_llm_clients()
+
+        assert async_client.is_closed
+        assert llm.get_chat_llm(model="gpt-4o-mini", api_key="k") is not model
@@ -0,0 +1,249 @@
+# tests/unit/test_qdrant.py
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.documents import Document
+from qdrant_client import models
+
+from backend.core.embeddings import EmbeddingConfig
+from backend.db import qdrant as qdrant_ops
+
+
+class TestBuildMetadataFilter:
+    def test_returns_none_without_filters(self):
+        assert qdrant_ops.build_metadata_filter(None) is None
+        assert qdrant_ops.build_metadata_filter({}) is None
+
+    def test_string_and_list_values(self):
+        result = qdrant_ops.build_metadata_filter(
+            {"source_category": "website", "source_url": ["https://a", "https://b"]}
+        )
+
+        assert result == models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="metadata.source_category", match=models.MatchValue(value="website")
+                ),
+                models.FieldCondition(
+                    key="metadata.source_url",
+                    match=models.MatchAny(any=["https://a", "https://b"]),
+                ),
+            ]
+        )
+
+    def test_rejects_unknown_field(self):
+        with pytest.raises(ValueError, match="Unsupported filter field"):
+            qdrant_ops.build_metadata_filter({"author": "x"})
+
+    def test_rejects_non_string_values(self):
+        with pytest.raises(ValueError, match="string or list of strings"):
+            qdrant_ops.build_metadata_filter({"title": 3})
+
+
+class TestStorageOptions:
+    def test_defaults_to_full_precision_in_ram(self):
+        client = MagicMock()
+
+        qdrant_ops.create_collection(client, "docs", 768, models.Distance.COSINE)
+
+        kwargs = client.create_collection.call_args.kwargs
+        dense = kwargs["vectors_config"]["dense"]
+        assert dense.quantization_config is None
+        assert dense.on_disk is False
+        assert kwargs["on_disk_payload"] is False
+
+    def test_quantized_on_disk_collection(self):
+        client = MagicMock()
+        storage = {
+            "quantization": "binary",
+            "on_disk_vectors": True,
+            "on_disk_payload": True,
+            "hnsw_m": 32,
+        }
+
+        qdrant_ops.create_collection(
+            client, "docs", 3072, models.Distance.COSINE, storage=storage
+        )
+
+        kwargs = client.create_collection.call_args.kwargs
+        dense = kwargs["vectors_config"]["dense"]
+        assert isinstance(dense.quantization_config, models.BinaryQuantization)
+        assert dense.quantization_config.binary.always_ram is True
+        assert dense.on_disk is True
+        assert dense.hnsw_config == models.HnswConfigDiff(m=32)
+        assert kwargs["sparse_vectors_config"]["sparse"].index.on_disk is True
+        assert kwargs["on_disk_payload"] is True
+
+    @pytest.mark.parametrize(
+        ("storage", "expected"),
+        [
+            ({"quantization": "scalar"}, models.ScalarQuantization),
+            (
+                {"quantization": "product", "product_compression": "x32"},
+                models.ProductQuantization,
+            ),
+        ],
+    )
+    def test_quantization_types(self, storage, expected):
+        assert isinstance(qdrant_ops.build_quantization_config(storage), expected)
+
+    @pytest.mark.parametrize(
+        "storage",
+        [{"quantization": "int4"}, {"quantization": "product", "product_compression": "x3"}],
+    )
+    def test_rejects_invalid_quantization(self, storage):
+        with pytest.raises(ValueError, match="Invalid"):
+            qdrant_ops.build_quantization_config(storage)
+
+    def test_search_params_only_for_quantized_collections(self):
+        assert qdrant_ops.build_quantization_search_params(None) is None
+        assert qdrant_ops.build_quantization_search_params({"on_disk_vectors": True}) is None
+
+        params = qdrant_ops.build_quantization_search_params(
+            {"quantization": "binary", "oversampling": 3.0}
+        )
+        assert params == models.QuantizationSearchParams(rescore=True, oversampling=3.0)
+
+
+class TestPayloadIndexes:
+    def test_create_collection_indexes_metadata_fields(self):
+        client = MagicMock()
+
+        qdrant_ops.create_collection(client, "docs", 768, models.Distance.COSINE)
+
+        indexed = {
+            call.kwargs["field_name"]: call.kwargs["field_schema"]
+            for call in client.create_payload_index.call_args_list
+        }
+        assert indexed == dict.fromkeys(
+            qdrant_ops.INDEXED_PAYLOAD_FIELDS, models.PayloadSchemaType.KEYWORD
+        )
+
+    def test_delete_by_urls_issues_a_single_filtered_delete(self):
+        client = MagicMock()
+
+        qdrant_ops.delete_documents_by_urls(client, "docs", ["https://a", "https://b"])
+
+        client.delete.assert_called_once()
+        selector = client.delete.call_args.kwargs["points_selector"]
+        assert selector.filter.must[0].match == models.MatchAny(any=["https://a", "https://b"])
+
+
+# ── Document storage ──────────────────────────────────────
+
+
+class SlowEmbeddings:
+    """Dense embeddings with fixed request latency; tracks requests in flight."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def aembed_documents(self, texts):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def _embedding_config(dense, provider="openai") -> EmbeddingConfig:
+    sparse = MagicMock()
+    sparse.embed_documents.side_effect = lambda texts: [
+        SimpleNamespace(indices=[1], values=[1.0]) for _ in texts
+    ]
+    return EmbeddingConfig(dense=dense, sparse=sparse, dimension=2, provider=provider)
+
+
+def _chunks(n: int) -> tuple[list[Document], list[str]]:
+    chunks = [Document(page_content=f"chunk {i}", metadata={"i": i}) for i in range(n)]
+    return chunks, [f"id-{i}" for i in range(n)]
+
+
+def _client() -> MagicMock:
+    """Qdrant client that records (point ids, wait) per upsert, in call order."""
+    client = MagicMock()
+    client.upserts = []
+    client.upsert.side_effect = lambda collection_name, points, wait: client.upserts.append(
+        ([p.id for p in points], wait)
+    )
+    return client
+
+
+class TestStoreDocuments:
+    @pytest.mark.asyncio
+    async def test_upserts_every_chunk_and_waits_only_for_the_last(self):
+        client = _client()
+        chunks, ids = _chunks(25)
+        progress = []
+
+        stored = await qdrant_ops.store_documents(
+            client,
+            "docs",
+            chunks,
+            ids,
+            _embedding_config(SlowEmbeddings(0)),
+            batch_size=10,
+            on_progress=progress.append,
+        )
+
+        assert stored == 25
+        assert sorted(i for ids, _ in client.upserts for i in ids) == sorted(ids)
+        # One wait=True upsert, after all the queued ones, is the barrier
+        assert [wait for _, wait in client.upserts] == [False, False, True]
+        assert client.upserts[-1][0] == ids[20:]
+        point = client.upsert.call_args_list[0].kwargs["points"][0]
+        assert set(point.vector) == {"dense", "sparse"}
+        assert point.payload == {"page_content": "chunk 0", "metadata": {"i": 0}}
+        assert progress[-1] == 25
+
+    @pytest.mark.asyncio
+    async def test_without_wait_every_upsert_is_queued(self):
+        client = _client()
+        chunks, ids = _chunks(25)
+
+        await qdrant_ops.store_documents(
+            client,
+            "docs",
+            chunks,
+            ids,
+            _embedding_config(SlowEmbeddings(0)),
+            batch_size=10,
+            wait=False,
+        )
+
+        assert [wait for _, wait in client.upserts] == [False, False, False]
+
+    @pytest.mark.asyncio
+    async def test_keeps_concurrent_embedding_requests_in_flight(self):
+        dense = SlowEmbeddings(latency=0.05)
+        chunks, ids = _chunks(80)
+
+        start = time.perf_counter()
+        await qdrant_ops.store_documents(
+            _client(), "docs", chunks, ids, _embedding_config(dense), batch_size=10, concurrency=4
+        )
+        elapsed = time.perf_counter() - start
+
+        assert dense.requests == 8
+        assert dense.max_in_flight == 4
+        # 8 requests, 4 at a time — about two latencies instead of eight
+        assert elapsed < 8 * dense.latency / 2
+
+    @pytest.mark.asyncio
+    async def test_batch_size_defaults_per_provider(self):
+        dense = SlowEmbeddings(latency=0)
+        chunks, ids = _chunks(100)
+
+        with patch.object(qdrant_ops.settings, "EMBEDDING_BATCH_SIZES", {"ollama": 25}):
+            await qdrant_ops.store_documents(
+                _client(), "docs", chunks, ids, _embedding_config(dense, "ollama")
+            )
+
+        assert dense.requests == 4
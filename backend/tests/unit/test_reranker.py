@@ -0,0 +1,102 @@
+# tests/unit/test_reranker.py
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.documents import Document
+
+from backend.core import reranker
+from backend.core.reranker import rerank
+from backend.core.utils import extract_sources
+
+
+def _docs(n: int) -> list[Document]:
+    return [Document(page_content=f"passage {i}", metadata={"i": i}) for i in range(n)]
+
+
+class TestLocalReranker:
+    @pytest.mark.asyncio
+    async def test_scores_all_pairs_in_one_batch(self):
+        model = MagicMock()
+        model.compute_score.return_value = [0.1, 0.9, 0.5]
+
+        with patch.object(reranker, "_get_local_reranker", return_value=model):
+            result, reranked = await rerank("q", _docs(3), provider="huggingface", top_n=2)
+
+        model.compute_score.assert_called_once()
+        pairs = model.compute_score.call_args.args[0]
+        assert len(pairs) == 3
+        assert model.compute_score.call_args.kwargs["batch_size"] == 3
+        assert reranked is True
+        assert [d.metadata["i"] for d in result] == [1, 2]
+        assert result[0].metadata["relevance_score"] == 0.9
+
+    @pytest.mark.asyncio
+    async def test_caps_candidate_pool(self):
+        model = MagicMock()
+        model.compute_score.side_effect = lambda pairs, **kw: [0.0] * len(pairs)
+
+        with (
+            patch.object(reranker, "_get_local_reranker", return_value=model),
+            patch.object(reranker.settings, "RERANK_MAX_CANDIDATES", 4),
+        ):
+            result, _ = await rerank("q", _docs(10), provider="huggingface")
+
+        assert len(model.compute_score.call_args.args[0]) == 4
+        assert len(result) == 4
+
+    @pytest.mark.asyncio
+    async def test_keeps_order_when_model_fails(self):
+        model = MagicMock()
+        model.compute_score.side_effect = RuntimeError("no model")
+
+        with patch.object(reranker, "_get_local_reranker", return_value=model):
+            result, reranked = await rerank("q", _docs(3), provider="huggingface", top_n=2)
+
+        assert reranked is False
+        assert [d.metadata["i"] for d in result] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_fallback_keeps_sources_listable(self):
+        model = MagicMock()
+        model.compute_score.side_effect = RuntimeError("no model")
+        docs = _docs(2)
+        for doc, score in zip(docs, [0.8, 0.6], strict=True):
+            doc.metadata["retrieval_score"] = score
+
+        with patch.object(reranker, "_get_local_reranker", return_value=model):
+            result, _ = await rerank("q", docs, provider="huggingface")
+
+        assert [d.metadata["relevance_score"] for d in result] == [0.8, 0.6]
+        assert [s["score"] for s in extract_sources(result)] == [0.8, 0.6]
+
+
+class TestCohereReranker:
+    @pytest.mark.asyncio
+    async def test_maps_results_by_index(self):
+        client = MagicMock()
+        client.rerank = AsyncMock(
+            return_value=SimpleNamespace(
+                results=[
+                    SimpleNamespace(index=2, relevance_score=0.8),
+                    SimpleNamespace(index=0, relevance_score=0.3),
+                ]
+            )
+        )
+
+        with patch.object(reranker, "_get_cohere_client", return_value=client):
+            result, reranked = await rerank("q", _docs(3), provider="cohere", top_n=1)
+
+        client.rerank.assert_awaited_once()
+        assert result[0].metadata["i"] == 2
+
+
+class TestValidation:
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_provider(self):
+        with pytest.raises(ValueError, match="Unsupported reranker provider"):
+            await rerank("q", _docs(1), provider="nope")
+
+    @pytest.mark.asyncio
+    async def test_empty_candidates(self):
+        assert await rerank("q", [], provider="cohere") == ([], True)
@@ -0,0 +1,829 @@
+# tests/unit/test_retriever.py
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.documents import Document
+
+from backend.core import retriever
+from backend.core.retriever import (
+    SearchOptions,
+    _normalized_score_fusion,
+    _reciprocal_rank_fusion,
+    retrieve,
+)
+
+
+def _doc(point_id: str, collection: str, score: float = 0.0) -> Document:
+    return Document(
+        page_content=f"content {point_id}",
+        metadata={
+            "_id": point_id,
+            "_collection_name": collection,
+            "collection_name": collection,
+            "retrieval_score": score,
+        },
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    caches = [
+        retriever._collection_configs,
+        retriever._search_handles,
+        retriever._result_cache,
+        retriever._hyde_cache,
+        retriever._collection_versions,
+    ]
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+# ── Embedding model resolution ────────────────────────────
+
+
+class TestResolveEmbeddingModel:
+    def test_uses_collection_config(self):
+        repo = MagicMock()
+        repo.get_collection_config.return_value = {
+            "dense_embedding_model": "text-embedding-3-large"
+        }
+
+        with patch.object(retriever, "_get_knowledge_base_repo", return_value=repo):
+            assert (
+                retriever._resolve_embedding_model("docs") == "text-embedding-3-large"
+            )
+
+    def test_caches_lookup_per_collection(self):
+        repo = MagicMock()
+        repo.get_collection_config.return_value = {
+            "dense_embedding_model": "text-embedding-3-small"
+        }
+
+        with patch.object(retriever, "_get_knowledge_base_repo", return_value=repo):
+            retriever._resolve_embedding_model("docs")
+            retriever._resolve_embedding_model("docs")
+
+        repo.get_collection_config.assert_called_once_with("docs")
+
+    def test_falls_back_to_default_without_config(self):
+        repo = MagicMock()
+        repo.get_collection_config.return_value = None
+
+        with patch.object(retriever, "_get_knowledge_base_repo", return_value=repo):
+            model = retriever._resolve_embedding_model("legacy")
+
+        assert model == retriever.settings.DEFAULT_EMBEDDING_MODEL
+
+    def test_missing_config_is_not_cached(self):
+        repo = MagicMock()
+        repo.get_collection_config.side_effect = [
+            None,
+            {"dense_embedding_model": "text-embedding-3-large"},
+        ]
+
+        with patch.object(retriever, "_get_knowledge_base_repo", return_value=repo):
+            retriever._resolve_embedding_model("docs")
+            model = retriever._resolve_embedding_model("docs")
+
+        assert model == "text-embedding-3-large"
+
+
+# ── Vector store cache ────────────────────────────────────
+
+
+class TestSearchHandleCache:
+    @pytest.fixture(autouse=True)
+    def embeddings(self):
+        with (
+            patch.object(retriever, "_resolve_embedding_model", return_value="m"),
+            patch.object(retriever, "_get_collection_config", return_value={}),
+            patch.object(retriever, "_get_dense_embeddings", return_value=MagicMock()),
+            patch.object(retriever, "_get_sparse_embeddings", return_value=MagicMock()),
+        ):
+            yield
+
+    def test_reuses_handle_per_collection_and_mode(self):
+        first = retriever._get_search_handle("docs", hybrid=True)
+        second = retriever._get_search_handle("docs", hybrid=True)
+        dense = retriever._get_search_handle("docs", hybrid=False)
+
+        assert first is second
+        assert dense is not first
+        assert dense.sparse is None
+
+    def test_invalidate_collection_drops_handles(self):
+        docs = retriever._get_search_handle("docs", hybrid=True)
+        other = retriever._get_search_handle("other", hybrid=True)
+        retriever.invalidate_collection("docs")
+
+        assert retriever._get_search_handle("docs", hybrid=True) is not docs
+        assert retriever._get_search_handle("other", hybrid=True) is other
+
+
+# ── Fusion ────────────────────────────────────────────────
+
+
+class TestReciprocalRankFusion:
+    def test_interleaves_lists_by_rank(self):
+        a = [_doc("a1", "A"), _doc("a2", "A")]
+        b = [_doc("b1", "B"), _doc("b2", "B")]
+
+        result = _reciprocal_rank_fusion([a, b], top_k=4)
+
+        assert [d.metadata["_id"] for d in result][:2] == ["a1", "b1"]
+        assert len(result) == 4
+
+    def test_boosts_documents_found_in_several_lists(self):
+        shared = _doc("s", "A")
+        a = [_doc("a1", "A"), shared]
+        b = [_doc("s", "A")]
+
+        result = _reciprocal_rank_fusion([a, b], top_k=1)
+
+        assert result[0].metadata["_id"] == "s"
+
+    def test_truncates_to_top_k(self):
+        a = [_doc(f"a{i}", "A") for i in range(10)]
+
+        assert len(_reciprocal_rank_fusion([a], top_k=3)) == 3
+
+
+class TestNormalizedScoreFusion:
+    def test_normalizes_per_list(self):
+        # B's raw scores are much larger, but A's best hit is equally strong
+        a = [_doc("a1", "A", 0.9), _doc("a2", "A", 0.1)]
+        b = [_doc("b1", "B", 90.0), _doc("b2", "B", 50.0), _doc("b3", "B", 10.0)]
+
+        result = _normalized_score_fusion([a, b], top_k=3)
+
+        ids = [d.metadata["_id"] for d in result]
+        assert set(ids[:2]) == {"a1", "b1"}
+        assert ids[2] == "b2"
+
+
+# ── Fan-out ───────────────────────────────────────────────
+
+
+class TestRetrieveFanOut:
+    @pytest.mark.asyncio
+    async def test_searches_all_collections_concurrently(self):
+        async def slow_search(name, query, options):
+            await asyncio.sleep(0.2)
+            return [_doc(f"{name}-1", name)]
+
+        with patch.object(retriever, "_search_collection", side_effect=slow_search):
+            start = time.perf_counter()
+            result, complete = await retrieve(
+                "q", ["A", "B", "C", "D"], {"hybrid_search": False, "top_k": 10}
+            )
+            elapsed = time.perf_counter() - start
+
+        assert len(result) == 4
+        assert complete is True
+        assert elapsed < 0.6
+
+    @pytest.mark.asyncio
+    async def test_skips_collections_that_time_out(self):
+        async def search(name, query, options):
+            if name == "slow":
+                await asyncio.sleep(0.5)
+            return [_doc(f"{name}-1", name)]
+
+        with patch.object(retriever, "_search_collection", side_effect=search):
+            result, complete = await retrieve(
+                "q",
+                ["fast", "slow"],
+                {"top_k": 5, "collection_timeout": 0.1},
+            )
+
+        assert [d.metadata["_id"] for d in result] == ["fast-1"]
+        assert complete is False
+
+    @pytest.mark.asyncio
+    async def test_skips_failing_collections(self):
+        async def search(name, query, options):
+            if name == "broken":
+                raise RuntimeError("boom")
+            return [_doc(f"{name}-1", name)]
+
+        with patch.object(retriever, "_search_collection", side_effect=search):
+            result, complete = await retrieve("q", ["ok", "broken"], {"top_k": 5})
+
+        assert len(result) == 1
+        assert complete is False
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_fusion_method(self):
+        with pytest.raises(ValueError, match="Unsupported fusion method"):
+            await retrieve("q", ["A"], {"fusion_method": "nope"})
+
+    @pytest.mark.asyncio
+    async def test_returns_empty_without_collections(self):
+        assert await retrieve("q", [], {}) == ([], True)
+
+
+
+# ── Async query path ──────────────────────────────────────
+
+
+def _fake_handle(hybrid: bool = False, query_vector: list[float] | None = None):
+    dense = MagicMock()
+    dense.aembed_query = AsyncMock(return_value=query_vector or [0.1, 0.2])
+    sparse = None
+    if hybrid:
+        sparse = MagicMock()
+        sparse.embed_query.return_value = SimpleNamespace(indices=[1], values=[0.5])
+    return retriever._SearchHandle(collection_name="docs", dense=dense, sparse=sparse)
+
+
+def _fake_async_client(latency: float):
+    async def query_points(collection_name, limit, **kwargs):
+        await asyncio.sleep(latency)
+        point = SimpleNamespace(
+            id=f"{collection_name}-1",
+            score=0.9,
+            payload={"page_content": "text", "metadata": {}},
+        )
+        return SimpleNamespace(points=[point])
+
+    client = MagicMock()
+    client.query_points = AsyncMock(side_effect=query_points)
+    return client
+
+
+class TestAsyncSearch:
+    @pytest.mark.asyncio
+    async def test_hybrid_search_uses_prefetch_fusion(self):
+        client = _fake_async_client(latency=0)
+
+        with (
+            patch.object(retriever, "_get_search_handle", return_value=_fake_handle(True)),
+            patch.object(retriever, "_get_async_qdrant_client", return_value=client),
+        ):
+            docs = await retriever._search_collection(
+                "docs", "q", SearchOptions(hybrid=True, top_k=5)
+            )
+
+        kwargs = client.query_points.call_args.kwargs
+        assert len(kwargs["prefetch"]) == 2
+        assert docs[0].metadata["retrieval_score"] == 0.9
+        assert docs[0].metadata["collection_name"] == "docs"
+
+    @pytest.mark.asyncio
+    async def test_dbsf_fusion_and_branch_limits(self):
+        client = _fake_async_client(latency=0)
+        config = {
+            "hybrid_fusion": "dbsf",
+            "top_k": 5,
+            "dense_prefetch_limit": 40,
+            "sparse_prefetch_limit": 20,
+        }
+
+        with (
+            patch.object(retriever, "_get_search_handle", return_value=_fake_handle(True)),
+            patch.object(retriever, "_get_async_qdrant_client", return_value=client),
+        ):
+            await retrieve("q", ["docs"], config)
+
+        kwargs = client.query_points.call_args.kwargs
+        assert kwargs["query"].fusion == retriever.models.Fusion.DBSF
+        assert [p.limit for p in kwargs["prefetch"]] == [40, 20]
+        assert kwargs["limit"] == 5
+
+    @pytest.mark.asyncio
+    async def test_dense_search_queries_dense_vector_only(self):
+        client = _fake_async_client(latency=0)
+
+        with (
+            patch.object(retriever, "_get_search_handle", return_value=_fake_handle()),
+            patch.object(retriever, "_get_async_qdrant_client", return_value=client),
+        ):
+            await retrieve("q", ["docs"], {"hybrid_search": False})
+
+        kwargs = client.query_points.call_args.kwargs
+        assert kwargs["using"] == "dense"
+        assert "prefetch" not in kwargs
+
+    @pytest.mark.asyncio
+    async def test_quantized_collection_oversamples_dense_branch(self):
+        client = _fake_async_client(latency=0)
+        quantization = retriever.models.QuantizationSearchParams(
+            rescore=True, oversampling=2.0
+        )
+        handle = retriever._SearchHandle(
+            collection_name="docs",
+            dense=_fake_handle(True).dense,
+            sparse=_fake_handle(True).sparse,
+            quantization=quantization,
+        )
+
+        with (
+            patch.object(retriever, "_get_search_handle", return_value=handle),
+            patch.object(retriever, "_get_async_qdrant_client", return_value=client),
+        ):
+            await retrieve("q", ["docs"], {})
+
+        dense_branch, sparse_branch = client.query_points.call_args.kwargs["prefetch"]
+        assert dense_branch.params.quantization == quantization
+        assert sparse_branch.params is None
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_hybrid_fusion(self):
+        with pytest.raises(ValueError, match="Unsupported hybrid fusion"):
+            await retrieve("q", ["docs"], {"hybrid_fusion": "nope"})
+
+    @pytest.mark.asyncio
+    async def test_concurrent_questions_do_not_serialize(self):
+        client = _fake_async_client(latency=0.2)
+
+        with (
+            patch.object(retriever, "_get_search_handle", return_value=_fake_handle()),
+            patch.object(retriever, "_get_async_qdrant_client", return_value=client),
+        ):
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(
+                    retrieve(f"question {i}", ["docs"], {"hybrid_search": False})
+                    for i in range(20)
+                )
+            )
+            elapsed = time.perf_counter() - start
+
+        assert all(len(docs) == 1 for docs, _ in results)
+        assert elapsed < 1.0
+
+    @pytest.mark.asyncio
+    async def test_hyde_uses_async_llm(self):
+        llm = MagicMock()
+        llm.ainvoke = AsyncMock(return_value=SimpleNamespace(content="hypothesis"))
+        search = AsyncMock(return_value=[])
+
+        with (
+            patch.object(retriever, "get_chat_llm", return_value=llm),
+            patch.object(retriever, "_search_collection", search),
+        ):
+            await retrieve("q", ["docs"], {"use_hyde": True, "hyde_prompt": None})
+
+        llm.ainvoke.assert_awaited_once()
+        assert search.call_args.args[1] == "hypothesis"
+
+
+class TestMetadataFilters:
+    @pytest.mark.asyncio
+    async def test_filters_reach_qdrant(self):
+        client = _fake_async_client(latency=0)
+
+        with (
+            patch.object(retriever, "_get_search_handle", return_value=_fake_handle(True)),
+            patch.object(retriever, "_get_async_qdrant_client", return_value=client),
+        ):
+            await retrieve("q", ["docs"], {}, filters={"source_category": "file"})
+
+        kwargs = client.query_points.call_args.kwargs
+        assert kwargs["query_filter"].must[0].key == "metadata.source_category"
+        # Both hybrid branches are filtered before fusion
+        assert all(p.filter == kwargs["query_filter"] for p in kwargs["prefetch"])
+
+    @pytest.mark.asyncio
+    async def test_filters_are_part_of_the_cache_key(self):
+        search = AsyncMock(return_value=[_doc("1", "docs")])
+
+        with patch.object(retriever, "_search_collection", search):
+            await retrieve("q", ["docs"], {}, filters={"source_category": "file"})
+            await retrieve("q", ["docs"], {}, filters={"source_category": "website"})
+            await retrieve("q", ["docs"], {}, filters={"source_category": "file"})
+
+        assert search.await_count == 2
+
+
+# ── Result cache ──────────────────────────────────────────
+
+
+class TestResultCache:
+    @pytest.mark.asyncio
+    async def test_repeat_question_skips_search(self):
+        search = AsyncMock(return_value=[_doc("a1", "docs")])
+
+        with patch.object(retriever, "_search_collection", search):
+            first, _ = await retrieve("What is Lume?", ["docs"], {"top_k": 5})
+            second, complete = await retrieve("what is  lume?", ["docs"], {"top_k": 5})
+
+        assert search.await_count == 1
+        assert [d.metadata["_id"] for d in second] == ["a1"]
+        assert complete is True
+        assert second[0] is not first[0]
+
+    @pytest.mark.asyncio
+    async def test_collection_write_invalidates_entries(self):
+        search = AsyncMock(return_value=[_doc("a1", "docs")])
+
+        with patch.object(retriever, "_search_collection", search):
+            await retrieve("q", ["docs"], {"top_k": 5})
+            retriever.bump_collection_version("docs")
+            await retrieve("q", ["docs"], {"top_k": 5})
+
+        assert search.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_different_top_k_is_a_different_entry(self):
+        search = AsyncMock(return_value=[])
+
+        with patch.object(retriever, "_search_collection", search):
+            await retrieve("q", ["docs"], {"top_k": 5})
+            await retrieve("q", ["docs"], {"top_k": 10})
+
+        assert search.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_partial_results_are_not_cached(self):
+        async def search(name, query, options):
+            if name == "broken":
+                raise RuntimeError("boom")
+            return [_doc(f"{name}-1", name)]
+
+        mock = AsyncMock(side_effect=search)
+        with patch.object(retriever, "_search_collection", mock):
+            await retrieve("q", ["ok", "broken"], {"top_k": 5})
+            await retrieve("q", ["ok", "broken"], {"top_k": 5})
+
+        assert mock.await_count == 4
+
+
+# ── Reranking ─────────────────────────────────────────────
+
+
+class TestRerankingStage:
+    @pytest.mark.asyncio
+    async def test_reranks_candidates_when_enabled(self):
+        candidates = [_doc(f"a{i}", "docs") for i in range(5)]
+        search = AsyncMock(return_value=candidates)
+        rerank = AsyncMock(return_value=(candidates[:2], True))
+
+        with (
+            patch.object(retriever, "_search_collection", search),
+            patch.object(retriever, "rerank", rerank),
+        ):
+            result, _ = await retrieve(
+                "q",
+                ["docs"],
+                {
+                    "top_k": 5,
+                    "reranking": True,
+                    "reranker_provider": "cohere",
+                    "reranker_model": "rerank-v3.5",
+                    "top_n": 2,
+                },
+            )
+
+        assert len(result) == 2
+        assert rerank.call_args.kwargs == {
+            "provider": "cohere",
+            "model": "rerank-v3.5",
+            "top_n": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_reranker_fallback_is_not_cached(self):
+        candidates = [_doc(f"a{i}", "docs") for i in range(3)]
+        search = AsyncMock(return_value=candidates)
+        rerank = AsyncMock(return_value=(candidates, False))
+
+        with (
+            patch.object(retriever, "_search_collection", search),
+            patch.object(retriever, "rerank", rerank),
+        ):
+            await retrieve("q", ["docs"], {"top_k": 5, "reranking": True})
+            _, complete = await retrieve("q", ["docs"], {"top_k": 5, "reranking": True})
+
+        assert complete is False
+        assert search.await_count == 2
+        assert rerank.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_skips_reranking_by_default(self):
+        rerank = AsyncMock()
+
+        with (
+            patch.object(retriever, "_search_collection", AsyncMock(return_value=[])),
+            patch.object(retriever, "rerank", rerank),
+        ):
+            await retrieve("q", ["docs"], {"top_k": 5})
+
+        rerank.assert_not_awaited()
+
+
+# ── Parallel HyDE ─────────────────────────────────────────
+
+
+def _slow_llm(latency: float, text: str = "hypothesis"):
+    async def ainvoke(prompt):
+        await asyncio.sleep(latency)
+        return SimpleNamespace(content=text)
+
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(side_effect=ainvoke)
+    return llm
+
+
+async def _search_by_query(name, query, options):
+    await asyncio.sleep(0.1)
+    return [_doc(f"{query}-{name}", name)]
+
+
+class TestParallelHyde:
+    @pytest.mark.asyncio
+    async def test_raw_search_overlaps_hyde_generation(self):
+        config = {"use_hyde": True, "hyde_mode": "parallel", "top_k": 5}
+
+        with (
+            patch.object(retriever, "get_chat_llm", return_value=_slow_llm(0.2)),
+            patch.object(retriever, "_search_collection", side_effect=_search_by_query),
+        ):
+            start = time.perf_counter()
+            result, _ = await retrieve("q", ["docs"], config)
+            elapsed = time.perf_counter() - start
+
+        # raw search (0.1) hides behind HyDE (0.2), then one HyDE search (0.1)
+        assert elapsed < 0.38
+        assert {d.metadata["_id"] for d in result} == {"q-docs", "hypothesis-docs"}
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_raw_hits_over_budget(self):
+        config = {
+            "use_hyde": True,
+            "hyde_mode": "parallel",
+            "hyde_latency_budget": 0.05,
+            "top_k": 5,
+        }
+        search = AsyncMock(side_effect=_search_by_query)
+
+        with (
+            patch.object(retriever, "get_chat_llm", return_value=_slow_llm(1.0)),
+            patch.object(retriever, "_search_collection", search),
+        ):
+            result, complete = await retrieve("q", ["docs"], config)
+
+        assert [d.metadata["_id"] for d in result] == ["q-docs"]
+        assert complete is False
+        assert search.await_count == 1
+        # Degraded results are not cached
+        assert len(retriever._result_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_uses_only_hyde_hits_without_fusion(self):
+        config = {
+            "use_hyde": True,
+            "hyde_mode": "parallel",
+            "hyde_fuse_results": False,
+            "top_k": 5,
+        }
+
+        with (
+            patch.object(retriever, "get_chat_llm", return_value=_slow_llm(0)),
+            patch.object(retriever, "_search_collection", side_effect=_search_by_query),
+        ):
+            result, _ = await retrieve("q", ["docs"], config)
+
+        assert [d.metadata["_id"] for d in result] == ["hypothesis-docs"]
+
+    @pytest.mark.asyncio
+    async def test_sequential_failed_generation_is_not_cached(self):
+        llm = MagicMock()
+        llm.ainvoke = AsyncMock(side_effect=RuntimeError("llm down"))
+
+        with (
+            patch.object(retriever, "get_chat_llm", return_value=llm),
+            patch.object(retriever, "_search_collection", side_effect=_search_by_query),
+        ):
+            result, complete = await retrieve("q", ["docs"], {"use_hyde": True, "top_k": 5})
+
+        assert [d.metadata["_id"] for d in result] == ["q-docs"]
+        assert complete is False
+        # Raw-query hits stand in for HyDE hits and must not be served again
+        assert len(retriever._result_cache) == 0
+
+
+# ── HyDE document cache ───────────────────────────────────
+
+
+class TestHydeCache:
+    @pytest.mark.asyncio
+    async def test_generates_once_per_normalized_question(self):
+        llm = _slow_llm(0)
+        config = {"llm_model": "gpt-4o-mini"}
+
+        with patch.object(retriever, "get_chat_llm", return_value=llm):
+            first = await retriever._get_hypothetical_document("What is X?", config)
+            second = await retriever._get_hypothetical_document("  what is  x? ", config)
+
+        assert first == second == "hypothesis"
+        assert llm.ainvoke.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_prompt_and_model_are_part_of_the_key(self):
+        llm = _slow_llm(0)
+
+        with patch.object(retriever, "get_chat_llm", return_value=llm):
+            await retriever._get_hypothetical_document("q", {"llm_model": "a"})
+            await retriever._get_hypothetical_document("q", {"llm_model": "b"})
+            await retriever._get_hypothetical_document(
+                "q", {"llm_model": "a", "hyde_prompt": "Other {question}"}
+            )
+
+        assert llm.ainvoke.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_generation_is_not_cached(self):
+        llm = MagicMock()
+        llm.ainvoke = AsyncMock(side_effect=RuntimeError("llm down"))
+
+        with patch.object(retriever, "get_chat_llm", return_value=llm):
+            assert await retriever._get_hypothetical_document("q", {}) == "q"
+
+        assert len(retriever._hyde_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_persistent_tier_is_read_before_llm(self):
+        repo = MagicMock()
+        repo.find.return_value = "stored hypothesis"
+        llm = _slow_llm(0)
+
+        with (
+            patch.object(retriever.settings, "HYDE_CACHE_PERSISTENT", True),
+            patch.object(retriever, "_get_hyde_cache_repo", return_value=repo),
+            patch.object(retriever, "get_chat_llm", return_value=llm),
+        ):
+            result = await retriever._get_hypothetical_document("q", {})
+
+        assert result == "stored hypothesis"
+        llm.ainvoke.assert_not_awaited()
+        # Promoted into the in-memory tier
+        assert len(retriever._hyde_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_persistent_tier_errors_fall_back_to_generation(self):
+        repo = MagicMock()
+        repo.find.side_effect = RuntimeError("mongo down")
+        repo.upsert.side_effect = RuntimeError("mongo down")
+
+        with (
+            patch.object(retriever.settings, "HYDE_CACHE_PERSISTENT", True),
+            patch.object(retriever, "_get_hyde_cache_repo", return_value=repo),
+            patch.object(retriever, "get_chat_llm", return_value=_slow_llm(0)),
+        ):
+            result = await retriever._get_hypothetical_document("q", {})
+
+        assert result == "hypothesis"
+        repo.upsert.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_persistent_tier_repo_is_built_off_the_event_loop(self):
+        repo = MagicMock()
+        repo.find.return_value = None
+        threads = []
+
+        def get_repo():
+            threads.append(threading.current_thread())
+            return repo
+
+        with (
+            patch.object(retriever.settings, "HYDE_CACHE_PERSISTENT", True),
+            patch.object(retriever, "_get_hyde_cache_repo", get_repo),
+            patch.object(retriever, "get_chat_llm", return_value=_slow_llm(0)),
+        ):
+            await retriever._get_hypothetical_document("q", {})
+
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
+
+# ── Search tuning ─────────────────────────────────────────
+
+
+class TestSearchParams:
+    def test_defaults_send_no_params(self):
+        assert retriever._dense_search_params(_fake_handle(), SearchOptions()) is None
+
+    @pytest.mark.asyncio
+    async def test_assistant_knobs_reach_dense_search(self):
+        client = _fake_async_client(latency=0)
+        config = {"hybrid_search": False, "hnsw_ef": 256, "exact_search": False}
+
+        with (
+            patch.object(retriever, "_get_search_handle", return_value=_fake_handle()),
+            patch.object(retriever, "_get_async_qdrant_client", return_value=client),
+        ):
+            await retrieve("q", ["docs"], config)
+
+        assert client.query_points.call_args.kwargs["search_params"].hnsw_ef == 256
+
+    def test_rescore_override_keeps_collection_oversampling(self):
+        handle = retriever._SearchHandle(
+            collection_name="docs",
+            dense=MagicMock(),
+            sparse=None,
+            quantization=retriever.models.QuantizationSearchParams(
+                rescore=True, oversampling=2.0
+            ),
+        )
+
+        params = retriever._dense_search_params(handle, SearchOptions(rescore=False))
+
+        assert params is not None and params.quantization is not None
+        assert params.quantization.rescore is False
+        assert params.quantization.oversampling == 2.0
+
+
+class TestBenchmarkSearchParams:
+    @pytest.mark.asyncio
+    async def test_measures_recall_against_exact_search(self):
+        async def query_points(collection_name, query, limit, search_params, **kwargs):
+            # Exact search finds a, b; the approximate setting misses b
+            ids = ["a", "b"] if search_params.exact else ["a", "c"]
+            return SimpleNamespace(points=[SimpleNamespace(id=i) for i in ids])
+
+        client = MagicMock()
+        client.query_points = AsyncMock(side_effect=query_points)
+        client.scroll = AsyncMock(
+            return_value=(
+                [SimpleNamespace(vector={"dense": [0.1]}) for _ in range(3)],
+                None,
+            )
+        )
+
+        with (
+            patch.object(retriever, "_get_search_handle", return_value=_fake_handle()),
+            patch.object(retriever, "_get_async_qdrant_client", return_value=client),
+        ):
+            num_queries, results = await retriever.benchmark_search_params(
+                "docs",
+                [SearchOptions(hnsw_ef=16), SearchOptions(exact=True)],
+                sample_size=3,
+                k=2,
+            )
+
+        assert num_queries == 3
+        assert [r["recall_at_k"] for r in results] == [0.5, 1.0]
+        assert results[0]["hnsw_ef"] == 16
+        assert all(r["p95_latency_ms"] >= 0 for r in results)
+
+
+# ── MMR diversification ───────────────────────────────────
+
+
+class TestMaximalMarginalRelevance:
+    def test_skips_near_duplicates(self):
+        query = [1.0, 0.0]
+        candidates = [[1.0, 0.1], [1.0, 0.11], [0.6, -0.8]]
+
+        selected = retriever._maximal_marginal_relevance(query, candidates, 2, 0.5)
+
+        assert selected == [0, 2]
+
+    def test_lambda_one_is_pure_relevance(self):
+        query = [1.0, 0.0]
+        candidates = [[0.7, 0.7], [1.0, 0.1], [1.0, 0.11]]
+
+        selected = retriever._maximal_marginal_relevance(query, candidates, 3, 1.0)
+
+        assert selected == [1, 2, 0]
+
+    @pytest.mark.asyncio
+    async def test_fetches_vectors_and_diversifies_to_top_k(self):
+        vectors = {"a": [1.0, 0.1], "a-copy": [1.0, 0.1], "b": [0.6, -0.8]}
+
+        async def query_points(collection_name, limit, **kwargs):
+            points = [
+                SimpleNamespace(
+                    id=point_id,
+                    score=1.0,
+                    payload={"page_content": point_id, "metadata": {}},
+                    vector={"dense": vector},
+                )
+                for point_id, vector in vectors.items()
+            ]
+            return SimpleNamespace(points=points[:limit])
+
+        client = MagicMock()
+        client.query_points = AsyncMock(side_effect=query_points)
+        handle = _fake_handle(query_vector=[1.0, 0.0])
+
+        with (
+            patch.object(retriever, "_get_search_handle", return_value=handle),
+            patch.object(retriever, "_get_async_qdrant_client", return_value=client),
+        ):
+            docs, _ = await retrieve(
+                "q", ["docs"], {"hybrid_search": False, "top_k": 2, "mmr": True}
+            )
+
+        kwargs = client.query_points.call_args.kwargs
+        assert kwargs["limit"] == 4
+        assert kwargs["with_vectors"] == ["dense"]
+        assert [d.page_content for d in docs] == ["a", "b"]
@@ -0,0 +1,118 @@
+# tests/unit/test_semantic_cache.py
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from backend.core import semantic_cache as semantic_cache_module
+from backend.core.embeddings import query_embedding_cache
+from backend.core.semantic_cache import SemanticCache, embed_question
+
+NAMESPACE = ("assistant-1", "config", "execute", "inputs", ())
+
+
+def _cache(max_entries: int = 10) -> SemanticCache:
+    return SemanticCache(max_namespaces=4, max_entries=max_entries)
+
+
+class TestLookup:
+    def test_similar_question_hits(self):
+        cache = _cache()
+        cache.add(NAMESPACE, "What is Lume?", np.array([1.0, 0.0]), "answer", latency=2.0)
+
+        hit = cache.lookup(NAMESPACE, np.array([0.99, 0.05]), threshold=0.95, max_age=60)
+
+        assert hit is not None
+        assert hit.value == "answer"
+        assert hit.question == "What is Lume?"
+        assert hit.similarity > 0.95
+
+    def test_below_threshold_misses(self):
+        cache = _cache()
+        cache.add(NAMESPACE, "q", np.array([1.0, 0.0]), "answer", latency=2.0)
+
+        assert cache.lookup(NAMESPACE, np.array([0.6, 0.8]), threshold=0.95, max_age=60) is None
+
+    def test_returns_closest_entry(self):
+        cache = _cache()
+        cache.add(NAMESPACE, "a", np.array([1.0, 0.0]), "A", latency=1.0)
+        cache.add(NAMESPACE, "b", np.array([0.0, 1.0]), "B", latency=1.0)
+
+        hit = cache.lookup(NAMESPACE, np.array([0.1, 1.0]), threshold=0.9, max_age=60)
+
+        assert hit is not None
+        assert hit.value == "B"
+
+    def test_namespaces_are_separate(self):
+        cache = _cache()
+        cache.add(NAMESPACE, "q", np.array([1.0, 0.0]), "answer", latency=1.0)
+        other = ("assistant-1", "config", "execute", "inputs", (("docs", 1),))
+
+        assert cache.lookup(other, np.array([1.0, 0.0]), threshold=0.9, max_age=60) is None
+
+    def test_expired_entries_miss(self):
+        cache = _cache()
+        with patch("backend.core.semantic_cache.time.monotonic", return_value=0.0):
+            cache.add(NAMESPACE, "q", np.array([1.0, 0.0]), "answer", latency=1.0)
+
+        with patch("backend.core.semantic_cache.time.monotonic", return_value=120.0):
+            hit = cache.lookup(NAMESPACE, np.array([1.0, 0.0]), threshold=0.9, max_age=60)
+
+        assert hit is None
+
+    def test_keeps_newest_entries(self):
+        cache = _cache(max_entries=2)
+        for i, vector in enumerate([[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0]]):
+            cache.add(NAMESPACE, f"q{i}", np.array(vector), i, latency=1.0)
+
+        assert cache.lookup(NAMESPACE, np.array([1.0, 0.0]), threshold=0.9, max_age=60) is None
+        hit = cache.lookup(NAMESPACE, np.array([-1.0, 0.0]), threshold=0.9, max_age=60)
+        assert hit is not None
+        assert hit.value == 2
+
+
+class TestInvalidationAndStats:
+    def test_invalidate_drops_assistant_namespaces(self):
+        cache = _cache()
+        cache.add(NAMESPACE, "q", np.array([1.0, 0.0]), "answer", latency=1.0)
+        cache.add(("assistant-2",), "q", np.array([1.0, 0.0]), "answer", latency=1.0)
+
+        assert cache.invalidate("assistant-1") == 1
+        assert cache.lookup(NAMESPACE, np.array([1.0, 0.0]), threshold=0.9, max_age=60) is None
+
+    def test_stats_count_hits_misses_and_latency_saved(self):
+        cache = _cache()
+        cache.add(NAMESPACE, "q", np.array([1.0, 0.0]), "answer", latency=2.5)
+
+        cache.lookup(NAMESPACE, np.array([1.0, 0.0]), threshold=0.9, max_age=60)
+        cache.lookup(NAMESPACE, np.array([1.0, 0.0]), threshold=0.9, max_age=60)
+        cache.lookup(NAMESPACE, np.array([0.0, 1.0]), threshold=0.9, max_age=60)
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["latency_saved_seconds"] == 5.0
+        assert stats["hit_ratio"] == 2 / 3
+
+
+class TestEmbedQuestion:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        query_embedding_cache.clear()
+        yield
+        query_embedding_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_repeated_question_embeds_once(self):
+        dense = MagicMock()
+        dense.aembed_query = AsyncMock(return_value=[0.6, 0.8])
+        config = SimpleNamespace(dense=dense)
+
+        with patch.object(
+            semantic_cache_module, "get_pooled_embedding_config", return_value=config
+        ):
+            first = await embed_question("What is Lume?", "model-a")
+            second = await embed_question("what is  lume?", "model-a")
+
+        np.testing.assert_array_equal(first, second)
+        dense.aembed_query.assert_awaited_once()
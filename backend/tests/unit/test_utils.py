@@ -0,0 +1,85 @@
+# tests/unit/test_utils.py
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+from backend.core import generator, utils
+from backend.core.utils import MIN_TRUNCATED_TOKENS, pack_context
+
+
+class _WordEncoding:
+    """One token per word — keeps the tests offline (tiktoken downloads its BPE)."""
+
+    def encode(self, text: str) -> list[str]:
+        return text.split()
+
+    def decode(self, tokens: list[str]) -> str:
+        return " ".join(tokens)
+
+
+@pytest.fixture(autouse=True)
+def word_encoding():
+    with patch.object(utils, "_get_encoding", return_value=_WordEncoding()):
+        yield
+
+
+def _doc(words: int, score: float | None = None, name: str = "") -> Document:
+    metadata: dict[str, Any] = {"name": name}
+    if score is not None:
+        metadata["relevance_score"] = score
+    return Document(page_content=" ".join(["word"] * words), metadata=metadata)
+
+
+class TestPackContext:
+    def test_keeps_everything_within_budget(self):
+        docs = [_doc(10), _doc(20)]
+
+        packed, used = pack_context(docs, 1000)
+
+        assert packed == docs
+        assert used == 30
+
+    def test_fills_by_score_and_keeps_retrieval_order(self):
+        docs = [_doc(100, 0.1, "low"), _doc(100, 0.9, "high"), _doc(100, 0.5, "mid")]
+
+        packed, used = pack_context(docs, 200)
+
+        assert [d.metadata["name"] for d in packed] == ["high", "mid"]
+        assert used == 200
+
+    def test_truncates_the_last_chunk_that_does_not_fit(self):
+        docs = [_doc(100, 0.9, "a"), _doc(300, 0.8, "b")]
+
+        packed, used = pack_context(docs, 200)
+
+        assert used == 200
+        assert packed[1].metadata["truncated"] is True
+        assert len(packed[1].page_content.split()) <= 100
+        # The retrieved document itself is left untouched
+        assert "truncated" not in docs[1].metadata
+
+    def test_drops_chunks_when_too_little_budget_is_left(self):
+        docs = [
+            _doc(200 - MIN_TRUNCATED_TOKENS + 10, 0.9, "a"),
+            _doc(500, 0.8, "big"),
+            _doc(20, 0.7, "small"),
+        ]
+
+        packed, _ = pack_context(docs, 200)
+
+        assert [d.metadata["name"] for d in packed] == ["a", "small"]
+
+
+class TestContextTokenBudget:
+    def test_assistant_override_wins(self):
+        config = {"context_token_budget": 1234, "llm_model": "gpt-4o"}
+        assert generator.get_context_token_budget(config) == 1234
+
+    def test_per_model_then_default(self):
+        assert generator.get_context_token_budget({"llm_model": "gpt-4o"}) == 8000
+        assert (
+            generator.get_context_token_budget({"llm_model": "llama3"})
+            == generator.settings.CONTEXT_TOKEN_BUDGET
+        )
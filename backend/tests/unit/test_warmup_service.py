@@ -0,0 +1,88 @@
+# tests/unit/test_warmup_service.py
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.services import warmup_service
+from backend.services.warmup_service import ModelWarmup, WarmupStatus
+
+
+def _assistant(reranking: bool, provider: str = "huggingface", model: str = "m"):
+    return SimpleNamespace(
+        config=SimpleNamespace(
+            reranking=reranking, reranker_provider=provider, reranker_model=model
+        )
+    )
+
+
+@pytest.fixture
+def repos():
+    kb_repo = MagicMock()
+    kb_repo.list_collection_configs.return_value = [
+        {"dense_embedding_model": "text-embedding-3-small"},
+        {"dense_embedding_model": "text-embedding-3-small"},
+        {"dense_embedding_model": "jina/jina-embeddings-v2-base-de"},
+    ]
+    assistant_repo = MagicMock()
+    assistant_repo.find_all.return_value = [_assistant(True), _assistant(False)]
+    return kb_repo, assistant_repo
+
+
+class TestModelWarmup:
+    def test_ready_immediately_when_disabled(self):
+        assert ModelWarmup(enabled=False).is_ready
+
+    def test_not_ready_until_run_when_enabled(self):
+        warmup = ModelWarmup(enabled=True)
+
+        assert warmup.status == WarmupStatus.PENDING
+        assert not warmup.is_ready
+
+    @pytest.mark.asyncio
+    async def test_warms_each_model_once(self, repos):
+        warmup = ModelWarmup(enabled=True)
+        dense = AsyncMock()
+        warm_reranker = AsyncMock()
+
+        with (
+            patch.object(warmup_service, "get_pooled_embedding_config") as pool,
+            patch.object(warmup_service, "get_sparse_embeddings") as sparse,
+            patch.object(warmup_service.reranker, "warm_up", warm_reranker),
+        ):
+            pool.return_value.dense.aembed_query = dense
+            await warmup.run(lambda: repos)
+
+        assert warmup.is_ready
+        assert warmup.failed == []
+        assert dense.await_count == 2
+        sparse.return_value.embed_query.assert_called_once_with("warmup")
+        warm_reranker.assert_awaited_once_with("huggingface", "m")
+
+    @pytest.mark.asyncio
+    async def test_becomes_ready_even_when_models_fail(self, repos):
+        warmup = ModelWarmup(enabled=True)
+
+        with (
+            patch.object(
+                warmup_service, "get_pooled_embedding_config", side_effect=RuntimeError
+            ),
+            patch.object(warmup_service, "get_sparse_embeddings"),
+            patch.object(warmup_service.reranker, "warm_up", AsyncMock()),
+        ):
+            await warmup.run(lambda: repos)
+
+        assert warmup.is_ready
+        assert len(warmup.failed) == 2
+
+    @pytest.mark.asyncio
+    async def test_becomes_ready_when_database_is_unreachable(self):
+        warmup = ModelWarmup(enabled=True)
+
+        def get_repos():
+            raise ConnectionError("mongo down")
+
+        await warmup.run(get_repos)
+
+        assert warmup.is_ready
+        assert warmup.failed == ["warmup"]
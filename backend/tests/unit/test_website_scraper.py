@@ -0,0 +1,195 @@
+# tests/unit/test_website_scraper.py
+import asyncio
+import time
+from contextlib import aclosing
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+import pytest
+
+from backend.services.ingestion import website_scraper
+
+
+def _result(url: str, status_code: int = 200) -> SimpleNamespace:
+    ok = status_code == 200
+    return SimpleNamespace(
+        success=ok,
+        markdown=SimpleNamespace(fit_markdown=f"# {url}") if ok else None,
+        metadata={"title": url},
+        status_code=status_code,
+        error_message=None if ok else f"HTTP {status_code}",
+    )
+
+
+class FakeCrawler:
+    """Stands in for AsyncWebCrawler; records concurrency and start times."""
+
+    def __init__(self, statuses: dict[str, list[int]] | None = None, delay: float = 0.05):
+        self.statuses = statuses or {}
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.max_in_flight_per_domain: dict[str, int] = {}
+        self._per_domain: dict[str, int] = {}
+        self.starts: dict[str, list[float]] = {}
+        self.attempts: dict[str, int] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def arun(self, url, config=None):
+        domain = urlparse(url).netloc
+        self.attempts[url] = self.attempts.get(url, 0) + 1
+        self.starts.setdefault(domain, []).append(time.perf_counter())
+        self.in_flight += 1
+        self._per_domain[domain] = self._per_domain.get(domain, 0) + 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.max_in_flight_per_domain[domain] = max(
+            self.max_in_flight_per_domain.get(domain, 0), self._per_domain[domain]
+        )
+        try:
+            await asyncio.sleep(self.delay)
+            statuses = self.statuses.get(url, [200])
+            status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+            if status == 0:
+                raise ConnectionError("connection reset")
+            return _result(url, status)
+        finally:
+            self.in_flight -= 1
+            self._per_domain[domain] -= 1
+
+
+@pytest.fixture
+def crawler():
+    fake = FakeCrawler()
+    with (
+        patch.object(website_scraper, "AsyncWebCrawler", return_value=fake),
+        patch.object(website_scraper.settings, "SCRAPE_RETRY_BACKOFF", 0.01),
+    ):
+        yield fake
+
+
+URLS = [f"https://site{i % 3}.example/page{i}" for i in range(12)]
+
+
+class TestConcurrentScrape:
+    @pytest.mark.asyncio
+    async def test_respects_global_and_per_domain_limits(self, crawler):
+        docs, processed, failed = await website_scraper.scrape_urls(
+            URLS, "kb", concurrency=4, per_domain_concurrency=2, politeness_delay=0
+        )
+
+        assert processed == URLS
+        assert [d["url"] for d in docs] == URLS
+        assert failed == []
+        assert crawler.max_in_flight == 4
+        assert max(crawler.max_in_flight_per_domain.values()) <= 2
+
+    @pytest.mark.asyncio
+    async def test_faster_than_sequential(self, crawler):
+        start = time.perf_counter()
+        await website_scraper.scrape_urls(
+            URLS, "kb", concurrency=6, per_domain_concurrency=2, politeness_delay=0
+        )
+
+        assert time.perf_counter() - start < len(URLS) * crawler.delay / 2
+
+    @pytest.mark.asyncio
+    async def test_politeness_delay_spaces_requests_per_domain(self, crawler):
+        urls = [f"https://one.example/{i}" for i in range(3)]
+        await website_scraper.scrape_urls(
+            urls, "kb", per_domain_concurrency=3, politeness_delay=0.1
+        )
+
+        starts = crawler.starts["one.example"]
+        gaps = [b - a for a, b in zip(starts, starts[1:], strict=False)]
+        assert all(gap >= 0.09 for gap in gaps)
+
+    @pytest.mark.asyncio
+    async def test_reports_progress_for_every_url(self, crawler):
+        calls = []
+        await website_scraper.scrape_urls(
+            URLS, "kb", on_progress=lambda *args: calls.append(args), politeness_delay=0
+        )
+
+        assert [idx for idx, _, _ in calls] == list(range(1, len(URLS) + 1))
+        assert {url for _, _, url in calls} == set(URLS)
+        assert all(total == len(URLS) for _, total, _ in calls)
+
+
+class TestBackpressure:
+    @pytest.mark.asyncio
+    async def test_slow_consumer_holds_back_the_crawl(self, crawler):
+        crawler.delay = 0
+        urls = [f"https://site{i % 5}.example/page{i}" for i in range(40)]
+        started_per_consumed = []
+
+        pages = website_scraper.iter_scrape_urls(
+            urls, "kb", concurrency=4, per_domain_concurrency=2, politeness_delay=0
+        )
+        async with aclosing(pages):
+            async for _ in pages:
+                await asyncio.sleep(0.01)
+                started_per_consumed.append(sum(crawler.attempts.values()))
+
+        assert len(started_per_consumed) == len(urls)
+        # Never more than `concurrency` pages ahead of the consumer
+        for consumed, started in enumerate(started_per_consumed, 1):
+            assert started <= consumed + 4
+
+    @pytest.mark.asyncio
+    async def test_closing_cancels_the_remaining_crawls(self, crawler):
+        pages = website_scraper.iter_scrape_urls(URLS, "kb", concurrency=2, politeness_delay=0)
+        async with aclosing(pages):
+            await anext(pages)
+
+        assert sum(crawler.attempts.values()) < len(URLS)
+        assert crawler.in_flight == 0
+
+
+class TestRetries:
+    @pytest.mark.asyncio
+    async def test_retries_transient_failures(self, crawler):
+        crawler.statuses = {URLS[0]: [503, 0, 200]}
+
+        docs, _, failed = await website_scraper.scrape_urls(
+            URLS[:2], "kb", politeness_delay=0, max_retries=2
+        )
+
+        assert crawler.attempts[URLS[0]] == 3
+        assert len(docs) == 2
+        assert failed == []
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self, crawler):
+        crawler.statuses = {URLS[0]: [404]}
+
+        _, processed, failed = await website_scraper.scrape_urls(
+            URLS[:2], "kb", politeness_delay=0, max_retries=2
+        )
+
+        assert crawler.attempts[URLS[0]] == 1
+        assert processed == [URLS[1]]
+        assert failed == [{"url": URLS[0], "error": "HTTP 404"}]
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, crawler):
+        crawler.statuses = {URLS[0]: [0]}
+
+        _, _, failed = await website_scraper.scrape_urls(
+            URLS[:2], "kb", politeness_delay=0, max_retries=1
+        )
+
+        assert crawler.attempts[URLS[0]] == 2
+        assert failed == [{"url": URLS[0], "error": "connection reset"}]
+
+    @pytest.mark.asyncio
+    async def test_raises_when_nothing_was_crawled(self, crawler):
+        crawler.statuses = {URLS[0]: [404]}
+
+        with pytest.raises(RuntimeError, match="No documents"):
+            await website_scraper.scrape_urls(URLS[:1], "kb", politeness_delay=0)